@@ -14,240 +14,52 @@ All requested features:
 - Total number of tablets (on-screen + in both exports)
 - Two exports: Provider (ASCII, landscape attempt) and Patient (12pt, landscape attempt)
 - Window opens compact and resizable
+- Optional live recalculation: edits are debounced and computed on a
+  background thread, so long courses never freeze the window
 
 DISCLAIMER: Support tool only. Verify against protocol and clinical judgment.
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from math import floor
-from typing import List, Tuple
-
-APP_TITLE = "Chemotherapy Calculator Calendar"
-
-DEFAULTS = {
-    "bsa": 1.70,
-    "mg_per_m2_day": 50.0,
-    "days": 21,
-    "tablet_size_mg": 50,
-    "mode": "Front-load overall",
-}
-
-SCHEDULE_MODES = [
-    "Front-load overall",
-    "Weekly front-load",
-    "Alternating high/low",
-]
-
-# -------------------- Core math --------------------
-
-def compute_mix(bsa: float, mg_per_m2_day: float, days: int, tablet_size_mg: int):
-    if any(x <= 0 for x in (bsa, mg_per_m2_day, days, tablet_size_mg)):
-        raise ValueError("All inputs must be positive.")
-
-    exact_daily_mg = mg_per_m2_day * bsa
-    exact_tabs = exact_daily_mg / tablet_size_mg
-    f = int(floor(exact_tabs))
-    c = f if abs(exact_tabs - f) < 1e-12 else f + 1
-
-    total_exact_tabs = days * exact_tabs
-    ceil_days = 0 if c == f else int(round(total_exact_tabs - days * f))
-    ceil_days = max(0, min(days, ceil_days))
-
-    return {
-        "exact_daily_mg": exact_daily_mg,
-        "exact_tabs": exact_tabs,
-        "floor_tabs": f,
-        "ceil_tabs": c,
-        "ceil_days": ceil_days,
-        "floor_days": days - ceil_days,
-    }
-
-# -------------------- Scheduling arrangements --------------------
-
-def arrange_frontload_overall(days: int, ceil_days: int, c: int, f: int) -> List[int]:
-    return [c]*ceil_days + [f]*(days - ceil_days)
-
-def arrange_weekly_frontload(days: int, ceil_days_total: int, exact_tabs: float, c: int, f: int) -> List[int]:
-    # Distribute ceil-days week by week, placing them at the start of each 7-day block.
-    per_day = [f] * days
-    remaining_ceil = ceil_days_total
-    start = 0
-    while start < days:
-        week_len = min(7, days - start)
-        wk_f = int(floor(exact_tabs))
-        wk_c = wk_f if abs(exact_tabs - wk_f) < 1e-12 else wk_f + 1
-        wk_ceil = 0 if wk_c == wk_f else int(round(week_len * exact_tabs - week_len * wk_f))
-        wk_ceil = max(0, min(week_len, wk_ceil, remaining_ceil))
-        for i in range(wk_ceil):
-            per_day[start + i] = c
-        remaining_ceil -= wk_ceil
-        start += week_len
-    # If rounding left unplaced highs, place earliest first
-    start = 0
-    while remaining_ceil > 0 and start < days:
-        week_end = min(start + 7, days)
-        for i in range(start, week_end):
-            if per_day[i] == f:
-                per_day[i] = c
-                remaining_ceil -= 1
-                if remaining_ceil == 0:
-                    break
-        start += 7
-    return per_day
-
-def arrange_alternating(days: int, ceil_days: int, c: int, f: int) -> List[int]:
-    per_day = []
-    highs = ceil_days
-    lows = days - ceil_days
-    turn_high = True
-    while len(per_day) < days:
-        if turn_high and highs > 0:
-            per_day.append(c); highs -= 1
-        elif (not turn_high) and lows > 0:
-            per_day.append(f); lows -= 1
-        elif highs > 0:
-            per_day.append(c); highs -= 1
-        else:
-            per_day.append(f); lows -= 1
-        turn_high = not turn_high
-    return per_day
-
-# -------------------- Pharmacy one-liner helpers --------------------
-
-def compress_runs(per_day_tabs: List[int]) -> List[Tuple[int,int,int]]:
-    """Return list of (start_day, end_day, tabs) runs."""
-    if not per_day_tabs:
-        return []
-    runs = []
-    start = 1
-    current = per_day_tabs[0]
-    for i in range(1, len(per_day_tabs)):
-        if per_day_tabs[i] != current:
-            runs.append((start, i, current))
-            start = i+1
-            current = per_day_tabs[i]
-    runs.append((start, len(per_day_tabs), current))
-    return runs
-
-def is_strict_alternating(per_day_tabs: List[int]) -> Tuple[bool,int,int]:
-    if len(per_day_tabs) < 2:
-        return False, 0, 0
-    a = per_day_tabs[0]
-    b = per_day_tabs[1]
-    if a == b:
-        return False, 0, 0
-    for i in range(2, len(per_day_tabs)):
-        expect = a if i % 2 == 0 else b
-        if per_day_tabs[i] != expect:
-            return False, 0, 0
-    return True, a, b
-
-def format_pharmacy_snippet(per_day_tabs: List[int], tablet_size_mg: int, days: int, mg_per_m2_day: float, bsa: float) -> str:
-    alt, a, b = is_strict_alternating(per_day_tabs)
-    if alt:
-        return (f"Tablet size {tablet_size_mg} mg: Alternate {a} and {b} tab(s) daily, starting with {a}, for {days} days; "
-                f"dose {mg_per_m2_day:g} mg/m^2/day at BSA {bsa:.2f} m^2.")
-    runs = compress_runs(per_day_tabs)
-    ranges = []
-    for s,e,t in runs:
-        label = f"Day {s}" if s == e else f"Days {s}-{e}"
-        ranges.append(f"{label}: {t} tab(s)")
-    return (f"Tablet size {tablet_size_mg} mg; " + "; ".join(ranges) +
-            f"; total {days} days; dose {mg_per_m2_day:g} mg/m^2/day at BSA {bsa:.2f} m^2.")
-
-# -------------------- Calendar text --------------------
-
-def make_calendar_text(per_day_tabs: List[int], tablet_size_mg: int, cols: int = 7) -> str:
-    # Calendar grid with 3 text lines per cell
-    days = len(per_day_tabs)
-    rows = (days + cols - 1) // cols
-    cells = []
-    for i, tabs in enumerate(per_day_tabs):
-        mg = tabs * tablet_size_mg
-        cells.append(f"Day {i+1}\n{tabs} tab(s)\n({mg} mg)")
-    maxw = max((len(line) for cell in cells for line in cell.splitlines()), default=12)
-    cw = max(12, maxw)
-
-    header = " | ".join(f"D{c+1}".center(cw) for c in range(cols))
-    lines = [header, "-"*len(header)]
-
-    for r in range(rows):
-        block = []
-        for c_i in range(cols):
-            idx = r*cols + c_i
-            if idx < days:
-                parts = cells[idx].splitlines()
-            else:
-                parts = ["", "", ""]
-            while len(parts) < 3: parts.append("")
-            block.append([p.ljust(cw) for p in parts[:3]])
-        for li in range(3):
-            lines.append(" | ".join(block[c_i][li] for c_i in range(cols)))
-        lines.append("-"*len(header))
-    return "\n".join(lines)
-
-# -------------------- Export helpers (RTF) --------------------
-
-def _rtf_escape(s: str) -> str:
-    return s.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}")
-
-def ascii_sanitize(s: str) -> str:
-    mapping = {
-        "m²": "m^2", "µ": "u", "×": "x", "–": "-", "—": "-", "→": "->",
-        "≤": "<=", "≥": ">=", "…": "...", "“": '"', "”": '"', "‘": "'", "’": "'",
-        "•": "-", "°": " deg ", "™": "(TM)", "®": "(R)", "©": "(C)"
-    }
-    for k,v in mapping.items():
-        s = s.replace(k,v)
-    try:
-        s = s.encode('ascii', 'ignore').decode('ascii')
-    except Exception:
-        pass
-    return s
-
-def export_provider_rtf(filepath: str, title: str, summary: str, pharmacy_line: str, calendar_text: str, total_pills: int):
-    # ASCII-only provider doc; attempt landscape Letter via \\paperw/\\paperh
-    summary_ascii = ascii_sanitize(summary)
-    calendar_ascii = ascii_sanitize(calendar_text)
-    pharm_ascii = ascii_sanitize(pharmacy_line)
-    header = (r"{\rtf1\ansi\deff0"
-              r"{\fonttbl{\f0\fmodern Courier New;}{\f1\fmodern Consolas;}}"
-              r"\paperw15840\paperh12240\margl720\margr720\margt720\margb720 ")
-    body = (r"\fs20 \b " + _rtf_escape(ascii_sanitize(title)) + r"\b0\line "
-            + r"\f0 "
-            + r"\b Provider Summary\b0\line " + _rtf_escape(summary_ascii) + r"\line "
-            + r"Total tablets to dispense: " + str(total_pills) + r"\line\line "
-            + r"\b Pharmacy Snippet\b0\line " + _rtf_escape(pharm_ascii) + r"\line\line "
-            + r"\b Calendar\b0\line " + _rtf_escape(calendar_ascii).replace("\n", r"\line "))
-    rtf = header + body + "}"
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(rtf)
-
-def export_patient_rtf(filepath: str, title: str, patient_intro: str, calendar_text: str, total_pills: int):
-    # Patient-friendly 12pt, attempt landscape Letter via \\paperw/\\paperh
-    header = (r"{\rtf1\ansi\deff0"
-              r"{\fonttbl{\f0\fmodern Courier New;}{\f1\fmodern Consolas;}}"
-              r"\paperw15840\paperh12240\margl720\margr720\margt720\margb720 ")
-    intro = _rtf_escape(patient_intro)
-    cal = _rtf_escape(calendar_text).replace("\n", r"\line ")
-    body = (r"\fs24 \b Your Chemotherapy Tablet Schedule\b0\line "
-            + intro + r"\line "
-            + r"Total tablets for the course: " + str(total_pills) + r"\line\line "
-            + r"\b Daily Plan\b0\line " + cal)
-    rtf = header + r"\f0 " + body + "}"
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(rtf)
+
+from chemocalc.core import (
+    APP_TITLE, DEFAULTS, SCHEDULE_MODES,
+    prepare_documents, diff_lines, export_provider_rtf, export_patient_rtf,
+)
+from chemocalc.background import BackgroundCalculator
+
+LIVE_DEBOUNCE_MS = 300   # quiet time after the last keystroke before a live recalculation
+POLL_MS = 30             # how often the UI thread checks for a finished calculation
 
 # -------------------- GUI --------------------
 
+def apply_line_edits(widget, edits, n_old_lines):
+    """Apply diff_lines() edits to a tk.Text whose content (without Tk's final newline) has n_old_lines lines."""
+    for start, stop, lines in reversed(edits):  # back to front, so earlier line numbers stay valid
+        if stop - start == len(lines):
+            # Same number of lines: replace the characters of lines start+1..stop (Text lines are 1-based).
+            widget.delete(f"{start + 1}.0", f"{stop}.end")
+            widget.insert(f"{start + 1}.0", "\n".join(lines))
+        else:
+            # Length change (always the tail, start >= 1): cut from the end of the last common line.
+            widget.delete(f"{start}.end", "end")
+            if lines:
+                widget.insert(f"{start}.end", "\n" + "\n".join(lines))
+
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title(APP_TITLE)
         # Natural size, resizable
         self.resizable(True, True)
+        self._calc = BackgroundCalculator()
+        self._calendar_lines = [""]   # what txt_calendar currently shows, one entry per line
+        self._debounce_id = None
+        self._poll_id = None
+        self._last_calendar = None    # export data for the current inputs; None when stale or invalid
         self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _build_ui(self):
         p = ttk.Frame(self, padding=10)
@@ -277,6 +89,10 @@ class App(tk.Tk):
         ttk.Button(p, text="Calculate", command=self.on_calculate).grid(row=row, column=2, padx=(12,0), pady=(8,0))
         ttk.Button(p, text="Export Provider (.doc)", command=self.on_export_provider).grid(row=row, column=3, padx=(8,0), pady=(8,0))
         ttk.Button(p, text="Export Patient (.doc)", command=self.on_export_patient).grid(row=row, column=4, padx=(8,0), pady=(8,0))
+        self.var_live = tk.BooleanVar(value=False)
+        ttk.Checkbutton(p, text="Live recalculation", variable=self.var_live).grid(row=row, column=5, sticky="w", padx=(8,0), pady=(8,0))
+        self.lbl_status = ttk.Label(p, text="", foreground="#555555")
+        self.lbl_status.grid(row=row, column=6, columnspan=2, sticky="w", padx=(8,0), pady=(8,0))
 
         row += 1
         ttk.Separator(p).grid(row=row, column=0, columnspan=8, sticky="ew", pady=8)
@@ -318,8 +134,12 @@ class App(tk.Tk):
             p.grid_columnconfigure(c, weight=1)
 
         self.bind("<Return>", lambda e: self.on_calculate())
+        for var in (self.var_bsa, self.var_mg_day, self.var_days, self.var_tab, self.var_mode):
+            var.trace_add("write", self._invalidate_results)
+        for var in (self.var_bsa, self.var_mg_day, self.var_days, self.var_tab, self.var_mode, self.var_live):
+            var.trace_add("write", self._on_input_changed)
 
-    def _parse_inputs(self):
+    def _parse_inputs(self, show_errors=True):
         try:
             bsa = float(self.var_bsa.get().strip())
             mg_day = float(self.var_mg_day.get().strip())
@@ -329,61 +149,105 @@ class App(tk.Tk):
                 raise ValueError
             return bsa, mg_day, days, tab
         except Exception:
-            messagebox.showerror("Invalid input", "Enter positive numeric values (BSA, mg/m^2/day, days, tablet size).")
+            if show_errors:
+                messagebox.showerror("Invalid input", "Enter positive numeric values (BSA, mg/m^2/day, days, tablet size).")
             return None
 
-    def _arrange_by_mode(self, days, ceil_days, exact_tabs, c, f, mode):
-        if mode == "Front-load overall":
-            return arrange_frontload_overall(days, ceil_days, c, f)
-        if mode == "Weekly front-load":
-            return arrange_weekly_frontload(days, ceil_days, exact_tabs, c, f)
-        if mode == "Alternating high/low":
-            return arrange_alternating(days, ceil_days, c, f)
-        return arrange_frontload_overall(days, ceil_days, c, f)
-
     def on_calculate(self):
         parsed = self._parse_inputs()
         if not parsed:
             return
-        bsa, mg_day, days, tab = parsed
+        self._start_calculation(parsed)
+
+    def _invalidate_results(self, *_):
+        # The shown results no longer match the inputs: drop the export data and any
+        # calculation still running for the old inputs.
+        self._last_calendar = None
+        self._calc.cancel_pending()
+        if not self.var_live.get():
+            self.lbl_status.config(text="Inputs changed; press Calculate")
+
+    # ----- live recalculation: debounce on the UI thread, compute on a worker -----
+
+    def _on_input_changed(self, *_):
+        if self._debounce_id is not None:
+            self.after_cancel(self._debounce_id)
+            self._debounce_id = None
+        if self.var_live.get():
+            self._debounce_id = self.after(LIVE_DEBOUNCE_MS, self._live_calculate)
+
+    def _live_calculate(self):
+        self._debounce_id = None
+        parsed = self._parse_inputs(show_errors=False)  # half-typed values are normal here
+        if not parsed:
+            self._calc.cancel_pending()
+            self.lbl_status.config(text="Waiting for valid input")
+            return
+        self._start_calculation(parsed)
 
-        mix = compute_mix(bsa, mg_day, days, tab)
-        per_day_tabs = self._arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"],
-                                             mix["ceil_tabs"], mix["floor_tabs"], self.var_mode.get())
+    def _start_calculation(self, parsed):
+        bsa, mg_day, days, tab = parsed
+        mode = self.var_mode.get()
+        self._calc.submit(prepare_documents, bsa, mg_day, days, tab, mode, tag=(bsa, mg_day, days, tab, mode))
+        self.lbl_status.config(text="Calculating...")
+        if self._poll_id is None:
+            self._poll_id = self.after(POLL_MS, self._poll_calculation)
+
+    def _poll_calculation(self):
+        # Results from superseded inputs never come back from poll(), so only the newest is shown.
+        self._poll_id = None
+        done = self._calc.poll()
+        if done is not None:
+            inputs, fut = done
+            try:
+                docs = fut.result()
+            except Exception as e:
+                self.lbl_status.config(text=f"Calculation failed: {e}")
+            else:
+                self._show_results(inputs, docs)
+                self.lbl_status.config(text="")
+        if self._calc.pending:
+            self._poll_id = self.after(POLL_MS, self._poll_calculation)
 
-        exact_total_mg = mix["exact_daily_mg"] * days
-        mixed_total_mg = sum(t * tab for t in per_day_tabs)
-        total_pills = sum(per_day_tabs)
-        derived_total_m2 = mg_day * days
+    def _show_results(self, inputs, docs):
+        bsa, mg_day, days, tab, mode = inputs
+        total_pills = docs["total_pills"]
 
         # Provider summary (organized)
-        lines = []
-        lines.append(f"INPUTS -> BSA {bsa:.2f} m^2 | mg/m^2/day {mg_day:.3g} | Days {days} | Tablet {tab} mg | Mode {self.var_mode.get()}")
-        lines.append(f"DERIVED -> Total mg/m^2: {derived_total_m2:.3g}")
-        lines.append(f"DAILY DOSE -> Exact {mix['exact_daily_mg']:.1f} mg  ({mix['exact_tabs']:.3f} tab/day)")
-        lines.append(f"ROUNDING MIX -> {mix['ceil_tabs']} tab(s) on {mix['ceil_days']} day(s); {mix['floor_tabs']} tab(s) on {mix['floor_days']} day(s)")
-        lines.append(f"TOTALS -> Exact {exact_total_mg:.0f} mg | Mixed {mixed_total_mg:.0f} mg | Tablets {total_pills}")
+        summary = docs["summary"]
         self.txt_summary.delete("1.0", "end")
-        self.txt_summary.insert("1.0", "\n".join(lines))
+        self.txt_summary.insert("1.0", summary)
 
-        cal = make_calendar_text(per_day_tabs, tab, cols=7)
-        self.txt_calendar.delete("1.0", "end")
-        self.txt_calendar.insert("1.0", cal)
+        cal = docs["calendar"]
+        self._update_calendar_view(cal)
 
         # Pharmacy one-liner
-        pharm = format_pharmacy_snippet(per_day_tabs, tab, days, mg_day, bsa)
+        pharm = docs["pharmacy"]
         self.pharm_var.set(pharm)
 
         self.lbl_totals.config(text=f"Total tablets to dispense: {total_pills} (each {tab} mg)")
 
         # Keep last results for export
-        self._last_provider_summary = "\n".join(lines)
+        self._last_provider_summary = summary
         self._last_calendar = cal
         self._last_pharmacy = pharm
         self._last_total_pills = total_pills
-        self._last_patient_intro = (
-            f"This plan lasts {days} days. Each tablet is {tab} mg. On some days you will take more tablets than others to match your dose."
-        )
+        self._last_patient_intro = docs["patient_intro"]
+
+    def _update_calendar_view(self, cal):
+        # Rewrite only the lines (cell rows) that changed since the last calculation, so redraw
+        # cost follows the change, not the course length, and the scroll position is kept.
+        new_lines = cal.split("\n")
+        edits = diff_lines(self._calendar_lines, new_lines)
+        apply_line_edits(self.txt_calendar, edits, len(self._calendar_lines))
+        self._calendar_lines = new_lines
+
+    def _on_close(self):
+        for after_id in (self._debounce_id, self._poll_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self._calc.shutdown()
+        self.destroy()
 
     def copy_pharmacy(self):
         txt = self.pharm_var.get()
@@ -393,9 +257,17 @@ class App(tk.Tk):
         self.clipboard_append(txt)
         messagebox.showinfo("Copied", "Pharmacy snippet copied to clipboard.")
 
+    def _can_export(self):
+        if self._calc.pending:
+            messagebox.showwarning("Still calculating", "Wait for the calculation to finish, then export.")
+            return False
+        if self._last_calendar is None:
+            messagebox.showwarning("Nothing to export", "Calculate a schedule for the current inputs first.")
+            return False
+        return True
+
     def on_export_provider(self):
-        if not hasattr(self, "_last_calendar"):
-            messagebox.showwarning("Nothing to export", "Calculate a schedule first.")
+        if not self._can_export():
             return
         fname = filedialog.asksaveasfilename(
             title="Export Provider Order",
@@ -412,8 +284,7 @@ class App(tk.Tk):
             messagebox.showerror("Export failed", str(e))
 
     def on_export_patient(self):
-        if not hasattr(self, "_last_calendar"):
-            messagebox.showwarning("Nothing to export", "Calculate a schedule first.")
+        if not self._can_export():
             return
         fname = filedialog.asksaveasfilename(
             title="Export Patient Handout",
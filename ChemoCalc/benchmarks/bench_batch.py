@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+run_batch: throughput and scaling with the number of worker processes.
+
+Renders n orders (default 2,000; course lengths 14, 21 and 365 days, every
+mode) into a temp directory with workers=1 (in-process, the reference),
+2, 4, ... up to the CPU count, and reports orders/s, the speedup over
+workers=1 and the parallel efficiency (speedup / workers). Near-linear
+scaling shows as an efficiency close to 1. The render memo is cleared before each run, so
+every run starts cold.
+
+tests/test_batch.py checks ordering, file names and error isolation.
+
+    python benchmarks/bench_batch.py [n] [--chunk-size K] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.batch import run_batch  # noqa: E402
+from chemocalc.core import SIG_CACHE, CALENDAR_CACHE  # noqa: E402
+from tests.test_batch import orders  # noqa: E402
+
+def _worker_counts(cpus: int):
+    n = 1
+    while n < cpus:
+        yield n
+        n *= 2
+    yield cpus
+
+def main():
+    ap = argparse.ArgumentParser(description="run_batch scaling benchmark")
+    ap.add_argument("n", type=int, nargs="?", default=2000)
+    ap.add_argument("--chunk-size", type=int, default=32)
+    ap.add_argument("--workers", type=int, nargs="+", default=None,
+                    help="worker counts to time (default: 1, 2, 4, ... up to the CPU count)")
+    args = ap.parse_args()
+    sample = list(orders(args.n))
+    counts = sorted(set(args.workers or _worker_counts(os.cpu_count() or 1)) | {1})  # workers=1 is the reference
+
+    print(f"{args.n} orders, chunk size {args.chunk_size}, {os.cpu_count()} CPU(s)")
+    print(f"{'workers':>7}  {'seconds':>8}  {'orders/s':>9}  {'speedup':>7}  {'efficiency':>10}")
+    base = None
+    for workers in counts:
+        SIG_CACHE.clear()
+        CALENDAR_CACHE.clear()
+        with tempfile.TemporaryDirectory() as out_dir:
+            t0 = time.perf_counter()
+            failed = sum(not r["ok"] for r in run_batch(sample, out_dir, workers=workers,
+                                                        chunk_size=args.chunk_size))
+            seconds = time.perf_counter() - t0
+        if failed:
+            print(f"{failed} order(s) failed with workers={workers}", file=sys.stderr)
+            return 1
+        base = base or seconds
+        speedup = base / seconds
+        print(f"{workers:>7}  {seconds:>8.2f}  {args.n / seconds:>9,.0f}  {speedup:>6.2f}x  "
+              f"{speedup / workers:>10.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
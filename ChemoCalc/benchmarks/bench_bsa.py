@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+BSA formulas: a cohort rerun after a formula change, a Python loop of
+body_surface_area + compute_mix vs body_surface_area + compute_mix_batch on
+arrays. tests/test_bsa.py checks the array path against the scalar one.
+
+    python benchmarks/bench_bsa.py [cohort_size]
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.bsa import body_surface_area  # noqa: E402
+from chemocalc.core import compute_mix, compute_mix_batch  # noqa: E402
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(24)
+    heights = [round(rng.uniform(145, 200), 1) for _ in range(n)]
+    weights = [round(rng.uniform(40, 140), 1) for _ in range(n)]
+    doses = [rng.choice((825.0, 1000.0, 1250.0)) for _ in range(n)]
+    days = [rng.choice((14, 21)) for _ in range(n)]
+
+    t0 = time.perf_counter()
+    [compute_mix(body_surface_area(a, b, "DuBois", cap=2.0), d, k, 500)["ceil_days"]
+            for a, b, d, k in zip(heights, weights, doses, days)]
+    loop_s = time.perf_counter() - t0
+
+    h, w, d, k = (np.asarray(x) for x in (heights, weights, doses, days))
+    t0 = time.perf_counter()
+    bsa = body_surface_area(h, w, "DuBois", cap=2.0)
+    compute_mix_batch(bsa, d, k, 500)["ceil_days"]
+    vec_s = time.perf_counter() - t0
+    print(f"cohort of {n}: loop {loop_s * 1e3:.0f} ms, vectorized {vec_s * 1e3:.1f} ms ({loop_s / vec_s:.0f}x)")
+
+if __name__ == "__main__":
+    main()
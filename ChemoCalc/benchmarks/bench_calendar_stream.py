@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Calendar text: the previous all-cells renderer vs iter_calendar_lines(),
+timed per calendar at 21 to 36500 days, plus time to the first line.
+tests/test_calendar.py checks that both give the same text.
+
+    python benchmarks/bench_calendar_stream.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import SCHEDULE_MODES, compute_mix, arrange_by_mode, iter_calendar_lines  # noqa: E402
+from tests.test_calendar import reference_calendar  # noqa: E402
+
+def main():
+    print(f"{'days':>6} {'old ms':>9} {'new ms':>9} {'speedup':>8} {'first line us':>14}")
+    for days in (21, 365, 3650, 36500):
+        mix = compute_mix(1.73, 1250.0, days, 500)
+        sched = arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"], mix["floor_tabs"],
+                                SCHEDULE_MODES[1])
+        seq = sched.tolist()
+        n = max(3, 20000 // days)
+        old = min(timeit.repeat(lambda: reference_calendar(seq, 500), number=n, repeat=5)) / n * 1e3
+        new = min(timeit.repeat(lambda: "\n".join(iter_calendar_lines(sched, 500)), number=n, repeat=5)) / n * 1e3
+        first = min(timeit.repeat(lambda: next(iter_calendar_lines(sched, 500)), number=1000, repeat=5)) / 1000 * 1e6
+        print(f"{days:>6} {old:>9.3f} {new:>9.3f} {old / new:>7.1f}x {first:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+compute_mix: float path vs exact (integer-scaled) path.
+
+1) Disagreements: lists the grid points (BSA 1.20-2.60 by 0.01, common
+   doses, strengths and course lengths) where the float path picks a
+   different ceil_days or weekly front-load schedule than the exact one.
+   Those are the epsilon/round() boundary cases. tests/test_exact_mix.py
+   checks the exact path against a Fraction oracle.
+2) Throughput of both paths per call, for float and for str inputs.
+
+    python benchmarks/bench_exact_mix.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import compute_mix, compute_mix_exact, arrange_weekly_frontload  # noqa: E402
+
+BSAS = [round(1.20 + i / 100, 2) for i in range(141)]
+DOSES = (50.0, 60.0, 75.0, 100.0, 125.0, 200.0, 250.0, 825.0, 1000.0, 1250.0)
+STRENGTHS = (5, 10, 20, 25, 50, 100, 150, 250, 500)
+COURSES = (5, 7, 14, 21, 28, 30)
+
+def main():
+    cases = mix_diffs = weekly_diffs = 0
+    examples = []
+    for bsa in BSAS:
+        for dose in DOSES:
+            for tab in STRENGTHS:
+                for days in COURSES:
+                    ex = compute_mix_exact(bsa, dose, days, tab)
+                    fl = compute_mix(bsa, dose, days, tab)
+                    cases += 1
+                    if (fl["floor_tabs"], fl["ceil_tabs"], fl["ceil_days"]) != (ex["floor_tabs"], ex["ceil_tabs"], ex["ceil_days"]):
+                        mix_diffs += 1
+                        if len(examples) < 8:
+                            examples.append(f"  bsa={bsa} dose={dose:g} days={days} tab={tab}: float ceil_days "
+                                            f"{fl['ceil_days']} (c={fl['ceil_tabs']}), exact {ex['ceil_days']} "
+                                            f"(c={ex['ceil_tabs']}), exact_tabs={ex['exact_tabs']}")
+                    w_fl = arrange_weekly_frontload(days, fl["ceil_days"], fl["exact_tabs"], fl["ceil_tabs"], fl["floor_tabs"])
+                    w_ex = arrange_weekly_frontload(days, ex["ceil_days"], ex["exact_tabs"], ex["ceil_tabs"], ex["floor_tabs"])
+                    weekly_diffs += w_fl != w_ex
+    print(f"{cases} grid points; float path differs on {mix_diffs} mixes and {weekly_diffs} weekly front-load schedules")
+    print("\n".join(examples))
+
+    print(f"\n{'path':<26} {'us/call':>8}")
+    n = 20000
+    for label, fn in (
+        ("compute_mix (float)", lambda: compute_mix(1.73, 1250.0, 14, 500)),
+        ("compute_mix_exact (float)", lambda: compute_mix_exact(1.73, 1250.0, 14, 500)),
+        ("compute_mix_exact (str)", lambda: compute_mix_exact("1.73", "1250", 14, 500)),
+        ("compute_mix_exact (odd)", lambda: compute_mix_exact(1.73456, 1250.0, 14, 500)),
+    ):
+        us = min(timeit.repeat(fn, number=n, repeat=5)) / n * 1e6
+        print(f"{label:<26} {us:>8.2f}")
+
+if __name__ == "__main__":
+    main()
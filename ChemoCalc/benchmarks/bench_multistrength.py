@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+compute_mix_multi: time per call, cold (nothing memoized) and warm (a cohort
+rerun), for 2-6 strengths and 28-90 day courses. tests/test_multistrength.py
+checks the choice against a brute-force search.
+
+    python benchmarks/bench_multistrength.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.multistrength import _choose_levels, _daily_levels, compute_mix_multi  # noqa: E402
+
+def main():
+    rng = random.Random(7)
+    print(f"{'strengths':<30} {'days':>5} {'cold us':>9} {'warm us':>9}")
+    for strengths in ((150, 500), (100, 150, 500), (50, 100, 150, 500), (25, 50, 100, 150, 500),
+                      (5, 25, 50, 100, 150, 500)):
+        for days in (28, 90):
+            bsas = [round(rng.uniform(1.3, 2.4), 2) for _ in range(200)]
+
+            def cold():
+                _daily_levels.cache_clear()
+                _choose_levels.cache_clear()
+                for b in bsas:
+                    compute_mix_multi(b, 1250, days, strengths)
+
+            def warm():
+                for b in bsas:
+                    compute_mix_multi(b, 1250, days, strengths)
+
+            c = min(timeit.repeat(cold, number=1, repeat=5)) / len(bsas) * 1e6
+            w = min(timeit.repeat(warm, number=1, repeat=5)) / len(bsas) * 1e6
+            print(f"{str(strengths):<30} {days:>5} {c:>9.1f} {w:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+compress_runs / is_strict_alternating: list path vs the NumPy path for ndarrays,
+timed over 7 to 36500 days to show where NUMPY_MIN_DAYS should sit.
+tests/test_runs.py checks that both return exactly the same values.
+
+    python benchmarks/bench_numpy_runs.py
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import (  # noqa: E402
+    compress_runs, is_strict_alternating, _compress_runs_np, _is_strict_alternating_np,
+)
+
+def main():
+    print(f"{'function':<22} {'shape':<8} {'days':>6} {'list us':>10} {'numpy us':>10} {'speedup':>8}")
+    for days in (7, 21, 64, 84, 365, 3650, 36500):
+        # alt: alternating but for the last day, so the list path scans to the end (one run per day);
+        # weekly: 5 high / 2 low every week; blocks: front-loaded, two runs.
+        alt = [2 if i % 2 == 0 else 1 for i in range(days)]
+        alt[-1] = 2
+        shapes = (("alt", alt), ("weekly", [2 if i % 7 < 5 else 1 for i in range(days)]),
+                  ("blocks", [2] * (days * 7 // 10) + [1] * (days - days * 7 // 10)))
+        n = max(20, 200000 // days)
+        for shape, seq in shapes:
+            a = np.asarray(seq, dtype=np.int64)
+            for fn, np_fn in ((compress_runs, _compress_runs_np), (is_strict_alternating, _is_strict_alternating_np)):
+                if fn is is_strict_alternating and shape != "alt":
+                    continue
+                ref = min(timeit.repeat(lambda: fn(seq), number=n, repeat=5)) / n * 1e6
+                new = min(timeit.repeat(lambda: np_fn(a), number=n, repeat=5)) / n * 1e6
+                print(f"{fn.__name__:<22} {shape:<8} {days:>6} {ref:>10.1f} {new:>10.1f} {ref / new:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
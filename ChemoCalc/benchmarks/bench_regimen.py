@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Multi-cycle regimens: cost of schedule + totals + Sig as the cycle count
+grows, with a cold and a warm template cache, next to building the per-day
+list cycle by cycle. tests/test_regimen.py checks that both agree.
+
+    python benchmarks/bench_regimen.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import SCHEDULE_MODES  # noqa: E402
+from chemocalc.regimen import _cycle_template, compute_regimen  # noqa: E402
+from tests.test_regimen import per_day_list  # noqa: E402
+
+def main():
+    print(f"{'cycles':>6} {'days':>6} {'cold us':>9} {'warm us':>9} {'per-day list us':>16}")
+    for cycles in (1, 8, 17, 52, 200):
+        phases = [(1250, 14, 7, cycles)]
+
+        def cold():
+            _cycle_template.cache_clear()
+            return compute_regimen(1.73, 500, phases, SCHEDULE_MODES[1])
+
+        def warm():
+            return compute_regimen(1.73, 500, phases, SCHEDULE_MODES[1])
+
+        def listed():
+            days = per_day_list(1.73, 500, phases, SCHEDULE_MODES[1])
+            return sum(days)
+
+        n = 300
+        c = min(timeit.repeat(cold, number=n, repeat=5)) / n * 1e6
+        w = min(timeit.repeat(warm, number=n, repeat=5)) / n * 1e6
+        lst = min(timeit.repeat(listed, number=20, repeat=3)) / 20 * 1e6
+        print(f"{cycles:>6} {cycles * 21:>6} {c:>9.1f} {w:>9.1f} {lst:>16.1f}")
+
+if __name__ == "__main__":
+    main()
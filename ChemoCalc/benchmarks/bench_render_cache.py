@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Sig/calendar render memo on a cohort: uncached vs cached, with hit rates.
+
+A cohort of capecitabine-like orders (BSA 1.40-2.20, one protocol dose, a few
+course lengths, every mode) is rendered twice, once with SIG_CACHE and
+CALENDAR_CACHE disabled and once enabled, and the timings and cache_stats()
+are printed. tests/test_render_cache.py checks that both give the same output.
+
+    python benchmarks/bench_render_cache.py [n_orders]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import SIG_CACHE, CALENDAR_CACHE, cache_stats  # noqa: E402
+from tests.test_render_cache import cohort, render_all  # noqa: E402
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    orders = list(cohort(n))
+    sizes = SIG_CACHE.maxsize, CALENDAR_CACHE.maxsize
+
+    SIG_CACHE.resize(0)
+    CALENDAR_CACHE.resize(0)
+    t0 = time.perf_counter()
+    render_all(orders)
+    uncached = time.perf_counter() - t0
+
+    SIG_CACHE.resize(sizes[0])
+    CALENDAR_CACHE.resize(sizes[1])
+    for c in (SIG_CACHE, CALENDAR_CACHE):
+        c.clear()
+        c.hits = c.misses = c.evictions = 0
+    t0 = time.perf_counter()
+    render_all(orders)
+    cached = time.perf_counter() - t0
+
+    print(f"{n} orders")
+    print(f"uncached {uncached * 1e3:8.1f} ms  ({uncached / n * 1e6:.1f} us/order)")
+    print(f"cached   {cached * 1e3:8.1f} ms  ({cached / n * 1e6:.1f} us/order)  {uncached / cached:.1f}x")
+    for name, st in cache_stats().items():
+        print(f"{name:<9} hit rate {st['hit_rate']:.1%}  hits {st['hits']}  misses {st['misses']}  "
+              f"evictions {st['evictions']}  size {st['size']}/{st['maxsize']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Provider RTF text: one-pass rtf_ascii vs the original sanitize-then-escape
+chain, timed on calendars of 7 to 3650 days. tests/test_rtf.py checks that
+both give the same text.
+
+    python benchmarks/bench_rtf_sanitize.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import rtf_ascii, prepare_documents  # noqa: E402
+from tests.test_rtf import reference_chain  # noqa: E402
+
+def main():
+    print(f"{'days':>6} {'text':>8} {'chars':>8} {'chain us':>10} {'one-pass us':>12} {'speedup':>8}")
+    for days in (7, 21, 84, 365, 3650):
+        docs = prepare_documents(1.70, 50.0, days, 50, "Alternating high/low")
+        text = docs["summary"] + "\n" + docs["pharmacy"] + "\n" + docs["calendar"]
+        # Generated text is already ASCII; hand-edited text often is not.
+        unicode_text = text.replace("m^2", "m²").replace(" -> ", " → ").replace("; ", " • ")
+        for kind, t in (("ascii", text), ("unicode", unicode_text)):
+            n = max(20, 200000 // len(t))
+            ref = min(timeit.repeat(lambda: reference_chain(t, True), number=n, repeat=5)) / n * 1e6
+            new = min(timeit.repeat(lambda: rtf_ascii(t, newlines=True), number=n, repeat=5)) / n * 1e6
+            print(f"{days:>6} {kind:>8} {len(t):>8} {ref:>10.1f} {new:>12.1f} {ref / new:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
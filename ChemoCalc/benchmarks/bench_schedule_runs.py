@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+compress_runs / is_strict_alternating on a Schedule vs on the plain list:
+time per call for alternating and weekly schedules at 21, 365 and 3650
+days. tests/test_runs.py checks that both paths agree.
+
+    python benchmarks/bench_schedule_runs.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import SCHEDULE_MODES, arrange_by_mode, compress_runs, is_strict_alternating  # noqa: E402
+
+def main():
+    print(f"{'schedule':<13} {'days':>5} {'fn':<22} {'Schedule us':>12} {'list us':>9}")
+    for mode in (SCHEDULE_MODES[2], SCHEDULE_MODES[1]):
+        for days in (21, 365, 3650):
+            sched = arrange_by_mode(days, days // 2, 2.5, 3, 2, mode)
+            days_list = sched.tolist()
+            for fn in (compress_runs, is_strict_alternating):
+                n = max(10, 20000 // days)
+                ts = min(timeit.repeat(lambda: fn(sched), number=n, repeat=5)) / n * 1e6
+                tl = min(timeit.repeat(lambda: fn(days_list), number=n, repeat=5)) / n * 1e6
+                print(f"{mode[:13]:<13} {days:>5} {fn.__name__:<22} {ts:>12.1f} {tl:>9.1f}")
+
+if __name__ == "__main__":
+    main()
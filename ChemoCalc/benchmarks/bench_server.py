@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Load test for chemocalc.server: many concurrent keep-alive clients on localhost.
+
+Starts the service in a subprocess, opens --clients connections, and has each
+send --requests POST /v1/schedule requests back to back on its connection
+(plus a few /v1/calendar and /v1/batch calls), then prints throughput and
+latency percentiles. Run with --max-batch 1 to see the effect of request
+coalescing. tests/test_server.py checks the responses themselves.
+
+    python benchmarks/bench_server.py [--clients 200] [--requests 50] [--workers N] [--pool process]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from tests.test_server import orders, request  # noqa: E402
+
+async def client(port: int, cid: int, n: int, latencies: list, errors: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for k, order in enumerate(orders(n, seed=cid)):
+            if k % 25 == 24:
+                path, body = "/v1/batch", {"op": "schedule", "orders": [order, order]}
+            elif k % 10 == 9:
+                path, body = "/v1/calendar", order
+            else:
+                path, body = "/v1/schedule", order
+            t0 = time.perf_counter()
+            status, payload = await request(reader, writer, path, body)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append((path, status, payload[:200]))
+    finally:
+        writer.close()
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def wait_up(port: int, proc):
+    for _ in range(200):
+        if proc.poll() is not None:
+            raise SystemExit("server exited during startup")
+        try:
+            _, w = await asyncio.open_connection("127.0.0.1", port)
+            w.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise SystemExit("server did not start")
+
+async def run(args, port: int, proc):
+    await wait_up(port, proc)
+    latencies, errors = [], []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(port, c, args.requests, latencies, errors) for c in range(args.clients)))
+    wall = time.perf_counter() - t0
+    if errors:
+        print(f"{len(errors)} requests failed, first: {errors[0]}")
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1e3  # noqa: E731
+    print(f"{len(latencies)} requests from {args.clients} keep-alive clients")
+    print(f"{len(latencies) / wall:8.0f} req/s   p50 {pct(50):.1f} ms   p95 {pct(95):.1f} ms   "
+          f"p99 {pct(99):.1f} ms   max {latencies[-1] * 1e3:.1f} ms")
+
+def main():
+    ap = argparse.ArgumentParser(description="chemocalc.server load test")
+    ap.add_argument("--clients", type=int, default=200)
+    ap.add_argument("--requests", type=int, default=50, help="requests per client")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--pool", choices=["process", "thread"], default="process")
+    ap.add_argument("--max-batch", type=int, default=64)
+    args = ap.parse_args()
+    port = free_port()
+    cmd = [sys.executable, "-m", "chemocalc.server", "--port", str(port), "--pool", args.pool,
+           "--max-batch", str(args.max_batch)]
+    if args.workers:
+        cmd += ["--workers", str(args.workers)]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(run(args, port, proc))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+ScheduleStore: bulk write throughput and index-backed lookups.
+
+1) Writes n schedules (default 100,000; 5,000 patients) into a fresh
+   database with add_orders (executemany in batches, one transaction), timing the
+   compute and the insert separately. For comparison, a small sample is
+   also written one autocommitted INSERT at a time.
+2) Times lookups by patient.
+
+tests/test_store.py checks the round trip and that lookups use their indexes.
+
+    python benchmarks/bench_store.py [n] [--db path]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.store import COLUMNS, ScheduleStore, schedule_record  # noqa: E402
+from tests.test_store import orders  # noqa: E402
+
+def main():
+    ap = argparse.ArgumentParser(description="ScheduleStore benchmark")
+    ap.add_argument("n", type=int, nargs="?", default=100000)
+    ap.add_argument("--patients", type=int, default=5000)
+    ap.add_argument("--db", default=None, help="database path (default: a temp file, removed afterwards)")
+    args = ap.parse_args()
+    tmpdir = None
+    if args.db is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.db = os.path.join(tmpdir.name, "bench.db")
+
+    t0 = time.perf_counter()
+    records = [schedule_record(o) for o in orders(args.n, args.patients)]
+    compute_s = time.perf_counter() - t0
+
+    with ScheduleStore(args.db) as store:
+        t0 = time.perf_counter()
+        store.put_many(records)
+        insert_s = time.perf_counter() - t0
+        print(f"{args.n} schedules: compute {compute_s:.2f} s, batched insert {insert_s:.2f} s "
+              f"({args.n / insert_s:,.0f} rows/s)")
+
+        sample = [(f"single{i}",) + r[1:] for i, r in enumerate(records[:500])]
+        db = store._db
+        sql = f"INSERT INTO schedules ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        t0 = time.perf_counter()
+        for r in sample:
+            db.execute(sql, r)  # autocommit: one transaction per row
+        single_s = time.perf_counter() - t0
+        print(f"one transaction per row: {len(sample) / single_s:,.0f} rows/s "
+              f"(~{args.n / (len(sample) / single_s):.0f} s for {args.n})")
+
+        ids = [f"MRN{i:06d}" for i in random.Random(2).sample(range(args.patients), 1000)]
+        t0 = time.perf_counter()
+        rows = sum(len(store.by_patient(p)) for p in ids)
+        lookup_s = time.perf_counter() - t0
+        print(f"by_patient: {lookup_s / len(ids) * 1e6:.0f} us per patient ({rows / len(ids):.1f} schedules each)")
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+if __name__ == "__main__":
+    main()
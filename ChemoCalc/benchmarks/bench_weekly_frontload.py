@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Weekly front-load: closed-form arranger vs the original per-day fill, timed.
+
+tests/test_arrangers.py proves the two give the same schedule.
+
+    python benchmarks/bench_weekly_frontload.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import arrange_weekly_frontload  # noqa: E402
+from tests.test_arrangers import reference_weekly_frontload  # noqa: E402
+
+def main():
+    print(f"{'days':>6} {'reference us':>14} {'closed-form us':>15} {'speedup':>8}")
+    for days in (7, 21, 84, 365, 3650):
+        exact_tabs = 1.7
+        ceil_days = int(round(days * exact_tabs - days))
+        args = (days, ceil_days, exact_tabs, 2, 1)
+        n = max(20, 20000 // days)
+        ref = min(timeit.repeat(lambda: reference_weekly_frontload(*args), number=n, repeat=5)) / n * 1e6
+        new = min(timeit.repeat(lambda: arrange_weekly_frontload(*args), number=n, repeat=5)) / n * 1e6
+        print(f"{days:>6} {ref:>14.1f} {new:>15.1f} {ref / new:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
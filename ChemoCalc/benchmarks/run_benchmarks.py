@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the chemocalc core, with a regression gate.
+
+Times every public core function over course lengths of 7, 21, 84, 365 and
+3650 days, plus compute_mix over cohort batch sizes, and writes the results
+as JSON. If a baseline is given, it exits 1 when any case is slower than
+the baseline by more than --threshold percent and by more than
+--min-delta-us microseconds.
+
+    python benchmarks/run_benchmarks.py -o bench.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 25
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+
+Timings are the median of --repeat runs, in microseconds per call, with the
+Sig/calendar render memo disabled so repeated calls measure real work (see
+bench_render_cache.py for the cached path). Each timing run is paired with
+a short run of a fixed pure-Python calibration loop, and the gate compares
+the median case/calibration ratios, so a machine that is slower across the
+board (CPU frequency, a busy neighbour) does not fail every case. Cases over the
+limit are timed again (--confirm times) and count only if every attempt
+regresses. Baselines are machine-specific: regenerate
+benchmarks/baseline.json on the machine that runs the gate.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from typing import Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chemocalc.core import (  # noqa: E402
+    compute_mix, arrange_frontload_overall, arrange_weekly_frontload, arrange_alternating,
+    compress_runs, is_strict_alternating, format_pharmacy_snippet, make_calendar_text,
+    make_provider_summary, make_patient_intro, ascii_sanitize, rtf_ascii, export_provider_rtf, export_patient_rtf,
+    SIG_CACHE, CALENDAR_CACHE,
+)
+
+COURSE_LENGTHS = (7, 21, 84, 365, 3650)
+BATCH_SIZES = (1, 100, 1000, 10000)
+
+# Fixed inputs: 1.7 m^2 at 50 mg/m^2/day with 50 mg tablets is 1.7 tab/day,
+# so every schedule mixes 2- and 1-tablet days.
+BSA, DOSE, TAB = 1.70, 50.0, 50
+
+# Seconds of calibration loop timed before each timing run (see time_call).
+CALIBRATION_TIME = 0.01
+
+def _course_cases(days: int, provider_path: str, patient_path: str):
+    p = {"days": days}
+    mix = compute_mix(BSA, DOSE, days, TAB)
+    c, f, cd, et = mix["ceil_tabs"], mix["floor_tabs"], mix["ceil_days"], mix["exact_tabs"]
+    alternating = arrange_alternating(days, cd, c, f)
+    per_day = list(alternating)
+    summary = make_provider_summary(BSA, DOSE, days, TAB, "Alternating high/low", mix, alternating)
+    sig = format_pharmacy_snippet(alternating, TAB, days, DOSE, BSA)
+    cal = make_calendar_text(alternating, TAB)
+    total = sum(per_day)
+    intro = make_patient_intro(days, TAB)
+    return [
+        ("compute_mix", p, lambda: compute_mix(BSA, DOSE, days, TAB)),
+        ("arrange_frontload_overall", p, lambda: arrange_frontload_overall(days, cd, c, f)),
+        ("arrange_weekly_frontload", p, lambda: arrange_weekly_frontload(days, cd, et, c, f)),
+        ("arrange_alternating", p, lambda: arrange_alternating(days, cd, c, f)),
+        ("compress_runs", p, lambda: compress_runs(per_day)),
+        ("is_strict_alternating", p, lambda: is_strict_alternating(per_day)),
+        ("format_pharmacy_snippet", p, lambda: format_pharmacy_snippet(alternating, TAB, days, DOSE, BSA)),
+        ("make_calendar_text", p, lambda: make_calendar_text(alternating, TAB)),
+        ("ascii_sanitize", p, lambda: ascii_sanitize(summary + "\n" + sig + "\n" + cal)),
+        ("rtf_ascii", p, lambda: rtf_ascii(summary + "\n" + sig + "\n" + cal, newlines=True)),
+        ("export_provider_rtf", p, lambda: export_provider_rtf(provider_path, "Bench", summary, sig, cal, total)),
+        ("export_patient_rtf", p, lambda: export_patient_rtf(patient_path, "Bench", intro, cal, total)),
+    ]
+
+def _batch_cases(n: int):
+    bsas = [1.2 + (i % 141) / 100 for i in range(n)]
+    days = [(7, 21, 84, 365)[i % 4] for i in range(n)]
+    cases = [("compute_mix[cohort]", {"batch": n}, lambda: [compute_mix(b, DOSE, d, TAB) for b, d in zip(bsas, days)])]
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return cases  # compute_mix_batch needs NumPy
+    from chemocalc.core import compute_mix_batch
+    cases.append(("compute_mix_batch", {"batch": n}, lambda: compute_mix_batch(bsas, DOSE, days, TAB)))
+    return cases
+
+def _cases(tmpdir: str):
+    """Yield (name, params, callable) for every benchmark case."""
+    provider_path = os.path.join(tmpdir, "provider.doc")
+    patient_path = os.path.join(tmpdir, "patient.doc")
+    for days in COURSE_LENGTHS:
+        yield from _course_cases(days, provider_path, patient_path)
+    for n in BATCH_SIZES:
+        yield from _batch_cases(n)
+
+def case_id(name: str, params: dict) -> str:
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+def _loop_count(fn, min_time: float) -> int:
+    # Calls per timing run so that one run lasts at least min_time seconds.
+    number = 1
+    while True:
+        t = timeit.timeit(fn, number=number)
+        if t >= min_time:
+            return number
+        number *= 2 if t == 0 else max(2, min(10, int(min_time / t * 1.2) + 1))
+
+def _calibration_work():
+    # Dict, int and str work of the same kind as the core, independent of chemocalc.
+    d = {}
+    for i in range(2000):
+        d[i % 97] = d.get(i % 97, 0) + i
+    return ";".join(f"{k}:{v}" for k, v in d.items())
+
+def time_call(fn, repeat: int, min_time: float) -> Tuple[float, float]:
+    """(microseconds per call, calls relative to the calibration loop), medians of repeat runs.
+
+    Every run of fn (at least min_time seconds) follows a short run of
+    _calibration_work, and the ratio of the two is taken per pair, so a
+    slowdown of the whole machine while the case runs cancels out.
+    """
+    number = _loop_count(fn, min_time)
+    cal_number = _loop_count(_calibration_work, CALIBRATION_TIME)
+    times, ratios = [], []
+    for _ in range(repeat):
+        cal = timeit.timeit(_calibration_work, number=cal_number) / cal_number
+        t = timeit.timeit(fn, number=number) / number
+        times.append(t)
+        ratios.append(t / cal)
+    return statistics.median(times) * 1e6, statistics.median(ratios)
+
+def run(filter_text: str = "", repeat: int = 9, min_time: float = 0.05, only=None) -> dict:
+    """Time every case (or those whose id contains filter_text, or whose id is in only)."""
+    results = {}
+    SIG_CACHE.resize(0)
+    CALENDAR_CACHE.resize(0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, params, fn in _cases(tmpdir):
+            cid = case_id(name, params)
+            if (filter_text and filter_text not in cid) or (only is not None and cid not in only):
+                continue
+            us, relative = time_call(fn, repeat, min_time)
+            results[cid] = {"function": name, "params": params, "us_per_call": us, "relative": relative}
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "min_time": min_time,
+            "statistic": "median",
+        },
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, threshold_pct: float, min_delta_us: float = 0.0,
+            calibrated: bool = True):
+    """Return (rows, regressions); each row is (case, baseline_us, current_us, change_pct).
+
+    With calibrated (and "relative" in both results) the baseline time is
+    restated at the current machine speed: its relative value times the
+    current run's microseconds per calibration unit. A regression is over
+    threshold_pct and over min_delta_us.
+    """
+    rows, regressions = [], []
+    for cid, cur in current["results"].items():
+        base = baseline.get("results", {}).get(cid)
+        if base is None:
+            rows.append((cid, None, cur["us_per_call"], None))
+            continue
+        if calibrated and base.get("relative") and cur.get("relative"):
+            base_us = base["relative"] * cur["us_per_call"] / cur["relative"]
+        else:
+            base_us = base["us_per_call"]
+        change = (cur["us_per_call"] / base_us - 1.0) * 100.0
+        rows.append((cid, base_us, cur["us_per_call"], change))
+        if change > threshold_pct and cur["us_per_call"] - base_us > min_delta_us:
+            regressions.append(cid)
+    return rows, regressions
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-o", "--output", help="write results JSON here")
+    ap.add_argument("--baseline", help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=25.0,
+                    help="fail when a case is this many percent slower than baseline (default 25)")
+    ap.add_argument("--min-delta-us", type=float, default=1.0,
+                    help="ignore slowdowns smaller than this many microseconds per call (default 1)")
+    ap.add_argument("--confirm", type=int, default=3,
+                    help="time regressed cases again this many times; all must regress (default 3)")
+    ap.add_argument("--no-calibrate", action="store_true", help="compare raw timings, without machine scaling")
+    ap.add_argument("--save-baseline", metavar="PATH", help="write results as a new baseline")
+    ap.add_argument("--filter", default="", help="only run cases whose id contains this text")
+    ap.add_argument("--repeat", type=int, default=9, help="timing runs per case, median taken (default 9)")
+    ap.add_argument("--min-time", type=float, default=0.05, help="seconds per timing run (default 0.05)")
+    args = ap.parse_args(argv)
+
+    current = run(args.filter, args.repeat, args.min_time)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(current, f, indent=1, sort_keys=True)
+
+    if not args.baseline:
+        for cid, r in current["results"].items():
+            print(f"{cid:<48} {r['us_per_call']:>14.2f} us")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    calibrated = not args.no_calibrate
+    rows, regressions = compare(current, baseline, args.threshold, args.min_delta_us, calibrated)
+    for _ in range(args.confirm):
+        if not regressions:
+            break
+        retry = run(repeat=args.repeat, min_time=args.min_time, only=set(regressions))
+        key = "relative" if calibrated else "us_per_call"
+        for cid, r in retry["results"].items():
+            if r[key] < current["results"][cid].get(key, float("inf")):
+                current["results"][cid] = r
+        rows, regressions = compare(current, baseline, args.threshold, args.min_delta_us, calibrated)
+    if calibrated:
+        print("baseline us: the baseline restated at this run's machine speed (see --no-calibrate)")
+    print(f"{'case':<48} {'baseline us':>14} {'current us':>14} {'change':>8}")
+    for cid, base, cur, change in rows:
+        base_s = f"{base:14.2f}" if base is not None else f"{'-':>14}"
+        change_s = f"{change:+7.1f}%" if change is not None else f"{'new':>8}"
+        flag = "  REGRESSION" if cid in regressions else ""
+        print(f"{cid:<48} {base_s} {cur:14.2f} {change_s}{flag}")
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed more than {args.threshold:g}% against {args.baseline}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,17 @@
+"""Tk-free core of the Chemotherapy Calculator Calendar."""
+
+from .core import (
+    APP_TITLE, DEFAULTS, SCHEDULE_MODES,
+    Schedule, total_tablets,
+    compute_mix, compute_mix_batch,
+    arrange_frontload_overall, arrange_weekly_frontload, arrange_alternating, arrange_by_mode,
+    ARRANGERS, register_arranger, get_arranger,
+    NUMPY_MIN_DAYS, compress_runs, is_strict_alternating, smallest_period, format_pharmacy_snippet,
+    LruCache, SIG_CACHE, CALENDAR_CACHE, run_signature, cache_stats,
+    make_calendar_text, iter_calendar_lines, iter_calendar_pages, calendar_cell_width, diff_lines,
+    make_provider_summary, make_patient_intro, parse_order, parse_flag,
+    ascii_sanitize, rtf_ascii, RtfWriter, export_provider_rtf, export_patient_rtf,
+)
+from .bsa import BSA_FORMULAS, body_surface_area, mosteller, dubois, haycock, gehan_george
+from .multistrength import compute_mix_multi, tablet_combo, arrange_multi_by_mode, format_combo
+from .regimen import REST_LABEL, cycle_template, compute_regimen, format_regimen_sig, iter_regimen_calendar, make_regimen_calendar
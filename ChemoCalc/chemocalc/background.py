@@ -0,0 +1,69 @@
+"""
+Latest-wins background calculation for interactive front ends (Tk-free).
+
+The GUI submits a job for every (debounced) edit. Jobs run one at a time on
+a single worker thread. A job that has not started yet is cancelled when a
+newer one arrives, and results of superseded jobs are dropped. The UI
+thread collects results with poll(), e.g. from a Tk after() loop, so
+widgets are only touched from the thread that owns them.
+
+    calc = BackgroundCalculator()
+    calc.submit(prepare_documents, bsa, mg_day, days, tab, mode, tag=inputs)
+    ...
+    done = calc.poll()            # None, or (tag, future) for the newest job
+    if done:
+        tag, fut = done
+        docs = fut.result()       # re-raises the job's exception
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+class BackgroundCalculator:
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chemocalc-calc")
+        self._done: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._gen = 0
+        self._delivered = 0
+        self._future = None
+
+    def submit(self, fn: Callable, *args, tag: Any = None) -> int:
+        """Queue fn(*args); any older job's result will be discarded. Returns the job's generation."""
+        if self._future is not None:
+            self._future.cancel()  # no-op if it is already running
+        self._gen += 1
+        gen = self._gen
+        fut = self._executor.submit(fn, *args)
+        fut.add_done_callback(lambda f: self._done.put((gen, tag, f)))
+        self._future = fut
+        return gen
+
+    def cancel_pending(self):
+        """Forget the newest job too (e.g. inputs became invalid); its result will be dropped."""
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+        self._gen += 1
+        self._delivered = self._gen
+
+    @property
+    def pending(self) -> bool:
+        return self._delivered != self._gen
+
+    def poll(self) -> Optional[Tuple[Any, Any]]:
+        """(tag, future) of the newest finished job, once; None if it is still running or stale."""
+        latest = None
+        while True:
+            try:
+                gen, tag, fut = self._done.get_nowait()
+            except queue.Empty:
+                break
+            if gen == self._gen and not fut.cancelled():
+                latest = (tag, fut)
+                self._delivered = gen
+        return latest
+
+    def shutdown(self):
+        self.cancel_pending()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,238 @@
+"""
+Process-pool batch runner: calendars, Sigs and both RTF exports per order.
+
+Orders are cut into chunks and each chunk is rendered in a worker process, so
+the CPU-heavy calendar and RTF work spreads across cores. Results come back in
+input order whatever order the workers finish in. Every order gets its own
+try/except, so one bad row shows up as an error result and the rest of its
+chunk still renders.
+
+export_zip puts both documents for every order, plus a manifest, into one
+ZIP archive instead of a directory.
+
+On Windows (spawn start method) call run_batch / export_zip from under
+``if __name__ == "__main__":``.
+"""
+
+import io
+import json
+import os
+import queue
+import re
+import threading
+import time
+import zipfile
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from .core import (
+    APP_TITLE, DEFAULTS, parse_order, prepare_documents, export_provider_rtf, export_patient_rtf, RtfWriter,
+)
+from .exportcache import export_order_cached
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+def _order_id(order) -> str:
+    # Rows are not trusted to be dicts (a JSON null or string); parse_order reports those.
+    return order.get("order_id", "") if isinstance(order, dict) else ""
+
+def _order_stem(order: dict, index: int) -> str:
+    oid = str(_order_id(order) or "").strip()
+    oid = _UNSAFE_NAME.sub("_", oid).strip("._")
+    return oid or f"order_{index:06d}"
+
+def _unique_stem(stem: str, index: int, used: set) -> str:
+    # Orders sharing an order_id (or sanitizing to the same name) get their input index appended.
+    if stem in used:
+        stem = f"{stem}_{index:06d}"
+        while stem in used:
+            stem += "_"
+    used.add(stem)
+    return stem
+
+def _stemmed(orders: Iterable[dict]) -> Iterator[tuple]:
+    # (index, order, file stem), assigned in input order in the parent so workers never share a name.
+    used = set()
+    for index, order in enumerate(orders):
+        yield index, order, _unique_stem(_order_stem(order, index), index, used)
+
+def render_order(order: dict, index: int, out_dir: str, default_mode: str = DEFAULTS["mode"],
+                 title: str = APP_TITLE, cache=None, stem: Optional[str] = None) -> dict:
+    """Schedule one order and write its provider and patient documents into out_dir.
+
+    Files are named {stem}_provider.doc and {stem}_patient.doc; stem defaults
+    to the sanitized order_id. run_batch makes every stem in a run unique.
+    With an ExportCache, documents already rendered for the same inputs are
+    copied from the cache instead of re-rendered.
+    """
+    t0 = time.perf_counter()
+    res = {"index": index, "order_id": _order_id(order), "ok": False}
+    try:
+        bsa, mg_day, days, tab, mode = parse_order(order, default_mode)
+        stem = stem or _order_stem(order, index)
+        provider_path = os.path.join(out_dir, f"{stem}_provider.doc")
+        patient_path = os.path.join(out_dir, f"{stem}_patient.doc")
+        if cache is not None:
+            status = export_order_cached(cache, provider_path, patient_path, bsa, mg_day, days, tab, mode, title)
+            pharm, total_pills = status.pop("sig"), status.pop("total_tablets")
+            res["cache"] = status
+        else:
+            docs = prepare_documents(bsa, mg_day, days, tab, mode)
+            pharm, total_pills = docs["pharmacy"], docs["total_pills"]
+            export_provider_rtf(provider_path, title, docs["summary"], pharm, docs["calendar"], total_pills)
+            export_patient_rtf(patient_path, title, docs["patient_intro"], docs["calendar"], total_pills)
+        res.update(ok=True, sig=pharm, total_tablets=total_pills,
+                   provider_path=provider_path, patient_path=patient_path)
+    except Exception as e:
+        res["error"] = f"{type(e).__name__}: {e}"
+    res["seconds"] = time.perf_counter() - t0
+    return res
+
+def _render_chunk(chunk: List[tuple], out_dir: str, default_mode: str, title: str, cache) -> List[dict]:
+    return [render_order(order, index, out_dir, default_mode, title, cache, stem) for index, order, stem in chunk]
+
+def _chunked(items: Iterable[tuple], chunk_size: int) -> Iterator[List[tuple]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _run_chunks(chunk_fn, items: Iterable[tuple], workers: Optional[int], chunk_size: int, *args) -> Iterator[dict]:
+    # items are (index, order, ...) tuples; chunk_fn(chunk, *args) -> list of result dicts,
+    # in process or across a pool; results in input order.
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in _chunked(items, chunk_size):
+            yield from chunk_fn(chunk, *args)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        chunks = _chunked(items, chunk_size)
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(chunk_fn, chunk, *args)))
+            if len(pending) >= workers * 2:
+                yield from _collect(*pending.popleft())
+        while pending:
+            yield from _collect(*pending.popleft())
+
+def run_batch(orders: Iterable[dict], out_dir: str, workers: Optional[int] = None, chunk_size: int = 32,
+              default_mode: str = DEFAULTS["mode"], title: str = APP_TITLE, cache=None) -> Iterator[dict]:
+    """Render every order across a process pool; yield one result dict per order, in input order.
+
+    workers defaults to os.cpu_count(); workers=1 renders in-process (no pool).
+    At most two chunks per worker are in flight, so a long or endless order
+    iterable is consumed lazily rather than loaded up front. Orders sharing an
+    order_id get distinct file names (the input index is appended). Pass an
+    ExportCache to reuse documents from earlier runs.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    os.makedirs(out_dir, exist_ok=True)
+    yield from _run_chunks(_render_chunk, _stemmed(orders), workers, chunk_size, out_dir, default_mode, title, cache)
+
+def _collect(chunk: List[tuple], future) -> List[dict]:
+    # render_order already traps per-order errors; this only fires if the
+    # worker itself died or the chunk could not be pickled.
+    try:
+        return future.result()
+    except Exception as e:
+        return [{"index": index, "order_id": _order_id(order), "ok": False,
+                 "error": f"{type(e).__name__}: {e}", "seconds": 0.0}
+                for index, order, *_ in chunk]
+
+# -------------------- Bulk ZIP export --------------------
+
+def render_order_bytes(order: dict, index: int, default_mode: str = DEFAULTS["mode"],
+                       title: str = APP_TITLE) -> dict:
+    """Like render_order, but returns both documents as bytes (provider_rtf, patient_rtf) instead of writing files."""
+    t0 = time.perf_counter()
+    res = {"index": index, "order_id": _order_id(order), "ok": False}
+    try:
+        bsa, mg_day, days, tab, mode = parse_order(order, default_mode)
+        docs = prepare_documents(bsa, mg_day, days, tab, mode)
+        provider, patient = io.BytesIO(), io.BytesIO()
+        with RtfWriter(provider) as w:
+            w.provider_document(title, docs["summary"], docs["pharmacy"], docs["calendar"], docs["total_pills"])
+        with RtfWriter(patient) as w:
+            w.patient_document(title, docs["patient_intro"], docs["calendar"], docs["total_pills"])
+        res.update(ok=True, stem=_order_stem(order, index), sig=docs["pharmacy"],
+                   total_tablets=docs["total_pills"],
+                   provider_rtf=provider.getvalue(), patient_rtf=patient.getvalue())
+    except Exception as e:
+        res["error"] = f"{type(e).__name__}: {e}"
+    res["seconds"] = time.perf_counter() - t0
+    return res
+
+def _render_bytes_chunk(chunk: List[tuple], default_mode: str, title: str) -> List[dict]:
+    return [render_order_bytes(order, index, default_mode, title) for index, order in chunk]
+
+_DONE = object()
+
+def _zip_writer(zf, results: queue.Queue, manifest: List[dict], failure: list):
+    used = set()
+    try:
+        while True:
+            res = results.get()
+            if res is _DONE:
+                return
+            t0 = time.perf_counter()
+            if res["ok"]:
+                stem = _unique_stem(res.pop("stem"), res["index"], used)
+                res["provider_member"] = f"{stem}_provider.doc"
+                res["patient_member"] = f"{stem}_patient.doc"
+                zf.writestr(res["provider_member"], res.pop("provider_rtf"))
+                zf.writestr(res["patient_member"], res.pop("patient_rtf"))
+            res["write_seconds"] = time.perf_counter() - t0
+            manifest.append(res)
+    except BaseException as e:
+        failure.append(e)
+        while results.get() is not _DONE:  # keep draining so the producer never blocks
+            pass
+
+def export_zip(orders: Iterable[dict], target, workers: Optional[int] = None, chunk_size: int = 32,
+               default_mode: str = DEFAULTS["mode"], title: str = APP_TITLE,
+               compression: int = zipfile.ZIP_DEFLATED) -> dict:
+    """Render provider and patient documents for every order into one ZIP archive.
+
+    target is a path or a writable binary file object. Orders render across a
+    process pool (as in run_batch); a single writer thread adds the members
+    as results arrive, and at most a few chunks of documents are held in
+    memory at once. The archive ends with manifest.json: one entry per
+    order with ok/error, member names, Sig, total tablets and timings.
+    Returns the run summary that is also stored in the manifest.
+    """
+    t0 = time.perf_counter()
+    manifest: List[dict] = []
+    failure: list = []
+    results = queue.Queue(maxsize=max(4, chunk_size * 2))
+    with zipfile.ZipFile(target, "w", compression=compression) as zf:
+        writer = threading.Thread(target=_zip_writer, args=(zf, results, manifest, failure),
+                                  name="chemocalc-zip-writer", daemon=True)
+        writer.start()
+        try:
+            for res in _run_chunks(_render_bytes_chunk, enumerate(orders), workers, chunk_size, default_mode, title):
+                if failure:
+                    break
+                results.put(res)
+        finally:
+            results.put(_DONE)
+            writer.join()
+        if failure:
+            raise failure[0]
+        summary = {
+            "orders": len(manifest),
+            "ok": sum(1 for r in manifest if r["ok"]),
+            "errors": sum(1 for r in manifest if not r["ok"]),
+            "seconds": time.perf_counter() - t0,
+        }
+        zf.writestr("manifest.json", json.dumps({"summary": summary, "orders": manifest}, indent=1))
+    return summary
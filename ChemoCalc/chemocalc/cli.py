@@ -0,0 +1,176 @@
+"""
+Headless command line: stream orders (CSV or JSON Lines) in, schedules out.
+
+    python -m chemocalc orders.csv -o schedules.jsonl
+    cat orders.jsonl | python -m chemocalc --in-format jsonl
+
+Each input row needs bsa, mg_per_m2_day, days and tablet_size_mg; mode,
+exact (true/false, overriding --exact for that row) and order_id are optional. Rows are read, scheduled and written one at a time, so
+memory stays flat however long the file is. --calendar adds the calendar grid
+to each record (--weeks-per-page N puts a form feed between printed pages). A row that fails (missing or
+non-numeric fields, NaN or infinite values, a JSONL line that is not a JSON
+object) is written with its input line number and error message, and the run
+carries on.
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+from .core import (
+    DEFAULTS, SCHEDULE_MODES, compute_mix, arrange_by_mode, format_pharmacy_snippet, iter_calendar_lines,
+    parse_flag, parse_order, total_tablets,
+)
+
+OUTPUT_FIELDS = [
+    "order_id", "bsa", "mg_per_m2_day", "days", "tablet_size_mg", "mode", "exact",
+    "exact_daily_mg", "exact_tabs", "floor_tabs", "ceil_tabs", "ceil_days", "floor_days",
+    "total_tablets", "per_day_tabs", "sig", "error",
+]
+
+def _guess_format(path: str, explicit: str) -> str:
+    if explicit != "auto":
+        return explicit
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+def read_orders(stream, fmt: str):
+    """Yield (line number, row) from a CSV or JSON Lines text stream, one at a time.
+
+    CSV rows are dicts; JSONL rows are the raw line, decoded by decode_order
+    inside the caller's per-row error handling.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield lineno, line
+
+def decode_order(row) -> dict:
+    """A row from read_orders as an order dict; ValueError if it is not a JSON object."""
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except ValueError as e:
+            raise ValueError(f"not valid JSON ({e})") from None
+    if not isinstance(row, dict):
+        raise ValueError("each line must be a JSON object")
+    return row
+
+def schedule_order(order: dict, default_mode: str = DEFAULTS["mode"], exact: bool = False,
+                   calendar: bool = False, weeks_per_page: int = 0) -> dict:
+    """Run compute_mix, the mode's arranger and the Sig (and optionally the calendar) for one order row.
+
+    The row's exact field, read with parse_flag as the server and store do,
+    overrides the exact argument.
+    """
+    out = {"order_id": order.get("order_id", "")}
+    try:
+        bsa, mg_day, days, tab, mode = parse_order(order, default_mode)
+        exact = parse_flag(order.get("exact"), "exact", exact)
+        out.update(bsa=bsa, mg_per_m2_day=mg_day, days=days, tablet_size_mg=tab, mode=mode, exact=exact)
+        mix = compute_mix(bsa, mg_day, days, tab, exact=exact)
+        per_day_tabs = arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"],
+                                       mix["ceil_tabs"], mix["floor_tabs"], mode)
+        rec = dict(mix)
+        rec["exact_daily_mg"] = float(mix["exact_daily_mg"])  # Fractions in exact mode
+        rec["exact_tabs"] = float(mix["exact_tabs"])
+        rec["total_tablets"] = total_tablets(per_day_tabs)
+        rec["per_day_tabs"] = per_day_tabs.tolist()
+        rec["sig"] = format_pharmacy_snippet(per_day_tabs, tab, days, mg_day, bsa)
+        if calendar:
+            rec["calendar"] = "\n".join(iter_calendar_lines(per_day_tabs, tab, weeks_per_page=weeks_per_page))
+    except (ValueError, ArithmeticError) as e:
+        out["error"] = str(e)
+        return out
+    out.update(rec)
+    return out
+
+class _CsvSink:
+    def __init__(self, stream, fields=OUTPUT_FIELDS):
+        self._w = csv.DictWriter(stream, fieldnames=fields, extrasaction="ignore")
+        self._w.writeheader()
+
+    def write(self, rec: dict):
+        rec = dict(rec)
+        if "per_day_tabs" in rec:
+            rec["per_day_tabs"] = " ".join(map(str, rec["per_day_tabs"]))
+        self._w.writerow(rec)
+
+class _JsonlSink:
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, rec: dict):
+        self._stream.write(json.dumps(rec, separators=(",", ":")) + "\n")
+
+def run(in_stream, out_stream, in_format: str, out_format: str, default_mode: str = DEFAULTS["mode"],
+        exact: bool = False, calendar: bool = False, weeks_per_page: int = 0):
+    """Schedule every order from in_stream into out_stream. Returns (rows, errors)."""
+    if out_format == "csv":
+        sink = _CsvSink(out_stream, OUTPUT_FIELDS[:-1] + ["calendar", "error"] if calendar else OUTPUT_FIELDS)
+    else:
+        sink = _JsonlSink(out_stream)
+    rows = errors = 0
+    for lineno, row in read_orders(in_stream, in_format):
+        try:
+            order = decode_order(row)
+        except ValueError as e:
+            rec = {"order_id": "", "error": str(e)}
+        else:
+            rec = schedule_order(order, default_mode, exact, calendar, weeks_per_page)
+        if "error" in rec:
+            rec["error"] = f"line {lineno}: {rec['error']}"
+        sink.write(rec)
+        rows += 1
+        errors += "error" in rec
+    return rows, errors
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m chemocalc",
+                                 description="Headless chemotherapy tablet scheduler (no GUI).")
+    ap.add_argument("input", nargs="?", default="-", help="orders file (CSV or JSONL); '-' or omitted for stdin")
+    ap.add_argument("-o", "--output", default="-", help="results file; '-' or omitted for stdout")
+    ap.add_argument("--in-format", choices=["auto", "csv", "jsonl"], default="auto",
+                    help="input format (default: from file extension, CSV for stdin)")
+    ap.add_argument("--out-format", choices=["auto", "csv", "jsonl"], default="auto",
+                    help="output format (default: from file extension, JSONL for stdout)")
+    ap.add_argument("--mode", choices=SCHEDULE_MODES, default=DEFAULTS["mode"],
+                    help="schedule mode for rows without a mode column")
+    ap.add_argument("--exact", action="store_true",
+                    help="integer arithmetic (BSA to 0.0001 m^2, doses to 1 ug) instead of floats")
+    ap.add_argument("--calendar", action="store_true", help="add the 7-column calendar text to each record")
+    ap.add_argument("--weeks-per-page", type=int, default=0, metavar="N",
+                    help="with --calendar: repeat the header every N weeks, pages separated by a form feed")
+    return ap
+
+def main(argv=None) -> int:
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if args.weeks_per_page < 0:
+        ap.error("--weeks-per-page must be zero or positive")
+    in_format = _guess_format(args.input, args.in_format)
+    out_format = args.out_format
+    if out_format == "auto":
+        out_format = "jsonl" if args.output == "-" else _guess_format(args.output, "auto")
+
+    in_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        rows, errors = run(in_stream, out_stream, in_format, out_format, args.mode, args.exact,
+                           args.calendar, args.weeks_per_page)
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+    if errors:
+        print(f"{errors} of {rows} order(s) failed; see the error column.", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,1182 @@
+"""
+Chemotherapy Calculator Calendar — core (no GUI imports)
+-------------------------------------------------------
+Dosing math, scheduling arrangements, Sig one-liner, calendar text and RTF
+exports. Shared by the Tk app (ChemoCalculatorCalendar.py) and the headless
+command line (python -m chemocalc), so batch workers never load tkinter.
+
+DISCLAIMER: Support tool only. Verify against protocol and clinical judgment.
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+import sys
+import threading
+from collections import OrderedDict
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import chain, islice, repeat
+from math import floor, isfinite
+
+from .bsa import body_surface_area
+
+# Worker processes import this module cold for every job, so it keeps to cheap
+# stdlib modules: typing is only needed for annotations (postponed above), and
+# decimal/fractions only for exact mode, which imports them on first use.
+# tests/test_import_time.py enforces the budget.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Dict, List, Tuple
+
+APP_TITLE = "Chemotherapy Calculator Calendar"
+
+DEFAULTS = {
+    "bsa": 1.70,
+    "mg_per_m2_day": 50.0,
+    "days": 21,
+    "tablet_size_mg": 50,
+    "mode": "Front-load overall",
+}
+
+SCHEDULE_MODES = [
+    "Front-load overall",
+    "Weekly front-load",
+    "Alternating high/low",
+]
+
+# -------------------- Core math --------------------
+
+# Bump whenever compute_mix or an arranger changes the schedule produced for the
+# same inputs, so stored schedules (chemocalc.store) show which rules made them.
+ALGORITHM_VERSION = 1
+
+def compute_mix(bsa: float, mg_per_m2_day: float, days: int, tablet_size_mg: int, exact: bool = False):
+    if exact:
+        return compute_mix_exact(bsa, mg_per_m2_day, days, tablet_size_mg)
+    if any(x <= 0 for x in (bsa, mg_per_m2_day, days, tablet_size_mg)):
+        raise ValueError("All inputs must be positive.")
+
+    exact_daily_mg = mg_per_m2_day * bsa
+    exact_tabs = exact_daily_mg / tablet_size_mg
+    f = int(floor(exact_tabs))
+    c = f if abs(exact_tabs - f) < 1e-12 else f + 1
+
+    total_exact_tabs = days * exact_tabs
+    ceil_days = 0 if c == f else int(round(total_exact_tabs - days * f))
+    ceil_days = max(0, min(days, ceil_days))
+
+    return {
+        "exact_daily_mg": exact_daily_mg,
+        "exact_tabs": exact_tabs,
+        "floor_tabs": f,
+        "ceil_tabs": c,
+        "ceil_days": ceil_days,
+        "floor_days": days - ceil_days,
+    }
+
+# Exact mode units: BSA in 1/10000 m^2, doses and tablet strengths in micrograms.
+BSA_SCALE = 10000
+DOSE_SCALE = 1000
+
+@lru_cache(maxsize=4096, typed=True)  # 1.20005 == Fraction(1.20005), but they quantize differently
+def _scaled_exact(x, scale: int) -> int:
+    from decimal import Decimal
+    from fractions import Fraction
+    if isinstance(x, float):
+        x = repr(float(x))  # its shortest decimal: 1.7, not 1.6999999999999999556
+    elif not isinstance(x, (Fraction, Decimal)):
+        x = str(x).strip()
+    return round(Fraction(x) * scale)  # Fraction rounds half to even
+
+def _scaled(x, scale: int) -> int:
+    """x in units of 1/scale, rounded half-even on its decimal value (1.7 -> 17000, not 16999)."""
+    if isinstance(x, int):
+        return x * scale
+    if isinstance(x, float) and not isfinite(x):
+        raise ValueError(f"Not a number: {x!r}")
+    try:
+        return _scaled_exact(x, scale)
+    except (ArithmeticError, ValueError, TypeError):
+        raise ValueError(f"Not a number: {x!r}") from None
+
+def compute_mix_exact(bsa, mg_per_m2_day, days: int, tablet_size_mg):
+    """compute_mix in integer arithmetic: no float division, no epsilon, no float round().
+
+    Inputs (int, float, str, Decimal or Fraction) are first quantized to
+    1/10000 m^2 and micrograms. exact_daily_mg and exact_tabs come back as
+    Fractions; the other keys are ints, as in compute_mix.
+    """
+    from fractions import Fraction
+    bsa_u = _scaled(bsa, BSA_SCALE)
+    dose_u = _scaled(mg_per_m2_day, DOSE_SCALE)
+    tab_u = _scaled(tablet_size_mg, DOSE_SCALE)
+    try:
+        days = int(days)
+    except (ArithmeticError, ValueError, TypeError):  # int(float("inf")) overflows
+        raise ValueError(f"Not a number: {days!r}") from None
+    if bsa_u <= 0 or dose_u <= 0 or days <= 0 or tab_u <= 0:
+        raise ValueError("All inputs must be positive.")
+
+    num = dose_u * bsa_u          # daily dose, in 1e-4 ug
+    den = tab_u * BSA_SCALE       # one tablet, same unit
+    f, rem = divmod(num, den)
+    c = f if rem == 0 else f + 1
+
+    # round(days * (exact_tabs - f)), half to even like round() on floats
+    ceil_days, r = divmod(days * rem, den)
+    if 2 * r > den or (2 * r == den and ceil_days % 2):
+        ceil_days += 1
+    ceil_days = min(days, ceil_days)
+
+    return {
+        "exact_daily_mg": Fraction(num, DOSE_SCALE * BSA_SCALE),
+        "exact_tabs": Fraction(num, den),
+        "floor_tabs": f,
+        "ceil_tabs": c,
+        "ceil_days": ceil_days,
+        "floor_days": days - ceil_days,
+    }
+
+def compute_mix_batch(bsa, mg_per_m2_day, days, tablet_size_mg):
+    """Columnar compute_mix over whole cohorts (NumPy arrays or array-likes).
+
+    Inputs broadcast against each other, so a single tablet size can be passed
+    as a scalar. Returns the same keys as compute_mix, each as an array, with
+    results identical to calling compute_mix row by row.
+    """
+    import numpy as np  # optional dependency; only the batch path needs it
+
+    bsa, mg_per_m2_day, days, tablet_size_mg = np.broadcast_arrays(
+        np.asarray(bsa, dtype=np.float64),
+        np.asarray(mg_per_m2_day, dtype=np.float64),
+        np.asarray(days),
+        np.asarray(tablet_size_mg, dtype=np.float64),
+    )
+    if days.dtype.kind not in "iu":
+        if not np.all(np.mod(days, 1) == 0):
+            raise ValueError("Days must be whole numbers.")
+    days = days.astype(np.int64)
+    if not (np.all(bsa > 0) and np.all(mg_per_m2_day > 0) and np.all(days > 0) and np.all(tablet_size_mg > 0)):
+        raise ValueError("All inputs must be positive.")
+
+    exact_daily_mg = mg_per_m2_day * bsa
+    exact_tabs = exact_daily_mg / tablet_size_mg
+    f = np.floor(exact_tabs).astype(np.int64)
+    is_whole = np.abs(exact_tabs - f) < 1e-12
+    c = np.where(is_whole, f, f + 1)
+
+    # np.rint rounds half to even, matching round() on floats.
+    total_exact_tabs = days * exact_tabs
+    ceil_days = np.where(is_whole, 0, np.rint(total_exact_tabs - days * f)).astype(np.int64)
+    ceil_days = np.clip(ceil_days, 0, days)
+
+    return {
+        "exact_daily_mg": exact_daily_mg,
+        "exact_tabs": exact_tabs,
+        "floor_tabs": f,
+        "ceil_tabs": c,
+        "ceil_days": ceil_days,
+        "floor_days": days - ceil_days,
+    }
+
+# -------------------- Schedule (run-length encoded) --------------------
+
+@lru_cache(maxsize=256)
+def _pattern_merges(pattern: tuple, repeats: bool) -> bool:
+    # True if two neighbouring runs of a segment's pattern have equal tabs
+    # (including last-to-first across a repetition), so its runs need merging.
+    if any(x[2] == y[2] for x, y in zip(pattern, pattern[1:])):
+        return True
+    return repeats and pattern[0][2] == pattern[-1][2]
+
+class Schedule:
+    """Per-day tablet counts stored as runs, never as one int per day.
+
+    A schedule is a sequence of segments. Each segment repeats a short pattern
+    of (start, length, tabs) runs every `period` days across `span` days, so
+    both plain run lists (one repetition) and periodic patterns such as
+    "2,1,2,1,..." or "weekly 5 high / 2 low" cost O(runs) memory. Indexing,
+    iteration, len(), total() and runs() work without expanding to a list,
+    and a Schedule compares equal to the plain list it represents.
+    """
+    __slots__ = ("_segs", "_offsets", "_days")
+
+    def __init__(self, segments=()):
+        # segments: iterable of (span, period, pattern) with pattern a tuple of
+        # (start, length, tabs) runs covering 0..period-1.
+        segs, offsets, day = [], [], 0
+        for span, period, pattern in segments:
+            if span <= 0:
+                continue
+            segs.append((span, period, tuple(pattern)))
+            offsets.append(day)
+            day += span
+        self._segs = tuple(segs)
+        self._offsets = tuple(offsets)
+        self._days = day
+
+    @classmethod
+    def from_runs(cls, runs) -> "Schedule":
+        """Build from (length, tabs) pairs; empty runs are dropped, equal neighbours merged."""
+        merged = []
+        for length, tabs in runs:
+            if length <= 0:
+                continue
+            if merged and merged[-1][1] == tabs:
+                merged[-1][0] += length
+            else:
+                merged.append([length, tabs])
+        return cls((length, length, ((0, length, tabs),)) for length, tabs in merged)
+
+    @classmethod
+    def from_list(cls, per_day_tabs) -> "Schedule":
+        return cls.from_runs((e - s + 1, t) for s, e, t in compress_runs(list(per_day_tabs)))
+
+    @classmethod
+    def periodic(cls, pattern_runs, days: int) -> "Schedule":
+        """Repeat the (length, tabs) pattern every sum(lengths) days, truncated to `days`."""
+        pattern, start = [], 0
+        for length, tabs in pattern_runs:
+            if length > 0:
+                pattern.append((start, length, tabs))
+                start += length
+        if not pattern:
+            return cls()
+        return cls([(days, start, pattern)])
+
+    def __add__(self, other: "Schedule") -> "Schedule":
+        if not isinstance(other, Schedule):
+            return NotImplemented
+        return Schedule(self._segs + other._segs)
+
+    def __len__(self) -> int:
+        return self._days
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._days))]
+        if i < 0:
+            i += self._days
+        if not 0 <= i < self._days:
+            raise IndexError("Schedule index out of range")
+        k = bisect_right(self._offsets, i) - 1
+        span, period, pattern = self._segs[k]
+        pos = (i - self._offsets[k]) % period
+        for start, length, tabs in pattern:
+            if pos < start + length:
+                return tabs
+
+    def __iter__(self):
+        return chain.from_iterable(self._iter_segments())
+
+    def _iter_segments(self):
+        for span, period, pattern in self._segs:
+            if span == period:
+                for start, length, tabs in pattern:
+                    yield repeat(tabs, length)
+                continue
+            cycle = [tabs for _, length, tabs in pattern for _ in range(length)]
+            reps, rem = divmod(span, period)
+            yield chain.from_iterable(repeat(cycle, reps))
+            yield cycle[:rem]
+
+    def iter_runs(self):
+        """Yield (start_day, end_day, tabs) runs, 1-based and merged across segments."""
+        cur_start = cur_end = cur_tabs = None
+        day = 0
+        for span, period, pattern in self._segs:
+            left = span
+            while left > 0:
+                for start, length, tabs in pattern:
+                    n = min(length, left)
+                    if tabs == cur_tabs:
+                        cur_end += n
+                    else:
+                        if cur_tabs is not None:
+                            yield (cur_start, cur_end, cur_tabs)
+                        cur_start, cur_end, cur_tabs = day + 1, day + n, tabs
+                    day += n
+                    left -= n
+                    if left == 0:
+                        break
+        if cur_tabs is not None:
+            yield (cur_start, cur_end, cur_tabs)
+
+    def runs(self) -> List[Tuple[int,int,int]]:
+        """Same output as compress_runs(list(self)), computed from the stored runs."""
+        out = []
+        day = 0
+        for span, period, pattern in self._segs:
+            if len(pattern) == 1:
+                seg = [(day + 1, day + span, pattern[0][2])]
+            elif _pattern_merges(pattern, span > period):
+                seg = [(s + day, e + day, t) for s, e, t in Schedule(((span, period, pattern),)).iter_runs()]
+            elif span <= period:
+                seg = [(day + s + 1, day + min(s + n, span), t) for s, n, t in pattern if s < span]
+            else:
+                # No two neighbouring runs merge, so the segment's runs are the pattern
+                # shifted once per repetition, then the cut-off last one. Many
+                # repetitions are built column by column (one zip of starts, ends and
+                # tabs per pattern run), which costs more to set up but less per run.
+                reps, rem = divmod(span, period)
+                end = day + reps * period
+                if reps < 64:
+                    seg = [(base + s + 1, base + s + n, t) for base in range(day, end, period) for s, n, t in pattern]
+                else:
+                    seg = list(chain.from_iterable(zip(*[
+                        zip(range(day + s + 1, end + s + 1, period), range(day + s + n, end + s + n, period),
+                            repeat(t))
+                        for s, n, t in pattern])))
+                seg += [(end + s + 1, end + min(s + n, rem), t) for s, n, t in pattern if s < rem]
+            if out and out[-1][2] == seg[0][2]:
+                out[-1] = (out[-1][0], seg[0][1], out[-1][2])
+                out.extend(islice(seg, 1, None))
+            else:
+                out.extend(seg)
+            day += span
+        return out
+
+    def total(self) -> int:
+        """Sum of tablets over all days, from run lengths and repeat counts."""
+        total = 0
+        for span, period, pattern in self._segs:
+            reps, rem = divmod(span, period)
+            total += reps * sum(length * tabs for _, length, tabs in pattern)
+            for start, length, tabs in pattern:
+                if start >= rem:
+                    break
+                total += min(length, rem - start) * tabs
+        return total
+
+    def tolist(self) -> List[int]:
+        out = []
+        for span, period, pattern in self._segs:
+            cycle = []
+            for _, length, tabs in pattern:
+                cycle += [tabs] * length
+            reps, rem = divmod(span, period)
+            out += cycle * reps if reps != 1 else cycle
+            out += cycle[:rem]
+        return out
+
+    def segments(self) -> Tuple[tuple, ...]:
+        """The stored (span, period, pattern) segments; Schedule(s.segments()) == s."""
+        return self._segs
+
+    def max_tabs(self) -> int:
+        """Largest daily tablet count (0 when empty), from the stored runs."""
+        return max((tabs for span, period, pattern in self._segs
+                    for start, length, tabs in pattern if start < span), default=0)
+
+    def __eq__(self, other):
+        if isinstance(other, Schedule):
+            return self._days == other._days and self.runs() == other.runs()
+        if isinstance(other, (list, tuple)):
+            return len(other) == self._days and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __hash__(self):
+        # Equal to the tuple of its days, so it must hash like that tuple.
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return f"Schedule(days={self._days}, runs={self.runs()!r})"
+
+def total_tablets(per_day_tabs) -> int:
+    if isinstance(per_day_tabs, Schedule):
+        return per_day_tabs.total()
+    return sum(per_day_tabs)
+
+# -------------------- Scheduling arrangements --------------------
+
+def _is_fraction(x) -> bool:
+    # Without importing fractions: if nothing has imported it, x cannot be one.
+    fractions = sys.modules.get("fractions")
+    return fractions is not None and isinstance(x, fractions.Fraction)
+
+def arrange_frontload_overall(days: int, ceil_days: int, c: int, f: int) -> Schedule:
+    return Schedule.from_runs([(ceil_days, c), (days - ceil_days, f)])
+
+def arrange_weekly_frontload(days: int, ceil_days_total: int, exact_tabs: float, c: int, f: int) -> Schedule:
+    # Distribute ceil-days week by week, placing them at the start of each 7-day block.
+    # Every week is "h highs then lows", so the schedule is a few groups of
+    # identical weeks, worked out arithmetically as (n_weeks, week_len, highs).
+    wk_f = int(floor(exact_tabs))
+    if _is_fraction(exact_tabs):  # compute_mix_exact: compare and round exactly
+        whole = exact_tabs == wk_f
+    else:
+        whole = abs(exact_tabs - wk_f) < 1e-12
+
+    def week_quota(week_len):
+        if whole:
+            return 0
+        return max(0, min(week_len, int(round(week_len * exact_tabs - week_len * wk_f))))
+
+    full_weeks, tail = divmod(days, 7)
+    remaining = ceil_days_total
+    groups = []
+    k = week_quota(7)
+    if k > 0 and remaining > 0:
+        n = min(full_weeks, remaining // k)
+        groups.append((n, 7, k))
+        remaining -= n * k
+        if n < full_weeks:
+            groups.append((1, 7, remaining))
+            groups.append((full_weeks - n - 1, 7, 0))
+            remaining = 0
+    else:
+        groups.append((full_weeks, 7, 0))
+    if tail:
+        h = max(0, min(week_quota(tail), remaining))
+        groups.append((1, tail, h))
+        remaining -= h
+
+    # If rounding left unplaced highs, place earliest first (fill weeks in order)
+    if remaining > 0:
+        filled = []
+        for n, week_len, h in groups:
+            free = week_len - h
+            if remaining <= 0 or free == 0:
+                filled.append((n, week_len, h))
+                continue
+            m = min(n, remaining // free)
+            filled.append((m, week_len, week_len))
+            remaining -= m * free
+            if m < n:
+                filled.append((1, week_len, h + remaining))
+                filled.append((n - m - 1, week_len, h))
+                remaining = 0
+        groups = filled
+
+    segments = []
+    for n, week_len, h in groups:
+        if h == 0 or h == week_len:
+            pattern = ((0, week_len, c if h else f),)
+        else:
+            pattern = ((0, h, c), (h, week_len - h, f))
+        segments.append((n * week_len, week_len, pattern))
+    return Schedule(segments)
+
+def arrange_alternating(days: int, ceil_days: int, c: int, f: int) -> Schedule:
+    # High/low pairs while both remain, then whatever is left over.
+    highs = max(0, min(ceil_days, days))
+    lows = days - highs
+    pairs = min(highs, lows)
+    return (Schedule.periodic([(1, c), (1, f)], 2 * pairs)
+            + Schedule.from_runs([(highs - pairs, c), (lows - pairs, f)]))
+
+# -------------------- Mode registry --------------------
+
+# Mode name -> arranger(days, ceil_days, exact_tabs, c, f) -> Schedule.
+# Lookups are a dict hit, so batch code can resolve a mode once and reuse it.
+ARRANGERS: Dict[str, Callable[[int, int, float, int, int], Schedule]] = {}
+
+def register_arranger(mode: str, arranger: Callable[[int, int, float, int, int], Schedule], replace: bool = False):
+    """Register a scheduling strategy under a mode name (also added to SCHEDULE_MODES).
+
+    Process-pool workers started with "spawn" only see strategies registered
+    at import time of the worker's modules, so third-party strategies should
+    be registered from an importable module, not under __main__.
+    """
+    if mode in ARRANGERS and not replace:
+        raise ValueError(f"Schedule mode already registered: {mode!r}")
+    ARRANGERS[mode] = arranger
+    if mode not in SCHEDULE_MODES:
+        SCHEDULE_MODES.append(mode)
+
+def get_arranger(mode: str) -> Callable[[int, int, float, int, int], Schedule]:
+    try:
+        return ARRANGERS[mode]
+    except KeyError:
+        raise ValueError(f"Unknown schedule mode: {mode!r}") from None
+
+def arrange_by_mode(days: int, ceil_days: int, exact_tabs: float, c: int, f: int, mode: str) -> Schedule:
+    return get_arranger(mode)(days, ceil_days, exact_tabs, c, f)
+
+def _frontload_overall(days: int, ceil_days: int, exact_tabs: float, c: int, f: int) -> Schedule:
+    return arrange_frontload_overall(days, ceil_days, c, f)
+
+def _alternating(days: int, ceil_days: int, exact_tabs: float, c: int, f: int) -> Schedule:
+    return arrange_alternating(days, ceil_days, c, f)
+
+register_arranger("Front-load overall", _frontload_overall)
+register_arranger("Weekly front-load", arrange_weekly_frontload)
+register_arranger("Alternating high/low", _alternating)
+
+# -------------------- Render memo (Sig / calendar) --------------------
+
+_MISSING = object()
+
+class LruCache:
+    """Thread-safe in-process LRU map with hit/miss/eviction counters; maxsize=0 disables caching."""
+    __slots__ = ("maxsize", "hits", "misses", "evictions", "_data", "_lock")
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 0:
+            raise ValueError("maxsize must be zero or positive.")
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_render(self, key, render: Callable[[], str]):
+        if self.maxsize:
+            with self._lock:
+                value = self._data.get(key, _MISSING)
+                if value is not _MISSING:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+        value = render()  # outside the lock; two threads may render the same key once each
+        with self._lock:
+            self.misses += 1
+            if self.maxsize:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                self._trim()
+        return value
+
+    def _trim(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, maxsize: int):
+        if maxsize < 0:
+            raise ValueError("maxsize must be zero or positive.")
+        with self._lock:
+            self.maxsize = maxsize
+            self._trim()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        looked_up = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._data), "maxsize": self.maxsize,
+                "hit_rate": self.hits / looked_up if looked_up else 0.0}
+
+# Keyed on the run signature, so any two patients with the same day-by-day
+# tablet pattern share an entry whatever their BSA. See cache_stats().
+SIG_CACHE = LruCache(maxsize=1024)
+CALENDAR_CACHE = LruCache(maxsize=512)
+
+def run_signature(per_day_tabs: List[int]) -> Tuple[Tuple[int, int, int], ...]:
+    """Hashable compress_runs(per_day_tabs): equal for equal day-by-day schedules."""
+    return tuple(per_day_tabs.runs() if isinstance(per_day_tabs, Schedule) else compress_runs(per_day_tabs))
+
+def _render_key(per_day_tabs):
+    # A Schedule's stored segments already are a compressed signature and cost
+    # O(segments) to hash, where runs() expands periodic segments run by run.
+    # Two equal schedules built differently just get separate entries.
+    # 2 == 2.0 but they render as "2" and "2.0", so the type of every day's
+    # count is part of the key (as runs of types: compress_runs merges 2 and
+    # 2.0 into one run); output never depends on what was rendered first.
+    if isinstance(per_day_tabs, Schedule):
+        sig = per_day_tabs._segs
+        return sig, tuple(type(t) for _, _, pattern in sig for _, _, t in pattern)
+    if _is_ndarray(per_day_tabs):
+        return tuple(compress_runs(per_day_tabs)), per_day_tabs.dtype.str
+    return tuple(compress_runs(per_day_tabs)), tuple(compress_runs(list(map(type, per_day_tabs))))
+
+def cache_stats() -> dict:
+    return {"sig": SIG_CACHE.stats(), "calendar": CALENDAR_CACHE.stats()}
+
+# -------------------- Pharmacy one-liner helpers --------------------
+
+# NumPy arrays shorter than this go through the plain-list code: below it the
+# array calls' fixed overhead costs more than the per-element loop saves.
+NUMPY_MIN_DAYS = 256
+
+# Schedules shorter than this are expanded once for the Sig: the run-based
+# paths cost a few microseconds of setup, more than a short list walk.
+SCHEDULE_MIN_DAYS = 64
+
+def _is_ndarray(x) -> bool:
+    # Checked without importing NumPy, which stays optional.
+    return type(x).__module__ == "numpy" and hasattr(x, "ndim")
+
+def _compress_runs_np(a) -> List[Tuple[int,int,int]]:
+    import numpy as np
+
+    if a.ndim != 1:
+        raise ValueError("per_day_tabs must be one-dimensional.")
+    if a.size == 0:
+        return []
+    starts = np.flatnonzero(a[1:] != a[:-1]) + 1
+    starts = np.concatenate(([0], starts))
+    ends = np.append(starts[1:], a.size)
+    return list(zip((starts + 1).tolist(), ends.tolist(), a[starts].tolist()))
+
+def _is_strict_alternating_np(a) -> Tuple[bool,int,int]:
+    if a.ndim != 1:
+        raise ValueError("per_day_tabs must be one-dimensional.")
+    if a.size < 2:
+        return False, 0, 0
+    x, y = a[:2].tolist()
+    if x == y or not ((a[2::2] == x).all() and (a[3::2] == y).all()):
+        return False, 0, 0
+    return True, x, y
+
+def _is_strict_alternating_sched(sched: "Schedule") -> Tuple[bool,int,int]:
+    # O(stored runs): one period per segment is checked against the day parity.
+    if len(sched) < 2:
+        return False, 0, 0
+    a, b = sched[0], sched[1]
+    if a == b:
+        return False, 0, 0
+    expect = (a, b)
+    day = 0
+    for span, period, pattern in sched._segs:
+        if span > period and period % 2:
+            return False, 0, 0  # the next repetition starts on the other parity
+        for start, length, tabs in pattern:
+            if start >= span:
+                break
+            if min(length, span - start) > 1 or tabs != expect[(day + start) % 2]:
+                return False, 0, 0
+        day += span
+    return True, a, b
+
+def compress_runs(per_day_tabs: List[int]) -> List[Tuple[int,int,int]]:
+    """Return list of (start_day, end_day, tabs) runs."""
+    if type(per_day_tabs) is not list:  # lists, the common case, skip the type checks
+        if isinstance(per_day_tabs, Schedule):
+            return per_day_tabs.runs()
+        if _is_ndarray(per_day_tabs):
+            if len(per_day_tabs) >= NUMPY_MIN_DAYS:
+                return _compress_runs_np(per_day_tabs)
+            per_day_tabs = per_day_tabs.tolist()
+    if not per_day_tabs:
+        return []
+    runs = []
+    start = 1
+    current = per_day_tabs[0]
+    for i in range(1, len(per_day_tabs)):
+        if per_day_tabs[i] != current:
+            runs.append((start, i, current))
+            start = i+1
+            current = per_day_tabs[i]
+    runs.append((start, len(per_day_tabs), current))
+    return runs
+
+def is_strict_alternating(per_day_tabs: List[int]) -> Tuple[bool,int,int]:
+    if type(per_day_tabs) is not list:
+        if _is_ndarray(per_day_tabs):
+            if len(per_day_tabs) >= NUMPY_MIN_DAYS:
+                return _is_strict_alternating_np(per_day_tabs)
+            per_day_tabs = per_day_tabs.tolist()
+        elif isinstance(per_day_tabs, Schedule):
+            return _is_strict_alternating_sched(per_day_tabs)
+        else:
+            per_day_tabs = list(per_day_tabs)
+    if len(per_day_tabs) < 2:
+        return False, 0, 0
+    a = per_day_tabs[0]
+    b = per_day_tabs[1]
+    if a == b:
+        return False, 0, 0
+    # Even days must all be a and odd days all b; list.count compares in C.
+    even, odd = per_day_tabs[0::2], per_day_tabs[1::2]
+    if even.count(a) != len(even) or odd.count(b) != len(odd):
+        return False, 0, 0
+    return True, a, b
+
+def _prefix_function(seq: list) -> List[int]:
+    # pi[i] = length of the longest proper border of seq[:i + 1] (KMP failure function).
+    pi = [0] * len(seq)
+    k = 0
+    for i in range(1, len(seq)):
+        x = seq[i]
+        while k and seq[k] != x:
+            k = pi[k - 1]
+        if seq[k] == x:
+            k += 1
+        pi[i] = k
+    return pi
+
+def smallest_period(per_day_tabs: List[int]) -> int:
+    """Smallest p with day[i] == day[i + p] for every i (the last cycle may be cut short); 0 if empty."""
+    seq = per_day_tabs.tolist() if hasattr(per_day_tabs, "tolist") else list(per_day_tabs)
+    return len(seq) - _prefix_function(seq)[-1] if seq else 0
+
+def _periodic_prefix(seq: list, min_period: int = 2) -> Tuple[int, int]:
+    # Longest prefix (m days) made of at least two whole p-day cycles, p >= min_period; (0, 0) if none.
+    # One prefix-function pass gives the smallest period of every prefix, so this is O(n).
+    pi = _prefix_function(seq)
+    for m in range(len(seq), 0, -1):
+        p = m - pi[m - 1]
+        if min_period <= p <= m // 2:
+            return m, p
+    return 0, 0
+
+def _clip_runs(runs, first: int, last: int) -> list:
+    # The part of runs that falls on days first..last (1-based, inclusive).
+    return [(max(s, first), min(e, last), t) for s, e, t in runs if e >= first and s <= last]
+
+def _format_ranges(runs) -> str:
+    return "; ".join([f"Day {s}: {t} tab(s)" if s == e else f"Days {s}-{e}: {t} tab(s)" for s, e, t in runs])
+
+# A periodic stretch may start after this many runs of irregular head (weekly
+# front-load puts the leftover high days in the first weeks).
+SIG_MAX_HEAD_RUNS = 8
+
+def _format_periodic(seq: list, runs) -> str:
+    """'Repeat every k days: ...' wording, or '' when it would not be shorter than listing runs.
+
+    The cycles may follow a few listed head runs and be followed by the
+    listed leftover days; the split with the fewest clauses wins.
+    """
+    best = None
+    for k, h in enumerate([0] + [s - 1 for s, _, _ in runs[1:SIG_MAX_HEAD_RUNS + 1]]):
+        if k + 1 >= (best[0] if best else len(runs)):
+            break  # k head runs and one cycle run already are no shorter
+        m, p = _periodic_prefix(seq[h:])
+        if not m:
+            continue
+        parts = (_clip_runs(runs, 1, h), _clip_runs(runs, h + 1, h + p), _clip_runs(runs, h + m + 1, len(seq)))
+        clauses = sum(map(len, parts))
+        if best is None or clauses < best[0]:
+            best = (clauses, h, m, p, parts)
+    if best is None or best[0] >= len(runs):
+        return ""
+    _, h, m, p, (head, cycle, rest) = best
+    cycles, extra = divmod(m, p)
+    count = f"{cycles} cycles"
+    if extra:
+        count += f" + Day 1 of cycle {cycles + 1}" if extra == 1 else f" + Days 1-{extra} of cycle {cycles + 1}"
+    out = f"every {p} days: " + _format_ranges(cycle) + f" ({count}, Days {h + 1}-{h + m})"
+    out = _format_ranges(head) + "; then repeat " + out if head else "Repeat " + out
+    if rest:
+        out += "; then " + _format_ranges(rest)
+    return out
+
+def _render_sig(per_day_tabs: List[int], tablet_size_mg: int, days: int) -> str:
+    # Everything up to the dose/BSA clause, which is the only part that differs between patients.
+    if isinstance(per_day_tabs, Schedule) and len(per_day_tabs) < SCHEDULE_MIN_DAYS:
+        per_day_tabs = per_day_tabs.tolist()
+    alt, a, b = is_strict_alternating(per_day_tabs)
+    if alt:
+        return f"Tablet size {tablet_size_mg} mg: Alternate {a} and {b} tab(s) daily, starting with {a}, for {days} days; "
+    runs = compress_runs(per_day_tabs)
+    body = ""
+    if len(runs) > 3:
+        seq = per_day_tabs.tolist() if hasattr(per_day_tabs, "tolist") else list(per_day_tabs)
+        body = _format_periodic(seq, runs)
+    return f"Tablet size {tablet_size_mg} mg; " + (body or _format_ranges(runs)) + f"; total {days} days; "
+
+def format_pharmacy_snippet(per_day_tabs: List[int], tablet_size_mg: int, days: int, mg_per_m2_day: float, bsa: float) -> str:
+    key = (_render_key(per_day_tabs), tablet_size_mg, type(tablet_size_mg), days, type(days))
+    head = SIG_CACHE.get_or_render(key, lambda: _render_sig(per_day_tabs, tablet_size_mg, days))
+    return head + f"dose {mg_per_m2_day:g} mg/m^2/day at BSA {bsa:.2f} m^2."
+
+# -------------------- Calendar text --------------------
+
+def make_calendar_text(per_day_tabs: List[int], tablet_size_mg: int, cols: int = 7, rest_label: str = None,
+                       rest_days=None) -> str:
+    rest_key = None if rest_label is None or rest_days is None else (rest_label, _render_key(rest_days))
+    key = (_render_key(per_day_tabs), tablet_size_mg, type(tablet_size_mg), cols, rest_key)
+    return CALENDAR_CACHE.get_or_render(
+        key, lambda: _render_calendar_text(per_day_tabs, tablet_size_mg, cols, rest_label, rest_days))
+
+def _render_calendar_text(per_day_tabs: List[int], tablet_size_mg: int, cols: int = 7, rest_label: str = None,
+                          rest_days=None) -> str:
+    return "\n".join(iter_calendar_lines(per_day_tabs, tablet_size_mg, cols, rest_label=rest_label,
+                                         rest_days=rest_days))
+
+def calendar_cell_width(days: int, max_tabs: int, tablet_size_mg: int) -> int:
+    """Column width of the calendar grid: the longest of "Day N", "T tab(s)", "(M mg)", at least 12."""
+    if days <= 0:
+        return 12
+    return max(12, len(f"Day {days}"), len(f"{max_tabs} tab(s)"), len(f"({max_tabs * tablet_size_mg} mg)"))
+
+def _max_tabs(per_day_tabs) -> int:
+    if isinstance(per_day_tabs, Schedule):
+        return per_day_tabs.max_tabs()
+    return int(max(per_day_tabs, default=0)) if len(per_day_tabs) else 0
+
+def iter_calendar_lines(per_day_tabs, tablet_size_mg: int, cols: int = 7,
+                        weeks_per_page: int = 0, max_tabs: int = None, rest_label: str = None, rest_days=None):
+    """Yield the calendar grid line by line; "\n".join() of it is make_calendar_text().
+
+    Rows are built as days are read, so memory stays flat for any course
+    length. With weeks_per_page > 0 the header is repeated every that many
+    grid rows and a "\f" line (form feed) separates the pages. max_tabs
+    defaults to the schedule's largest daily count. rest_days holds one flag
+    per day (e.g. a 0/1 Schedule); with a rest_label, flagged days show that
+    label instead of their tablets. Unflagged 0-tablet days stay "0 tab(s)".
+    """
+    if cols <= 0:
+        raise ValueError("cols must be positive.")
+    if weeks_per_page < 0:
+        raise ValueError("weeks_per_page must be zero or positive.")
+    days = len(per_day_tabs)
+    if max_tabs is None:
+        max_tabs = _max_tabs(per_day_tabs)
+    cw = calendar_cell_width(days, max_tabs, tablet_size_mg)
+    tab_cells = {}  # tabs -> (tabs line, mg line), padded; few distinct values per course
+    rest_it = rest_cell = None
+    if rest_label is not None and rest_days is not None:
+        cw = max(cw, len(rest_label))
+        rest_it, rest_cell = iter(rest_days), (rest_label.ljust(cw), " " * cw)
+    header = " | ".join(f"D{c+1}".center(cw) for c in range(cols))
+    rule = "-" * len(header)
+    blank = " " * cw
+
+    yield header
+    yield rule
+    it = iter(per_day_tabs)
+    day = 0
+    row = 0
+    while day < days:
+        if weeks_per_page and row and row % weeks_per_page == 0:
+            yield "\f"
+            yield header
+            yield rule
+        week = []
+        for tabs in it:
+            week.append(tabs)
+            if len(week) == cols:
+                break
+        top, mid, bot = [], [], []
+        for tabs in week:
+            day += 1
+            cell = rest_cell if rest_it is not None and next(rest_it, 0) else tab_cells.get(tabs)
+            if cell is None:
+                cell = tab_cells[tabs] = (f"{tabs} tab(s)".ljust(cw), f"({tabs * tablet_size_mg} mg)".ljust(cw))
+            top.append(f"Day {day}".ljust(cw))
+            mid.append(cell[0])
+            bot.append(cell[1])
+        pad = [blank] * (cols - len(week))
+        yield " | ".join(top + pad)
+        yield " | ".join(mid + pad)
+        yield " | ".join(bot + pad)
+        yield rule
+        row += 1
+
+def iter_calendar_pages(per_day_tabs, tablet_size_mg: int, cols: int = 7, weeks_per_page: int = 4,
+                        rest_label: str = None, rest_days=None):
+    """Yield the calendar one page at a time, each page a str with its own header."""
+    if weeks_per_page <= 0:
+        raise ValueError("weeks_per_page must be positive.")
+    page = []
+    for line in iter_calendar_lines(per_day_tabs, tablet_size_mg, cols, weeks_per_page, rest_label=rest_label,
+                                    rest_days=rest_days):
+        if line == "\f":
+            yield "\n".join(page)
+            page = []
+        else:
+            page.append(line)
+    yield "\n".join(page)
+
+def diff_lines(old: List[str], new: List[str]) -> List[Tuple[int, int, List[str]]]:
+    """Edits (start, stop, new_lines) that turn old into new, each replacing old[start:stop].
+
+    Positional: line i is only compared with line i, which suits the calendar
+    grid (a day always sits on the same rows for a given width). Runs of
+    changed lines are grouped, and a length change becomes one tail edit.
+    """
+    edits = []
+    common = min(len(old), len(new))
+    i = 0
+    while i < common:
+        if old[i] == new[i]:
+            i += 1
+            continue
+        j = i + 1
+        while j < common and old[j] != new[j]:
+            j += 1
+        edits.append((i, j, new[i:j]))
+        i = j
+    if len(old) != len(new):
+        edits.append((common, len(old), new[common:]))
+    return edits
+
+# -------------------- Order rows (headless/batch) --------------------
+
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def _measured_bsa(order: dict) -> float:
+    # height_cm + weight_kg through bsa_formula (default Mosteller), with an optional bsa_cap.
+    cap = order.get("bsa_cap")
+    return body_surface_area(order["height_cm"], order["weight_kg"], order.get("bsa_formula") or "Mosteller",
+                             cap=None if _blank(cap) else cap)
+
+_NUMERIC_FIELDS = ("bsa", "mg_per_m2_day", "days", "tablet_size_mg", "height_cm", "weight_kg", "bsa_cap")
+
+def parse_order(order: dict, default_mode: str = DEFAULTS["mode"]):
+    """Validate one order row (CSV/JSON dict) into (bsa, mg_day, days, tab, mode).
+
+    Without a bsa field, BSA comes from height_cm and weight_kg (see chemocalc.bsa).
+    JSON true/false is not a number here, although float(True) is 1.0.
+    """
+    if not isinstance(order, dict):
+        raise ValueError("An order must be an object with named fields.")
+    if any(isinstance(order.get(f), bool) for f in _NUMERIC_FIELDS):
+        raise ValueError("Enter positive numeric values (BSA, mg/m^2/day, days, tablet size).")
+    bsa = None
+    if _blank(order.get("bsa")) and not _blank(order.get("height_cm")) and not _blank(order.get("weight_kg")):
+        bsa = _measured_bsa(order)  # outside the try: its ValueErrors name the problem
+    try:
+        if bsa is None:
+            bsa = float(order["bsa"])
+        mg_day = float(order["mg_per_m2_day"])
+        days = int(float(order["days"]))
+        tab = int(float(order["tablet_size_mg"]))
+    except KeyError as e:
+        raise ValueError(f"missing field {e}") from None
+    except (TypeError, ValueError, OverflowError):  # int(float("inf")) overflows
+        raise ValueError("Enter positive numeric values (BSA, mg/m^2/day, days, tablet size).") from None
+    if not (isfinite(bsa) and isfinite(mg_day)):
+        raise ValueError("Enter positive numeric values (BSA, mg/m^2/day, days, tablet size).")
+    if any(x <= 0 for x in (bsa, mg_day, days, tab)):
+        raise ValueError("All inputs must be positive.")
+    mode = order.get("mode") or default_mode
+    get_arranger(mode)
+    return bsa, mg_day, days, tab, mode
+
+_TRUE_WORDS = frozenset(("1", "true", "yes"))
+_FALSE_WORDS = frozenset(("", "0", "false", "no"))
+
+def parse_flag(value, name: str, default: bool = False) -> bool:
+    """A yes/no order field (e.g. exact) from JSON or CSV: true/1/yes or false/0/no/"" (any case).
+
+    A missing field (None) gives default; anything else raises ValueError,
+    so "0" or "false" never reads as true.
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        word = value.strip().lower()
+        if word in _TRUE_WORDS:
+            return True
+        if word in _FALSE_WORDS:
+            return False
+    raise ValueError(f"{name} must be true/false, 1/0 or yes/no, got {value!r}")
+
+# -------------------- Summary text --------------------
+
+def make_provider_summary(bsa: float, mg_day: float, days: int, tab: int, mode: str, mix: dict, per_day_tabs: List[int]) -> str:
+    exact_total_mg = mix["exact_daily_mg"] * days
+    total_pills = total_tablets(per_day_tabs)
+    mixed_total_mg = total_pills * tab
+    derived_total_m2 = mg_day * days
+
+    lines = []
+    lines.append(f"INPUTS -> BSA {bsa:.2f} m^2 | mg/m^2/day {mg_day:.3g} | Days {days} | Tablet {tab} mg | Mode {mode}")
+    lines.append(f"DERIVED -> Total mg/m^2: {derived_total_m2:.3g}")
+    lines.append(f"DAILY DOSE -> Exact {float(mix['exact_daily_mg']):.1f} mg  ({float(mix['exact_tabs']):.3f} tab/day)")
+    lines.append(f"ROUNDING MIX -> {mix['ceil_tabs']} tab(s) on {mix['ceil_days']} day(s); {mix['floor_tabs']} tab(s) on {mix['floor_days']} day(s)")
+    lines.append(f"TOTALS -> Exact {float(exact_total_mg):.0f} mg | Mixed {mixed_total_mg:.0f} mg | Tablets {total_pills}")
+    return "\n".join(lines)
+
+def make_patient_intro(days: int, tab: int) -> str:
+    return f"This plan lasts {days} days. Each tablet is {tab} mg. On some days you will take more tablets than others to match your dose."
+
+def prepare_documents(bsa: float, mg_day: float, days: int, tab: int, mode: str, exact: bool = False) -> dict:
+    """Mix, schedule and every text the provider/patient exports need, for one order."""
+    mix = compute_mix(bsa, mg_day, days, tab, exact=exact)
+    per_day_tabs = arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"],
+                                   mix["ceil_tabs"], mix["floor_tabs"], mode)
+    return {
+        "mix": mix,
+        "per_day_tabs": per_day_tabs,
+        "total_pills": total_tablets(per_day_tabs),
+        "summary": make_provider_summary(bsa, mg_day, days, tab, mode, mix, per_day_tabs),
+        "pharmacy": format_pharmacy_snippet(per_day_tabs, tab, days, mg_day, bsa),
+        "calendar": make_calendar_text(per_day_tabs, tab, cols=7),
+        "patient_intro": make_patient_intro(days, tab),
+    }
+
+# -------------------- Export helpers (RTF) --------------------
+
+# Bump whenever export_provider_rtf / export_patient_rtf output changes, so
+# cached documents rendered by an older template are not reused.
+# 2: repeating schedules are described as one cycle in the Sig.
+# 3: paged calendars break pages with \page instead of a raw form feed.
+# 4: the Sig's repeat cycle may follow listed head days (weekly front-load).
+RTF_TEMPLATE_VERSION = 4
+
+def _rtf_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}")
+
+_ASCII_MAP = {
+    "m²": "m^2", "µ": "u", "×": "x", "–": "-", "—": "-", "→": "->",
+    "≤": "<=", "≥": ">=", "…": "...", "“": '"', "”": '"', "‘": "'", "’": "'",
+    "•": "-", "°": " deg ", "™": "(TM)", "®": "(R)", "©": "(C)"
+}
+
+def _ascii_fallback(exc):
+    # Codec error handler: called by str.encode("ascii") only for the runs of
+    # non-ASCII characters, so plain ASCII text never leaves C.
+    if not isinstance(exc, UnicodeEncodeError):
+        raise exc
+    s = exc.object
+    out = []
+    for i in range(exc.start, exc.end):
+        ch = s[i]
+        if ch == "²":
+            out.append("^2" if i and s[i - 1] == "m" else "")
+        else:
+            out.append(_ASCII_MAP.get(ch, ""))
+    return "".join(out), exc.end
+
+codecs.register_error("chemocalc.ascii", _ascii_fallback)
+
+def ascii_sanitize(s: str) -> str:
+    if s.isascii():
+        return s
+    return s.encode("ascii", "chemocalc.ascii").decode("ascii")
+
+def rtf_ascii(s: str, newlines: bool = False) -> str:
+    """Same as _rtf_escape(ascii_sanitize(s)); newlines=True also turns "\\n" into "\\line ".
+
+    One C-level scan for the ASCII check/encode; the escape passes only run
+    when the character is actually present.
+    """
+    if not s.isascii():
+        s = s.encode("ascii", "chemocalc.ascii").decode("ascii")
+    if "\\" in s:
+        s = s.replace("\\", "\\\\")
+    if "{" in s:
+        s = s.replace("{", "\\{")
+    if "}" in s:
+        s = s.replace("}", "\\}")
+    if newlines:
+        s = s.replace("\n", r"\line ")
+    return s
+
+_RTF_HEADER = (r"{\rtf1\ansi\deff0"
+               r"{\fonttbl{\f0\fmodern Courier New;}{\f1\fmodern Consolas;}}"
+               r"\paperw15840\paperh12240\margl720\margr720\margt720\margb720 ")
+
+class RtfWriter:
+    """Incremental RTF output to an open text or binary stream (file, BytesIO, socket file, zip member).
+
+    The header is written on construction and the closing brace by close()
+    (or leaving the with block); the stream itself stays open. Each
+    provider_document/patient_document after the first starts a new section
+    (\\sect), so many patients can share one stream. Calendars may be passed
+    as one string or as any iterable of lines; lines are escaped and written
+    in bounded chunks.
+    """
+    __slots__ = ("_write", "_docs", "_closed")
+
+    def __init__(self, stream, encoding: str = "utf-8"):
+        if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(stream, "mode", ""):
+            write = stream.write
+            self._write = lambda s: write(s.encode(encoding))
+        else:
+            self._write = stream.write
+        self._docs = 0
+        self._closed = False
+        self._write(_RTF_HEADER)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def raw(self, rtf: str):
+        """Write RTF control text as-is."""
+        self._write(rtf)
+
+    def text(self, s: str, ascii_only: bool = False):
+        self._write(rtf_ascii(s) if ascii_only else _rtf_escape(s))
+
+    def lines(self, lines, ascii_only: bool = False, chunk_chars: int = 1 << 16):
+        """Write lines separated by \\line; a str is split on newlines.
+
+        A "\\f" line (the page separator of iter_calendar_lines with
+        weeks_per_page) becomes a \\page break.
+        """
+        if isinstance(lines, str):
+            if "\f" not in lines:
+                self._write(rtf_ascii(lines, newlines=True) if ascii_only
+                            else _rtf_escape(lines).replace("\n", r"\line "))
+                return
+            lines = lines.split("\n")
+        escape = rtf_ascii if ascii_only else _rtf_escape
+        buf, size, sep = [], 0, ""
+        for line in lines:
+            if line == "\f":
+                piece, sep = r"\page ", ""
+            else:
+                piece, sep = sep + escape(line), r"\line "
+            buf.append(piece)
+            size += len(piece)
+            if size >= chunk_chars:
+                self._write("".join(buf))
+                buf, size = [], 0
+        if buf:
+            self._write("".join(buf))
+
+    def section_break(self):
+        self._write(r"\sect\sectd\pard\plain ")
+
+    def begin_document(self):
+        if self._docs:
+            self.section_break()
+        self._docs += 1
+
+    def provider_document(self, title: str, summary: str, pharmacy_line: str, calendar, total_pills: int):
+        # ASCII-only provider doc
+        self.begin_document()
+        w = self._write
+        w(r"\fs20 \b ")
+        self.text(title, ascii_only=True)
+        w(r"\b0\line " + r"\f0 " + r"\b Provider Summary\b0\line ")
+        self.text(summary, ascii_only=True)
+        w(r"\line " + r"Total tablets to dispense: " + str(total_pills) + r"\line\line "
+          + r"\b Pharmacy Snippet\b0\line ")
+        self.text(pharmacy_line, ascii_only=True)
+        w(r"\line\line " + r"\b Calendar\b0\line ")
+        self.lines(calendar, ascii_only=True)
+
+    def patient_document(self, title: str, patient_intro: str, calendar, total_pills: int):
+        # Patient-friendly 12pt
+        self.begin_document()
+        w = self._write
+        w(r"\f0 " + r"\fs24 \b Your Chemotherapy Tablet Schedule\b0\line ")
+        self.text(patient_intro)
+        w(r"\line " + r"Total tablets for the course: " + str(total_pills) + r"\line\line "
+          + r"\b Daily Plan\b0\line ")
+        self.lines(calendar)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._write("}")
+
+# The one-document exports already hold the whole calendar in memory, so they
+# render to a string and write it once: small writes before a large one cost
+# the text file an extra flush. Use RtfWriter on the file itself to stream.
+
+def export_provider_rtf(filepath: str, title: str, summary: str, pharmacy_line: str, calendar_text: str, total_pills: int):
+    # ASCII-only provider doc; attempt landscape Letter via \\paperw/\\paperh
+    buf = io.StringIO()
+    with RtfWriter(buf) as w:
+        w.provider_document(title, summary, pharmacy_line, calendar_text, total_pills)
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write(buf.getvalue())
+
+def export_patient_rtf(filepath: str, title: str, patient_intro: str, calendar_text: str, total_pills: int):
+    # Patient-friendly 12pt, attempt landscape Letter via \\paperw/\\paperh
+    buf = io.StringIO()
+    with RtfWriter(buf) as w:
+        w.patient_document(title, patient_intro, calendar_text, total_pills)
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write(buf.getvalue())
@@ -0,0 +1,164 @@
+"""
+Precomputed dose lookup table over BSA x dose x days x tablet strength.
+
+Clinics reuse a small set of inputs: BSA in 0.01 steps, a few protocol
+mg/m^2 doses, course lengths and strengths. DoseTable.build runs compute_mix
+and every arranger once per grid cell. The table is array-backed: one
+unsigned int per cell per field, plus a deduplicated pool of Schedules
+referenced by index per mode. lookup() is a handful of dict hits. Inputs
+off the grid fall back to live computation, so callers never have to check
+coverage first.
+
+to_json() writes the same table for chemo_calc_site/index.html, which
+loads dose_table.json (if present next to it) instead of recomputing.
+
+    python -m chemocalc.dosetable --dose 1000 1250 --strength 150 500 --days 14 21 \\
+        -o chemo_calc_site/dose_table.json
+"""
+
+import argparse
+import json
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .core import SCHEDULE_MODES, Schedule, compute_mix, arrange_by_mode
+
+TABLE_VERSION = 1
+
+def bsa_grid(start: float = 1.20, stop: float = 2.60, step: float = 0.01, ndigits: int = 2) -> List[float]:
+    """BSA axis values, rounded so they equal what a user types (1.7 == 1.70)."""
+    n = int(round((stop - start) / step)) + 1
+    return [round(start + i * step, ndigits) for i in range(n)]
+
+class DoseTable:
+    __slots__ = ("bsas", "doses", "days", "strengths", "modes",
+                 "_bsa_ix", "_dose_ix", "_days_ix", "_strength_ix", "_mode_ix",
+                 "floor_tabs", "ceil_tabs", "ceil_days", "schedules", "schedule_index")
+
+    def __init__(self, bsas: Sequence[float], doses: Sequence[float], days: Sequence[int],
+                 strengths: Sequence[int], modes: Sequence[str],
+                 floor_tabs: array, ceil_tabs: array, ceil_days: array,
+                 schedules: List[Schedule], schedule_index: Dict[str, array]):
+        self.bsas, self.doses, self.days = tuple(bsas), tuple(doses), tuple(days)
+        self.strengths, self.modes = tuple(strengths), tuple(modes)
+        self._bsa_ix = {v: i for i, v in enumerate(self.bsas)}
+        self._dose_ix = {v: i for i, v in enumerate(self.doses)}
+        self._days_ix = {v: i for i, v in enumerate(self.days)}
+        self._strength_ix = {v: i for i, v in enumerate(self.strengths)}
+        self._mode_ix = set(self.modes)
+        self.floor_tabs, self.ceil_tabs, self.ceil_days = floor_tabs, ceil_tabs, ceil_days
+        self.schedules = schedules
+        self.schedule_index = schedule_index
+
+    def __len__(self) -> int:
+        return len(self.floor_tabs)
+
+    @classmethod
+    def build(cls, doses: Iterable[float], strengths: Iterable[int], days: Iterable[int],
+              bsas: Optional[Iterable[float]] = None, modes: Optional[Iterable[str]] = None) -> "DoseTable":
+        bsas = tuple(bsa_grid() if bsas is None else bsas)
+        doses, days, strengths = tuple(doses), tuple(int(d) for d in days), tuple(int(s) for s in strengths)
+        modes = tuple(SCHEDULE_MODES if modes is None else modes)
+        floor_tabs, ceil_tabs, ceil_days = array("I"), array("I"), array("I")
+        schedule_index = {m: array("I") for m in modes}
+        schedules: List[Schedule] = []
+        pool: Dict[Schedule, int] = {}
+        for bsa in bsas:
+            for dose in doses:
+                for n_days in days:
+                    for tab in strengths:
+                        mix = compute_mix(bsa, dose, n_days, tab)
+                        floor_tabs.append(mix["floor_tabs"])
+                        ceil_tabs.append(mix["ceil_tabs"])
+                        ceil_days.append(mix["ceil_days"])
+                        for m in modes:
+                            sched = arrange_by_mode(n_days, mix["ceil_days"], mix["exact_tabs"],
+                                                    mix["ceil_tabs"], mix["floor_tabs"], m)
+                            ix = pool.get(sched)
+                            if ix is None:
+                                ix = pool[sched] = len(schedules)
+                                schedules.append(sched)
+                            schedule_index[m].append(ix)
+        return cls(bsas, doses, days, strengths, modes, floor_tabs, ceil_tabs, ceil_days, schedules, schedule_index)
+
+    def _cell(self, bsa: float, mg_per_m2_day: float, days: int, tablet_size_mg: int) -> Optional[int]:
+        try:
+            i = self._bsa_ix[bsa]
+            j = self._dose_ix[mg_per_m2_day]
+            k = self._days_ix[days]
+            s = self._strength_ix[tablet_size_mg]
+        except (KeyError, TypeError):
+            return None
+        return ((i * len(self.doses) + j) * len(self.days) + k) * len(self.strengths) + s
+
+    def lookup(self, bsa: float, mg_per_m2_day: float, days: int, tablet_size_mg: int,
+               mode: str) -> Tuple[dict, Schedule]:
+        """(compute_mix dict, arranged Schedule); identical to live computation, on or off grid."""
+        cell = self._cell(bsa, mg_per_m2_day, days, tablet_size_mg) if mode in self._mode_ix else None
+        if cell is None:
+            mix = compute_mix(bsa, mg_per_m2_day, days, tablet_size_mg)
+            return mix, arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"],
+                                        mix["ceil_tabs"], mix["floor_tabs"], mode)
+        exact_daily_mg = mg_per_m2_day * bsa
+        ceil_days = self.ceil_days[cell]
+        mix = {
+            "exact_daily_mg": exact_daily_mg,
+            "exact_tabs": exact_daily_mg / tablet_size_mg,
+            "floor_tabs": self.floor_tabs[cell],
+            "ceil_tabs": self.ceil_tabs[cell],
+            "ceil_days": ceil_days,
+            "floor_days": days - ceil_days,
+        }
+        return mix, self.schedules[self.schedule_index[mode][cell]]
+
+    def to_json(self) -> dict:
+        return {
+            "version": TABLE_VERSION,
+            "axes": ["bsa", "mg_per_m2_day", "days", "tablet_size_mg"],
+            "bsa": list(self.bsas),
+            "mg_per_m2_day": list(self.doses),
+            "days": list(self.days),
+            "tablet_size_mg": list(self.strengths),
+            "modes": list(self.modes),
+            "floor_tabs": self.floor_tabs.tolist(),
+            "ceil_tabs": self.ceil_tabs.tolist(),
+            "ceil_days": self.ceil_days.tolist(),
+            "schedules": [[list(r) for r in s.runs()] for s in self.schedules],
+            "schedule_index": {m: ix.tolist() for m, ix in self.schedule_index.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "DoseTable":
+        if data.get("version") != TABLE_VERSION:
+            raise ValueError(f"Unsupported dose table version: {data.get('version')!r}")
+        schedules = [Schedule.from_runs((e - s + 1, t) for s, e, t in runs) for runs in data["schedules"]]
+        return cls(data["bsa"], data["mg_per_m2_day"], data["days"], data["tablet_size_mg"], data["modes"],
+                   array("I", data["floor_tabs"]), array("I", data["ceil_tabs"]), array("I", data["ceil_days"]),
+                   schedules, {m: array("I", ix) for m, ix in data["schedule_index"].items()})
+
+    def save_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, separators=(",", ":"))
+
+    @classmethod
+    def load_json(cls, path: str) -> "DoseTable":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_json(json.load(f))
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m chemocalc.dosetable",
+                                 description="Precompute a dose lookup table and write it as JSON.")
+    ap.add_argument("--dose", type=float, nargs="+", required=True, help="protocol doses, mg/m^2/day")
+    ap.add_argument("--strength", type=int, nargs="+", required=True, help="tablet strengths, mg")
+    ap.add_argument("--days", type=int, nargs="+", required=True, help="course lengths, days")
+    ap.add_argument("--bsa", type=float, nargs=3, default=(1.20, 2.60, 0.01), metavar=("START", "STOP", "STEP"),
+                    help="BSA grid (default: 1.20 2.60 0.01)")
+    ap.add_argument("-o", "--output", default="dose_table.json")
+    args = ap.parse_args(argv)
+    table = DoseTable.build(args.dose, args.strength, args.days, bsas=bsa_grid(*args.bsa))
+    table.save_json(args.output)
+    print(f"{len(table)} cells, {len(table.schedules)} distinct schedules -> {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,194 @@
+"""
+On-disk, content-addressed cache for rendered provider/patient RTF exports.
+
+The key is a SHA-256 of the normalized order inputs (BSA, dose, days, tablet
+strength, mode, title) plus the document kind, RTF_TEMPLATE_VERSION and
+ALGORITHM_VERSION. Identical orders therefore map to the same file, and
+changing the export template or the schedule math invalidates the old
+entries. On a hit, the export is a file copy instead of a re-render.
+link=True hard-links the output to the cache entry instead. It is opt-in
+because the two are then one file: rewriting the output in place rewrites
+the cached document that later orders receive.
+
+Layout: <dir>/<2 hex>/<64 hex>.rtf. Recency is the file mtime, refreshed on
+every hit. When the cache grows past max_bytes, the least recently used
+entries are deleted down to low_water * max_bytes, so a full cache is not
+rescanned on every miss.
+
+Several processes may share one cache directory. Each entry is rendered
+into a private temp file and moved into place with os.replace, which is
+atomic, so readers see either no file or a complete one. Eviction tolerates
+files that another process already removed, and an entry evicted between
+being stored and copied out is rendered straight to its destination.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Optional
+
+from .core import (
+    ALGORITHM_VERSION, APP_TITLE, RTF_TEMPLATE_VERSION, compute_mix, arrange_by_mode, format_pharmacy_snippet,
+    prepare_documents, total_tablets, export_provider_rtf, export_patient_rtf,
+)
+
+def _place(src: str, dest: str, link: bool):
+    if link:
+        try:
+            if os.path.lexists(dest):
+                os.remove(dest)
+            os.link(src, dest)
+            return
+        except OSError:
+            pass  # other filesystem or no hard-link support: copy instead
+    shutil.copyfile(src, dest)
+
+class ExportCache:
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, low_water: float = 0.9):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive.")
+        if not 0 < low_water <= 1:
+            raise ValueError("low_water must be in (0, 1].")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.hits = self.misses = self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._approx_bytes = self._scan_size()
+
+    @staticmethod
+    def key(kind: str, bsa: float, mg_per_m2_day: float, days: int, tablet_size_mg: int,
+            mode: str, title: str = APP_TITLE) -> str:
+        # repr(float) round-trips exactly, so 1.7 and 1.70 share a key but 1.7001 does not.
+        norm = [kind, repr(float(bsa)), repr(float(mg_per_m2_day)), int(days), int(tablet_size_mg),
+                mode, title, RTF_TEMPLATE_VERSION, ALGORITHM_VERSION]
+        return hashlib.sha256(json.dumps(norm, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".rtf")
+
+    def fetch(self, key: str, dest: str, link: bool = False) -> bool:
+        """Put the cached document for key at dest; False on a miss.
+
+        With link=True dest becomes a hard link to the entry (see the module
+        docstring): do not rewrite it in place.
+        """
+        src = self.path_for(key)
+        try:
+            os.utime(src)  # mark as recently used
+            _place(src, dest, link)
+        except FileNotFoundError:
+            if os.path.exists(src):
+                raise  # dest directory missing, not a cache miss
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key: str, render: Callable[[str], None]) -> str:
+        """Render into a temp file via render(path), then atomically publish it under key."""
+        final = self.path_for(key)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(final), suffix=".tmp")
+        os.close(fd)
+        try:
+            render(tmp)
+            os.replace(tmp, final)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._approx_bytes += os.path.getsize(final)
+        if self._approx_bytes > self.max_bytes:
+            self.evict()
+        return final
+
+    def _entries(self):
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(".rtf"):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    yield st.st_mtime, st.st_size, entry.path
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache is at most low_water * max_bytes."""
+        target = int(self.max_bytes * self.low_water)
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass  # another process got there first
+            total -= size
+        self._approx_bytes = total
+
+    def clear(self):
+        for _, _, path in list(self._entries()):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._approx_bytes = 0
+
+def export_order_cached(cache: ExportCache, provider_path: Optional[str], patient_path: Optional[str],
+                        bsa: float, mg_day: float, days: int, tab: int, mode: str,
+                        title: str = APP_TITLE, link: bool = False) -> dict:
+    """Write the provider and/or patient document for one order, via the cache.
+
+    Documents are rendered only on a miss, and then only once for both.
+    Returns {"provider": "hit"|"miss", "patient": ...} for the paths given,
+    plus the order's "sig" and "total_tablets" (taken from the rendered
+    documents on a miss; on hits only the schedule is computed).
+    link=True hard-links the outputs to the cache entries (see the module
+    docstring).
+    """
+    docs = None
+    status = {}
+    for kind, dest in (("provider", provider_path), ("patient", patient_path)):
+        if dest is None:
+            continue
+        key = ExportCache.key(kind, bsa, mg_day, days, tab, mode, title)
+        if cache.fetch(key, dest, link):
+            status[kind] = "hit"
+            continue
+        if docs is None:
+            docs = prepare_documents(bsa, mg_day, days, tab, mode)
+        if kind == "provider":
+            render = lambda p: export_provider_rtf(p, title, docs["summary"], docs["pharmacy"],
+                                                   docs["calendar"], docs["total_pills"])
+        else:
+            render = lambda p: export_patient_rtf(p, title, docs["patient_intro"], docs["calendar"],
+                                                  docs["total_pills"])
+        final = cache.store(key, render)
+        try:
+            _place(final, dest, link)
+        except FileNotFoundError:
+            if os.path.exists(final):
+                raise  # dest directory missing
+            render(dest)  # evicted (by this or another process) before it was copied out
+        status[kind] = "miss"
+    if docs is None:
+        mix = compute_mix(bsa, mg_day, days, tab)
+        per_day_tabs = arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"],
+                                       mix["ceil_tabs"], mix["floor_tabs"], mode)
+        status.update(sig=format_pharmacy_snippet(per_day_tabs, tab, days, mg_day, bsa),
+                      total_tablets=total_tablets(per_day_tabs))
+    else:
+        status.update(sig=docs["pharmacy"], total_tablets=docs["total_pills"])
+    return status
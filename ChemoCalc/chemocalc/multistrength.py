@@ -0,0 +1,151 @@
+"""
+Multi-strength tablet mix (e.g. capecitabine 150 mg + 500 mg), no splitting.
+
+Each day gets one of two dose levels, a low and a high one, just like the
+single-strength floor/ceil mix: the nearest whole-tablet amounts at or
+below and at or above the exact daily dose, so no day strays further from
+the target than it must. Every level is built from the fewest whole tablets
+of the available strengths. The number of high days is then chosen to
+minimize, in order:
+  1) the course dose error |total mg - days x exact daily mg|,
+  2) the total number of tablets.
+
+Three tables are memoized:
+- the fewest-tablets combination for every amount, per strength set
+  (unbounded coin change, extended on demand);
+- the two daily levels around a target, per (daily target, strength set);
+- the chosen split, per (daily target, days, strength set).
+A cohort run therefore solves each subproblem once, and a new choice costs
+O(1) whatever the course length.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache, reduce
+from math import gcd
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # annotations only; see core
+    from typing import Dict, Iterable, List, Optional, Tuple
+
+from .core import Schedule, get_arranger
+
+# strength set (descending, in gcd units) -> (tablet count per amount, strength used last)
+_COMBO_TABLES: Dict[Tuple[int, ...], Tuple[List[Optional[int]], List[int]]] = {}
+
+def _normalize_strengths(strengths: Iterable[int]) -> Tuple[int, ...]:
+    out = tuple(sorted({int(s) for s in strengths}, reverse=True))
+    if not out or any(s <= 0 for s in out):
+        raise ValueError("Strengths must be positive whole mg values.")
+    return out
+
+def _combo_table(units: Tuple[int, ...], upto: int):
+    counts, last = _COMBO_TABLES.setdefault(units, ([0], [0]))
+    for a in range(len(counts), upto + 1):
+        best, pick = None, 0
+        for s in units:  # descending, so ties keep the larger strength
+            if s <= a and counts[a - s] is not None:
+                n = counts[a - s] + 1
+                if best is None or n < best:
+                    best, pick = n, s
+        counts.append(best)
+        last.append(pick)
+    return counts, last
+
+def tablet_combo(amount_mg: int, strengths: Iterable[int]) -> Optional[Dict[int, int]]:
+    """Fewest whole tablets summing exactly to amount_mg, as {strength: count}; None if impossible."""
+    strengths = _normalize_strengths(strengths)
+    g = reduce(gcd, strengths)
+    if amount_mg < 0 or amount_mg % g:
+        return None
+    units = tuple(s // g for s in strengths)
+    a = amount_mg // g
+    counts, last = _combo_table(units, a)
+    if counts[a] is None:
+        return None
+    combo: Dict[int, int] = {}
+    while a:
+        s = last[a]
+        combo[s * g] = combo.get(s * g, 0) + 1
+        a -= s
+    return {s: combo[s] for s in strengths if s in combo}
+
+@lru_cache(maxsize=4096)
+def _daily_levels(target_mg: float, strengths: Tuple[int, ...]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Nearest whole-tablet amounts at or below and at or above target, as (mg, tablets).
+
+    Both are the same level when target itself is reachable. Some amount at or
+    above target is always reachable within one largest tablet of the level below.
+    """
+    g = reduce(gcd, strengths)
+    units = tuple(s // g for s in strengths)
+    counts, _ = _combo_table(units, int(-(-(target_mg + strengths[0]) // g)))
+    a = int(target_mg // g)
+    while counts[a] is None:  # 0 mg (no tablets) always is
+        a -= 1
+    below = (a * g, counts[a])
+    a = int(-(-target_mg // g))
+    while counts[a] is None:
+        a += 1
+    return below, (a * g, counts[a])
+
+@lru_cache(maxsize=4096)
+def _choose_levels(exact_daily_mg: float, days: int, strengths: Tuple[int, ...]):
+    """(lo_mg, lo_tabs, hi_mg, hi_tabs, high days) for one course.
+
+    Every day stays on one of the two levels next to the daily target, as in
+    the single-strength floor/ceil mix. Course error |days * lo + k * step - total|
+    is smallest at k = floor or ceil of (total - days * lo) / step; of those,
+    the split with fewer tablets (then fewer high days) wins.
+    """
+    (lo_mg, lo_tabs), (hi_mg, hi_tabs) = _daily_levels(exact_daily_mg, strengths)
+    if hi_mg == lo_mg:
+        return lo_mg, lo_tabs, hi_mg, hi_tabs, 0
+    exact_total_mg = days * exact_daily_mg
+    base_mg, step = days * lo_mg, hi_mg - lo_mg
+    kf = int((exact_total_mg - base_mg) // step)
+    best = min(
+        (abs(base_mg + k * step - exact_total_mg), days * lo_tabs + k * (hi_tabs - lo_tabs), k)
+        for k in (kf, kf + 1) if 0 <= k <= days
+    )
+    return lo_mg, lo_tabs, hi_mg, hi_tabs, best[2]
+
+def compute_mix_multi(bsa: float, mg_per_m2_day: float, days: int, strengths: Iterable[int]) -> dict:
+    strengths = _normalize_strengths(strengths)
+    if any(x <= 0 for x in (bsa, mg_per_m2_day, days)):
+        raise ValueError("All inputs must be positive.")
+
+    exact_daily_mg = mg_per_m2_day * bsa
+    exact_total_mg = days * exact_daily_mg
+    lo_mg, lo_tabs, hi_mg, hi_tabs, ceil_days = _choose_levels(exact_daily_mg, days, strengths)
+    floor_combo = tablet_combo(lo_mg, strengths)
+    ceil_combo = tablet_combo(hi_mg, strengths)
+    floor_days = days - ceil_days
+    by_strength = {s: ceil_days * ceil_combo.get(s, 0) + floor_days * floor_combo.get(s, 0) for s in strengths}
+    total_mg = ceil_days * hi_mg + floor_days * lo_mg
+
+    return {
+        "exact_daily_mg": exact_daily_mg,
+        "strengths": strengths,
+        "floor_mg": lo_mg,
+        "ceil_mg": hi_mg,
+        "floor_combo": floor_combo,
+        "ceil_combo": ceil_combo,
+        "floor_tabs": lo_tabs,
+        "ceil_tabs": hi_tabs,
+        "ceil_days": ceil_days,
+        "floor_days": floor_days,
+        "total_mg": total_mg,
+        "dose_error_mg": total_mg - exact_total_mg,
+        "total_tablets": ceil_days * hi_tabs + floor_days * lo_tabs,
+        "tablets_by_strength": by_strength,
+    }
+
+def arrange_multi_by_mode(mix: dict, days: int, mode: str) -> Schedule:
+    """Per-day mg Schedule (ceil_mg / floor_mg days) using any registered arranger."""
+    lo, hi = mix["floor_mg"], mix["ceil_mg"]
+    frac = 0.0 if hi == lo else (mix["exact_daily_mg"] - lo) / (hi - lo)
+    return get_arranger(mode)(days, mix["ceil_days"], frac, hi, lo)
+
+def format_combo(combo: Dict[int, int]) -> str:
+    return " + ".join(f"{n} x {s} mg" for s, n in combo.items()) or "none"
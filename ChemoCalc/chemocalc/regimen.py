@@ -0,0 +1,151 @@
+"""
+Multi-cycle regimens: on/off cycles with rest days, repeated, with per-phase doses.
+
+    reg = compute_regimen(1.73, 500, [(1250, 14, 7, 4), (1000, 14, 7, 4)])
+    reg["sig"]                      # one line for all 8 cycles, rest days included
+    reg["total_tablets"]            # per-cycle tablets x cycles, per phase
+    make_regimen_calendar(reg)      # calendar with "Rest" on off days
+
+A phase is (mg_per_m2_day, on_days, off_days, cycles): capecitabine 14 on /
+7 off for 8 cycles is [(1250, 14, 7, 8)], temozolomide 5 of 28 is
+[(150, 5, 23, 6)], and a dose reduction after cycle 4 is a second phase.
+
+Each distinct cycle (BSA, dose, on/off days, strength, mode) is computed
+once and memoized as a template: compute_mix and the mode's arranger over the
+on days, then the off days at 0 tablets. The regimen's Schedule holds each
+phase as one periodic segment that refers to its template's runs, and totals
+are template totals times cycle counts. reg["rest_days"] flags the off days
+the same way, so an on day that rounds to 0 tablets still reads "0 tab(s)"
+rather than "Rest". A year of cycles therefore costs
+about the same as one cycle, except for drawing the calendar, which is one
+row per week.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterable, List, Tuple
+
+from .core import (
+    DEFAULTS, Schedule, compute_mix, arrange_by_mode, get_arranger, iter_calendar_lines, make_calendar_text,
+)
+
+REST_LABEL = "Rest"
+
+@lru_cache(maxsize=1024)
+def _cycle_template(bsa: float, mg_per_m2_day: float, on_days: int, off_days: int, tablet_size_mg: int,
+                    mode: str, exact: bool) -> tuple:
+    # (mix items, pattern runs as (start, length, tabs) over one period, tablets per cycle)
+    mix = compute_mix(bsa, mg_per_m2_day, on_days, tablet_size_mg, exact=exact)
+    on = arrange_by_mode(on_days, mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"], mix["floor_tabs"], mode)
+    pattern = tuple((s - 1, e - s + 1, t) for s, e, t in on.iter_runs())
+    if off_days:
+        pattern += ((on_days, off_days, 0),)
+    return tuple(mix.items()), pattern, on.total()
+
+def cycle_template(bsa: float, mg_per_m2_day: float, on_days: int, off_days: int, tablet_size_mg: int,
+                   mode: str = DEFAULTS["mode"], exact: bool = False) -> dict:
+    """One cycle: its mix (over the on days), runs, period and tablets. Memoized per distinct cycle."""
+    mix, pattern, tablets = _cycle_template(bsa, mg_per_m2_day, on_days, off_days, tablet_size_mg, mode, exact)
+    return {"mix": dict(mix), "pattern": pattern, "period": on_days + off_days, "tablets": tablets}
+
+def _normalize_phases(phases) -> List[Tuple[float, int, int, int]]:
+    out = []
+    for phase in phases:
+        try:
+            mg_day, on_days, off_days, cycles = phase
+            mg_day = float(mg_day)
+            on_days, off_days, cycles = int(on_days), int(off_days), int(cycles)
+        except (TypeError, ValueError):
+            raise ValueError("Each phase is (mg_per_m2_day, on_days, off_days, cycles).") from None
+        if mg_day <= 0 or on_days <= 0 or off_days < 0 or cycles <= 0:
+            raise ValueError("Phase dose, on days and cycles must be positive; off days zero or more.")
+        out.append((mg_day, on_days, off_days, cycles))
+    if not out:
+        raise ValueError("A regimen needs at least one phase.")
+    return out
+
+def compute_regimen(bsa: float, tablet_size_mg: int, phases: Iterable[tuple], mode: str = DEFAULTS["mode"],
+                    exact: bool = False) -> dict:
+    """Schedule, totals and Sig for a regimen of (mg_per_m2_day, on_days, off_days, cycles) phases."""
+    if bsa <= 0 or tablet_size_mg <= 0:
+        raise ValueError("All inputs must be positive.")
+    get_arranger(mode)
+    segments, rest_segments, out_phases = [], [], []
+    first_cycle = day = 1
+    for mg_day, on_days, off_days, cycles in _normalize_phases(phases):
+        tpl = cycle_template(bsa, mg_day, on_days, off_days, tablet_size_mg, mode, exact)
+        period = tpl["period"]
+        segments.append((cycles * period, period, tpl["pattern"]))
+        rest_segments.append((cycles * period, period, ((0, on_days, 0), (on_days, off_days, 1))[:1 + bool(off_days)]))
+        out_phases.append({
+            "mg_per_m2_day": mg_day, "on_days": on_days, "off_days": off_days, "cycles": cycles,
+            "first_cycle": first_cycle, "first_day": day, "mix": tpl["mix"], "pattern": tpl["pattern"],
+            "tablets_per_cycle": tpl["tablets"], "total_tablets": tpl["tablets"] * cycles,
+        })
+        first_cycle += cycles
+        day += cycles * period
+    reg = {
+        "bsa": bsa,
+        "tablet_size_mg": tablet_size_mg,
+        "mode": mode,
+        "phases": out_phases,
+        "schedule": Schedule(segments),
+        "rest_days": Schedule(rest_segments),
+        "cycles": first_cycle - 1,
+        "days": day - 1,
+        "total_tablets": sum(p["total_tablets"] for p in out_phases),
+    }
+    reg["sig"] = format_regimen_sig(reg)
+    return reg
+
+def _format_cycle(pattern, on_days: int) -> str:
+    # One cycle's runs; 4+ single days alternating between two counts read as one "alternate" clause.
+    # Only days after on_days are rest; adjacent runs with the same wording share one clause.
+    runs = [(start + 1, start + length, tabs) for start, length, tabs in pattern]
+    parts, plain = [], None
+    i = 0
+    while i < len(runs):
+        j = i
+        while (j + 1 < len(runs) and runs[j + 1][0] == runs[j + 1][1] and runs[i][0] == runs[i][1]
+               and runs[j + 1][2] and runs[i][2] and (j + 1 < i + 2 or runs[j + 1][2] == runs[j - 1][2])):
+            j += 1
+        s, e, tabs = runs[i]
+        if j - i >= 3:
+            parts.append(f"Days {s}-{runs[j][1]}: alternate {tabs} and {runs[i + 1][2]} tab(s), starting with {tabs}")
+            plain = None
+            i = j + 1
+            continue
+        text = "rest (no tablets)" if s > on_days else f"{tabs} tab(s)"
+        if plain is not None and plain[1] == text:
+            s = plain[0]
+            parts.pop()
+        days = f"Day {s}" if s == e else f"Days {s}-{e}"
+        parts.append(f"{days}: {text}")
+        plain = (s, text)
+        i += 1
+    return "; ".join(parts)
+
+def format_regimen_sig(reg: dict) -> str:
+    """Pharmacy one-liner: one clause per phase (its cycles and one cycle's days), then totals."""
+    clauses = []
+    for p in reg["phases"]:
+        first, last = p["first_cycle"], p["first_cycle"] + p["cycles"] - 1
+        cycles = f"Cycle {first}" if first == last else f"Cycles {first}-{last}"
+        every = f", every {p['on_days'] + p['off_days']} days" if p["cycles"] > 1 else ""
+        clauses.append(f"{cycles} ({p['mg_per_m2_day']:g} mg/m^2/day{every}): {_format_cycle(p['pattern'], p['on_days'])}")
+    return (f"Tablet size {reg['tablet_size_mg']} mg; " + "; then ".join(clauses)
+            + f"; total {reg['cycles']} cycle(s), {reg['days']} days; BSA {reg['bsa']:.2f} m^2.")
+
+def iter_regimen_calendar(reg: dict, cols: int = 7, weeks_per_page: int = 0):
+    """Calendar lines for the whole regimen, with REST_LABEL on off days (see iter_calendar_lines)."""
+    return iter_calendar_lines(reg["schedule"], reg["tablet_size_mg"], cols, weeks_per_page,
+                               rest_label=REST_LABEL, rest_days=reg["rest_days"])
+
+def make_regimen_calendar(reg: dict, cols: int = 7) -> str:
+    """The whole calendar as one string, memoized like make_calendar_text."""
+    return make_calendar_text(reg["schedule"], reg["tablet_size_mg"], cols, rest_label=REST_LABEL,
+                              rest_days=reg["rest_days"])
@@ -0,0 +1,409 @@
+"""
+Local HTTP/JSON scheduling service (asyncio, stdlib only) for EHR integration.
+
+    python -m chemocalc.server --port 8765 --workers 4
+
+Endpoints (request and response bodies are JSON; order fields are the CLI's:
+bsa, mg_per_m2_day, days, tablet_size_mg, optional mode, order_id, exact):
+
+    GET  /health          {"ok": true, ...pool info}
+    POST /v1/schedule     one order -> mix, per_day_tabs, total_tablets, sig
+    POST /v1/calendar     same plus "calendar" (optional weeks_per_page)
+    POST /v1/documents    same plus summary, calendar, provider_rtf, patient_rtf
+    POST /v1/batch        {"op": "schedule"|"calendar"|"documents", "orders": [...]}
+                          -> {"results": [...]}, one entry per order, in order
+
+A bad order answers 400 with {"error": ...}; inside a batch it becomes that
+entry's error field and the rest still render. Orders longer than max_days
+(default 3650) are bad orders too, so one request cannot tie up a worker's
+memory.
+
+The event loop only parses HTTP and JSON requests. Scheduling, rendering
+and encoding the response JSON run in a worker pool (processes by default).
+Process workers are started (forkserver, or spawn where there is none)
+before the port is bound, so they never hold the listening socket or a
+client connection, and a pool broken by a dead worker is replaced.
+Single-order requests that arrive together are coalesced into one pool job
+of up to max_batch orders, and at most two jobs per worker are in flight.
+Under load, the queue therefore turns into bigger jobs rather than more
+round trips. Connections are HTTP/1.1 keep-alive (pipelining works), closed
+after keepalive_timeout seconds idle.
+
+Binds to 127.0.0.1 by default. There is no TLS or authentication, so keep
+it on localhost or behind the integration engine.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import List, Optional, Tuple
+
+from .cli import schedule_order
+from .core import APP_TITLE, DEFAULTS, RtfWriter, parse_flag, parse_order, prepare_documents
+
+OPS = ("schedule", "calendar", "documents")
+MAX_DAYS = 3650
+
+# -------------------- Work done in the pool --------------------
+
+def _documents(body: dict) -> dict:
+    out = {"order_id": body.get("order_id", "")}
+    try:
+        bsa, mg_day, days, tab, mode = parse_order(body)
+        exact = parse_flag(body.get("exact"), "exact")
+    except ValueError as e:
+        out["error"] = str(e)
+        return out
+    title = str(body.get("title") or APP_TITLE)
+    docs = prepare_documents(bsa, mg_day, days, tab, mode, exact=exact)
+    provider, patient = io.StringIO(), io.StringIO()
+    with RtfWriter(provider) as w:
+        w.provider_document(title, docs["summary"], docs["pharmacy"], docs["calendar"], docs["total_pills"])
+    with RtfWriter(patient) as w:
+        w.patient_document(title, docs["patient_intro"], docs["calendar"], docs["total_pills"])
+    mix = docs["mix"]
+    out.update(bsa=bsa, mg_per_m2_day=mg_day, days=days, tablet_size_mg=tab, mode=mode,
+               floor_tabs=mix["floor_tabs"], ceil_tabs=mix["ceil_tabs"],
+               ceil_days=mix["ceil_days"], floor_days=mix["floor_days"],
+               exact_daily_mg=float(mix["exact_daily_mg"]), exact_tabs=float(mix["exact_tabs"]),
+               total_tablets=docs["total_pills"], per_day_tabs=docs["per_day_tabs"].tolist(),
+               sig=docs["pharmacy"], summary=docs["summary"], calendar=docs["calendar"],
+               provider_rtf=provider.getvalue(), patient_rtf=patient.getvalue())
+    return out
+
+def _too_long(body: dict, max_days: int) -> bool:
+    try:
+        days = parse_order(body)[2]
+    except ValueError:
+        return False  # schedule_order / _documents report the bad field
+    return days > max_days
+
+def handle_order(op: str, body, max_days: int = MAX_DAYS) -> Tuple[int, bytes]:
+    """Run one op on one order dict; returns (HTTP status, encoded JSON body)."""
+    try:
+        if not isinstance(body, dict):
+            raise ValueError("each order must be a JSON object")
+        if _too_long(body, max_days):
+            rec = {"order_id": body.get("order_id", ""), "error": f"days must be at most {max_days}"}
+        elif op == "documents":
+            rec = _documents(body)
+        else:
+            weeks = int(body.get("weeks_per_page") or 0) if op == "calendar" else 0
+            if weeks < 0:
+                raise ValueError("weeks_per_page must be zero or positive")
+            rec = schedule_order(body, DEFAULTS["mode"], False, op == "calendar", weeks)  # reads the row's exact
+        status = 400 if "error" in rec else 200
+    except Exception as e:
+        rec, status = {"error": f"{type(e).__name__}: {e}"}, 400
+    return status, json.dumps(rec, separators=(",", ":")).encode()
+
+def handle_chunk(items: List[tuple], max_days: int = MAX_DAYS) -> List[Tuple[int, bytes]]:
+    """handle_order for every (op, body) in one pool job."""
+    return [handle_order(op, body, max_days) for op, body in items]
+
+def _warm_up() -> int:
+    return os.getpid()
+
+# -------------------- Request coalescing --------------------
+
+class _Dispatcher:
+    # Queues (op, body) items and hands them to the pool in chunks, with at
+    # most max_inflight chunks running. Items queued in the same loop
+    # iteration, or while every slot is busy, share a chunk. When the pool
+    # breaks (a worker process died), the chunks it held fail and
+    # replace_pool() supplies a fresh one for the rest.
+
+    def __init__(self, pool, max_inflight: int, max_batch: int, max_days: int, replace_pool):
+        self._pool = pool
+        self._replace_pool = replace_pool
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._max_batch = max_batch
+        self._max_days = max_days
+        self._pending: List[tuple] = []
+        self._draining = False
+
+    def submit(self, op: str, body) -> "asyncio.Future":
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending.append(((op, body), waiter))
+        if not self._draining:
+            self._draining = True
+            asyncio.get_running_loop().create_task(self._drain())
+        return waiter
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                await self._slots.acquire()
+                batch = self._pending[:self._max_batch]
+                del self._pending[:self._max_batch]
+                waiters = [w for _, w in batch]
+                try:
+                    job = loop.run_in_executor(self._pool, handle_chunk, [item for item, _ in batch],
+                                               self._max_days)
+                except Exception as e:  # e.g. BrokenProcessPool: fail these requests, keep serving
+                    self._slots.release()
+                    self._check_pool(self._pool, e)
+                    for w in waiters:
+                        if not w.done():
+                            w.set_exception(e)
+                    continue
+                job.add_done_callback(partial(self._deliver, self._pool, waiters))
+        finally:
+            self._draining = False
+
+    def _deliver(self, pool, waiters, job):
+        self._slots.release()
+        if job.cancelled():
+            exc = asyncio.CancelledError()
+        else:
+            exc = job.exception()
+            self._check_pool(pool, exc)
+        for i, w in enumerate(waiters):
+            if w.done():
+                continue
+            if exc is not None:
+                w.set_exception(exc)
+            else:
+                w.set_result(job.result()[i])
+
+    def _check_pool(self, pool, exc):
+        # Every chunk on a broken pool fails with BrokenProcessPool; replace it once.
+        if isinstance(exc, BrokenProcessPool) and pool is self._pool:
+            self._pool = self._replace_pool(pool)
+
+# -------------------- HTTP --------------------
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            408: "Request Timeout", 411: "Length Required", 413: "Payload Too Large",
+            500: "Internal Server Error", 501: "Not Implemented", 503: "Service Unavailable"}
+
+class _HttpError(Exception):
+    def __init__(self, status: int, message: str, close: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.close = close
+
+def _error_body(message: str) -> bytes:
+    return json.dumps({"error": message}, separators=(",", ":")).encode()
+
+class SchedulingServer:
+    """The HTTP service; use start()/close() from a running loop, or serve() to block."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, workers: Optional[int] = None,
+                 pool: str = "process", max_batch: int = 64, max_body: int = 8 << 20,
+                 max_orders: int = 10000, keepalive_timeout: float = 15.0, max_days: int = MAX_DAYS):
+        if pool not in ("process", "thread"):
+            raise ValueError("pool must be 'process' or 'thread'.")
+        if max_batch < 1 or max_orders < 1 or max_days < 1:
+            raise ValueError("max_batch, max_orders and max_days must be at least 1.")
+        self.host, self.port = host, port
+        self.workers = workers or os.cpu_count() or 1
+        self.pool_kind = pool
+        self.max_batch = max_batch
+        self.max_body = max_body
+        self.max_orders = max_orders
+        self.max_days = max_days
+        self.keepalive_timeout = keepalive_timeout
+        self._pool = None
+        self._server = None
+        self._dispatch = None
+
+    def _new_pool(self):
+        if self.pool_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chemocalc-http")
+        # Never fork from the serving process: a forked worker would inherit the
+        # listening socket and any open client connection, holding the port after
+        # we exit and keeping "Connection: close" responses from reaching EOF.
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if ctx.get_start_method() == "forkserver":
+            ctx.set_forkserver_preload([__name__])
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+
+    async def _start_workers(self):
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_up) for _ in range(self.workers)))
+
+    def _replace_pool(self, broken):
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+        return self._pool
+
+    async def start(self):
+        self._pool = self._new_pool()
+        await self._start_workers()  # before binding, and so no first request pays for it
+        self._dispatch = _Dispatcher(self._pool, self.workers * 2, self.max_batch, self.max_days,
+                                     self._replace_pool)
+        self._server = await asyncio.start_server(self._connection, self.host, self.port,
+                                                  limit=64 * 1024, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]  # the real one when port=0
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, partial(pool.shutdown, cancel_futures=True))
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _read_request(self, reader) -> Optional[tuple]:
+        # (method, path, headers, body, keep_alive), or None on a clean EOF between requests.
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise _HttpError(400, "incomplete request head", close=True)
+            return None
+        except asyncio.LimitOverrunError:
+            raise _HttpError(413, "request head too large", close=True)
+        except asyncio.TimeoutError:
+            return None
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, path, version = lines[0].split(" ")
+        except ValueError:
+            raise _HttpError(400, "malformed request line", close=True)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        conn = headers.get("connection", "").lower()
+        keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise _HttpError(501, "chunked request bodies are not supported; send Content-Length", close=True)
+        body = b""
+        if method == "POST":
+            try:
+                length = int(headers["content-length"])
+            except (KeyError, ValueError):
+                raise _HttpError(411, "Content-Length required", close=True)
+            if length < 0 or length > self.max_body:
+                raise _HttpError(413, f"body larger than {self.max_body} bytes", close=True)
+            try:
+                body = await asyncio.wait_for(reader.readexactly(length), self.keepalive_timeout)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                raise _HttpError(408, "request body not received", close=True)
+        return method, path.split("?", 1)[0], headers, body, keep_alive
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    req = await self._read_request(reader)
+                    if req is None:
+                        break
+                    method, path, _, body, keep_alive = req
+                    status, payload = await self._route(method, path, body)
+                except _HttpError as e:
+                    status, payload = e.status, _error_body(str(e))
+                    keep_alive = keep_alive and not e.close
+                writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n"
+                             b"Connection: %s\r\n\r\n" % (status, _REASONS.get(status, "").encode(), len(payload),
+                                                            b"keep-alive" if keep_alive else b"close"))
+                writer.write(payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, bytes]:
+        if path == "/health":
+            if method != "GET":
+                raise _HttpError(405, "use GET")
+            return 200, json.dumps({"ok": True, "pool": self.pool_kind, "workers": self.workers}).encode()
+        if not path.startswith("/v1/"):
+            raise _HttpError(404, f"no such endpoint: {path}")
+        op = path[4:]
+        if op not in OPS and op != "batch":
+            raise _HttpError(404, f"no such endpoint: {path}")
+        if method != "POST":
+            raise _HttpError(405, "use POST with a JSON body")
+        try:
+            req = json.loads(body)
+        except ValueError as e:
+            raise _HttpError(400, f"invalid JSON: {e}")
+        if op != "batch":
+            return await self._run(op, req)
+        return await self._batch(req)
+
+    async def _run(self, op: str, order) -> Tuple[int, bytes]:
+        try:
+            return await self._dispatch.submit(op, order)
+        except Exception as e:  # the pool itself failed (e.g. a worker process died)
+            return 503, _error_body(f"worker pool failed: {type(e).__name__}: {e}")
+
+    async def _batch(self, req) -> Tuple[int, bytes]:
+        if not isinstance(req, dict) or not isinstance(req.get("orders"), list):
+            raise _HttpError(400, 'expected {"op": ..., "orders": [...]}')
+        op = req.get("op", "schedule")
+        if op not in OPS:
+            raise _HttpError(400, f"op must be one of {', '.join(OPS)}")
+        orders = req["orders"]
+        if len(orders) > self.max_orders:
+            raise _HttpError(413, f"at most {self.max_orders} orders per batch")
+        results = await asyncio.gather(*(self._run(op, order) for order in orders))
+        return 200, b'{"results":[' + b",".join(payload for _, payload in results) + b"]}"
+
+def serve(host: str = "127.0.0.1", port: int = 8765, **kwargs):
+    """Run the service until interrupted."""
+    server = SchedulingServer(host, port, **kwargs)
+
+    async def run():
+        await server.start()
+        print(f"chemocalc service on http://{server.host}:{server.port} "
+              f"({server.workers} {server.pool_kind} worker(s))", flush=True)
+        stop = asyncio.Event()
+        try:  # SIGTERM: stop accepting, shut the pool down, exit cleanly
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        except (NotImplementedError, AttributeError):  # Windows
+            pass
+        try:
+            await stop.wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m chemocalc.server",
+                                 description="Local HTTP/JSON chemotherapy scheduling service.")
+    ap.add_argument("--host", default="127.0.0.1", help="address to bind (default 127.0.0.1, localhost only)")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=None, help="pool size (default: CPU count)")
+    ap.add_argument("--pool", choices=["process", "thread"], default="process",
+                    help="process (default) for CPU parallelism; thread for low-memory hosts")
+    ap.add_argument("--max-batch", type=int, default=64, help="orders per pool job")
+    ap.add_argument("--keepalive-timeout", type=float, default=15.0, help="idle seconds before closing")
+    ap.add_argument("--max-days", type=int, default=MAX_DAYS, help=f"longest course accepted (default {MAX_DAYS})")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, workers=args.workers, pool=args.pool, max_batch=args.max_batch,
+          keepalive_timeout=args.keepalive_timeout, max_days=args.max_days)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
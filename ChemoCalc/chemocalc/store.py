@@ -0,0 +1,225 @@
+"""
+SQLite store of computed schedules, for audit and re-printing.
+
+Each row keeps what was ordered (inputs, patient, start date), what was
+computed (the mix, the per-day tablets, total tablets, the Sig) and
+ALGORITHM_VERSION. Per-day tablets are stored run-length encoded as the
+Schedule's segments, JSON [[span, period, [[start, length, tabs], ...]], ...]:
+a pattern of runs repeated every `period` days across `span` days, so even
+an alternating year is one short segment. An old order can therefore be re-printed
+exactly as it was dispensed without re-running compute_mix, even after the
+rules change.
+
+    with ScheduleStore("schedules.db") as store:
+        store.add_orders(orders)                  # executemany in batches, one transaction
+        for row in store.by_patient("MRN123"):    # index-backed
+            sched = store.schedule(row)           # Schedule, e.g. for make_calendar_text
+
+The database runs in WAL mode, so readers (re-print, audit queries) do not
+block the writer. Each add_orders / put_many call is one transaction: a bad
+order rolls the whole call back, so a call either stores every order or
+none. Rows are upserted on order_id: re-storing an order_id
+replaces its row, and rows without an order_id are always inserted.
+input_hash identifies the dosing inputs and is indexed to find earlier
+schedules for the same inputs.
+"""
+
+import datetime
+import hashlib
+import json
+import sqlite3
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from .core import (
+    ALGORITHM_VERSION, DEFAULTS, Schedule, compute_mix, arrange_by_mode, format_pharmacy_snippet,
+    parse_flag, parse_order, total_tablets,
+)
+
+SCHEMA_VERSION = 1
+
+COLUMNS = (
+    "order_id", "patient_id", "start_date", "input_hash",
+    "bsa", "mg_per_m2_day", "days", "tablet_size_mg", "mode", "exact",
+    "floor_tabs", "ceil_tabs", "ceil_days", "floor_days", "exact_tabs",
+    "total_tablets", "segments", "sig", "algorithm_version", "created_at",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id                INTEGER PRIMARY KEY,
+    order_id          TEXT UNIQUE,
+    patient_id        TEXT,
+    start_date        TEXT,
+    input_hash        TEXT NOT NULL,
+    bsa               REAL NOT NULL,
+    mg_per_m2_day     REAL NOT NULL,
+    days              INTEGER NOT NULL,
+    tablet_size_mg    INTEGER NOT NULL,
+    mode              TEXT NOT NULL,
+    exact             INTEGER NOT NULL,
+    floor_tabs        INTEGER NOT NULL,
+    ceil_tabs         INTEGER NOT NULL,
+    ceil_days         INTEGER NOT NULL,
+    floor_days        INTEGER NOT NULL,
+    exact_tabs        REAL NOT NULL,
+    total_tablets     INTEGER NOT NULL,
+    segments          TEXT NOT NULL,
+    sig               TEXT NOT NULL,
+    algorithm_version INTEGER NOT NULL,
+    created_at        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS schedules_patient ON schedules (patient_id, start_date);
+CREATE INDEX IF NOT EXISTS schedules_start ON schedules (start_date);
+CREATE INDEX IF NOT EXISTS schedules_input ON schedules (input_hash);
+"""
+
+_UPSERT = (f"INSERT INTO schedules ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+           f"ON CONFLICT (order_id) DO UPDATE SET "
+           + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS if c != "order_id"))
+
+def input_hash(bsa: float, mg_per_m2_day: float, days: int, tablet_size_mg: int, mode: str,
+               exact: bool = False) -> str:
+    """SHA-256 of the normalized dosing inputs (same normalization as ExportCache.key)."""
+    norm = [repr(float(bsa)), repr(float(mg_per_m2_day)), int(days), int(tablet_size_mg), mode, bool(exact)]
+    return hashlib.sha256(json.dumps(norm, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+def _iso_date(value) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    try:
+        return datetime.date.fromisoformat(str(value).strip()).isoformat()
+    except ValueError:
+        raise ValueError(f"start_date must be YYYY-MM-DD, got {value!r}") from None
+
+def schedule_record(order: dict, default_mode: str = DEFAULTS["mode"], exact: bool = False,
+                    created_at: Optional[str] = None) -> tuple:
+    """Compute one order (CLI fields plus optional patient_id, start_date) into a row tuple in COLUMNS order."""
+    bsa, mg_day, days, tab, mode = parse_order(order, default_mode)
+    exact = parse_flag(order.get("exact"), "exact", exact)
+    mix = compute_mix(bsa, mg_day, days, tab, exact=exact)
+    per_day_tabs = arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"], mix["floor_tabs"], mode)
+    segments = json.dumps(per_day_tabs.segments(), separators=(",", ":"))
+    order_id = str(order.get("order_id") or "").strip() or None
+    patient_id = str(order.get("patient_id") or "").strip() or None
+    return (
+        order_id, patient_id, _iso_date(order.get("start_date")), input_hash(bsa, mg_day, days, tab, mode, exact),
+        bsa, mg_day, days, tab, mode, int(exact),
+        mix["floor_tabs"], mix["ceil_tabs"], mix["ceil_days"], mix["floor_days"], float(mix["exact_tabs"]),
+        total_tablets(per_day_tabs), segments, format_pharmacy_snippet(per_day_tabs, tab, days, mg_day, bsa),
+        ALGORITHM_VERSION, created_at or datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    )
+
+class ScheduleStore:
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=timeout, isolation_level=None)  # explicit transactions
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")  # durable at checkpoints; safe with WAL
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"{path} has schema version {version}; this code knows {SCHEMA_VERSION}.")
+        self._db.executescript(_SCHEMA)
+        self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    # -------- writing --------
+
+    def put_many(self, records: Iterable[tuple], batch_size: int = 5000) -> int:
+        """Upsert row tuples (see schedule_record) in one transaction, executemany batch_size rows at a time.
+
+        Only batch_size rows are held in memory. If any record (or the
+        iterable producing them) fails, the whole call is rolled back and the
+        error re-raised. Returns the number of rows written.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        it = iter(records)
+        written = 0
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                batch = list(islice(it, batch_size))
+                if not batch:
+                    break
+                self._db.executemany(_UPSERT, batch)
+                written += len(batch)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        return written
+
+    def add_orders(self, orders: Iterable[dict], default_mode: str = DEFAULTS["mode"], exact: bool = False,
+                   batch_size: int = 5000) -> int:
+        """Compute and store every order, all or nothing; a bad order raises ValueError naming its position.
+
+        Out-of-range numbers (OverflowError from a huge or infinite field)
+        are reported the same way, and nothing from the call is stored.
+        """
+        created = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+        def records():
+            for i, order in enumerate(orders):
+                try:
+                    yield schedule_record(order, default_mode, exact, created)
+                except (ValueError, OverflowError) as e:
+                    order_id = order.get("order_id", "") if isinstance(order, dict) else ""
+                    raise ValueError(f"order {i} ({order_id!r}): {e}") from None
+
+        return self.put_many(records(), batch_size)
+
+    def add(self, order: dict, default_mode: str = DEFAULTS["mode"], exact: bool = False) -> int:
+        return self.add_orders([order], default_mode, exact)
+
+    # -------- reading --------
+
+    def _rows(self, where: str, args: tuple) -> List[sqlite3.Row]:
+        return self._db.execute(f"SELECT * FROM schedules WHERE {where}", args).fetchall()
+
+    def get(self, order_id: str) -> Optional[sqlite3.Row]:
+        rows = self._rows("order_id = ?", (order_id,))
+        return rows[0] if rows else None
+
+    def by_patient(self, patient_id: str) -> List[sqlite3.Row]:
+        """A patient's schedules, oldest start date first."""
+        return self._rows("patient_id = ? ORDER BY start_date, id", (patient_id,))
+
+    def by_input_hash(self, digest: str) -> List[sqlite3.Row]:
+        return self._rows("input_hash = ? ORDER BY id", (digest,))
+
+    def starting_between(self, first, last) -> List[sqlite3.Row]:
+        """Schedules whose start_date falls in [first, last] (dates or YYYY-MM-DD)."""
+        return self._rows("start_date BETWEEN ? AND ? ORDER BY start_date, id", (_iso_date(first), _iso_date(last)))
+
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[sqlite3.Row]:
+        cur = self._db.execute("SELECT * FROM schedules ORDER BY id")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield from rows
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM schedules").fetchone()[0]
+
+    @staticmethod
+    def schedule(row) -> Schedule:
+        """The stored per-day tablets of a row, as a Schedule (no recomputation)."""
+        return Schedule((span, period, tuple(map(tuple, pattern)))
+                        for span, period, pattern in json.loads(row["segments"]))
+
+    def explain(self, query: str, args: tuple = ()) -> List[str]:
+        """SQLite's query plan for a SELECT, to check that a lookup uses an index."""
+        return [r[-1] for r in self._db.execute("EXPLAIN QUERY PLAN " + query, args)]
@@ -0,0 +1,125 @@
+"""
+Arrangers: the weekly front-load closed form and the mode registry.
+
+Weekly front-load is checked against the original per-day fill for every
+course length from 1 to 400 days, over a grid of exact_tabs values
+(twentieths, the integer-detection epsilon and the k/7 week-quota rounding
+boundaries) and ceil_days counts around, at and outside the natural one.
+
+The registry: a third-party arranger registered under a new mode is used by
+arrange_by_mode and accepted in orders; registering a taken mode raises
+unless replace=True; an unknown mode raises ValueError.
+"""
+
+from math import floor
+
+import pytest
+
+from chemocalc import core
+from chemocalc.cli import schedule_order
+from chemocalc.core import (
+    SCHEDULE_MODES, Schedule, arrange_by_mode, arrange_weekly_frontload, get_arranger, parse_order,
+    register_arranger,
+)
+
+def reference_weekly_frontload(days, ceil_days_total, exact_tabs, c, f):
+    # The original list-filling implementation, kept verbatim as the oracle.
+    per_day = [f] * days
+    remaining_ceil = ceil_days_total
+    start = 0
+    while start < days:
+        week_len = min(7, days - start)
+        wk_f = int(floor(exact_tabs))
+        wk_c = wk_f if abs(exact_tabs - wk_f) < 1e-12 else wk_f + 1
+        wk_ceil = 0 if wk_c == wk_f else int(round(week_len * exact_tabs - week_len * wk_f))
+        wk_ceil = max(0, min(week_len, wk_ceil, remaining_ceil))
+        for i in range(wk_ceil):
+            per_day[start + i] = c
+        remaining_ceil -= wk_ceil
+        start += week_len
+    start = 0
+    while remaining_ceil > 0 and start < days:
+        week_end = min(start + 7, days)
+        for i in range(start, week_end):
+            if per_day[i] == f:
+                per_day[i] = c
+                remaining_ceil -= 1
+                if remaining_ceil == 0:
+                    break
+        start += 7
+    return per_day
+
+def exact_tabs_grid():
+    for base in (0, 1, 2, 4):
+        for k in range(20):
+            yield base + k / 20
+        yield base + 1e-13          # inside the integer-detection epsilon
+        yield base + 1 - 1e-13
+        for k in (1, 2, 3, 4, 5, 6):
+            yield base + k / 7      # week-quota rounding boundaries
+
+EXACT_TABS = list(exact_tabs_grid())
+
+@pytest.mark.parametrize("days", range(1, 401))
+def test_weekly_frontload_matches_reference(days):
+    for exact_tabs in EXACT_TABS:
+        f = int(floor(exact_tabs))
+        c = f if abs(exact_tabs - f) < 1e-12 else f + 1
+        natural = 0 if c == f else max(0, min(days, int(round(days * exact_tabs - days * f))))
+        for ceil_days in {natural, natural - 1, natural + 1, natural + 3, 0, days, -1, days + 2}:
+            got = arrange_weekly_frontload(days, ceil_days, exact_tabs, c, f)
+            want = reference_weekly_frontload(days, ceil_days, exact_tabs, c, f)
+            assert len(got) == days
+            assert list(got) == want, f"ceil_days={ceil_days} exact_tabs={exact_tabs!r} c={c} f={f}"
+
+# -------------------- Mode registry --------------------
+
+@pytest.fixture
+def registry():
+    # register_arranger mutates module state; put it back after each test.
+    arrangers, modes = dict(core.ARRANGERS), list(SCHEDULE_MODES)
+    yield
+    core.ARRANGERS.clear()
+    core.ARRANGERS.update(arrangers)
+    SCHEDULE_MODES[:] = modes
+
+def back_load(days, ceil_days, exact_tabs, c, f):
+    ceil_days = max(0, min(days, ceil_days))
+    return Schedule.from_runs([(days - ceil_days, f), (ceil_days, c)])
+
+def test_third_party_arranger(registry):
+    register_arranger("Back-load", back_load)
+    assert SCHEDULE_MODES[-1] == "Back-load" and get_arranger("Back-load") is back_load
+    assert arrange_by_mode(7, 3, 1.4, 2, 1, "Back-load").tolist() == [1, 1, 1, 1, 2, 2, 2]
+    order = {"bsa": 1.7, "mg_per_m2_day": 1000, "days": 14, "tablet_size_mg": 500, "mode": "Back-load"}
+    assert parse_order(order)[4] == "Back-load"
+    rec = schedule_order(order)
+    assert "error" not in rec and rec["per_day_tabs"] == sorted(rec["per_day_tabs"])
+
+def test_duplicate_registration_raises(registry):
+    builtin = get_arranger("Weekly front-load")
+    with pytest.raises(ValueError, match="already registered"):
+        register_arranger("Weekly front-load", back_load)
+    register_arranger("Back-load", back_load)
+    with pytest.raises(ValueError, match="already registered"):
+        register_arranger("Back-load", arrange_weekly_frontload)
+    assert get_arranger("Weekly front-load") is builtin and get_arranger("Back-load") is back_load
+
+def test_replace(registry):
+    modes = list(SCHEDULE_MODES)
+    register_arranger("Weekly front-load", back_load, replace=True)
+    assert get_arranger("Weekly front-load") is back_load
+    assert SCHEDULE_MODES == modes  # replaced in place, not listed twice
+    assert arrange_by_mode(7, 3, 1.4, 2, 1, "Weekly front-load").tolist() == [1, 1, 1, 1, 2, 2, 2]
+    register_arranger("Back-load", back_load, replace=True)  # replace=True also registers new modes
+    assert SCHEDULE_MODES == modes + ["Back-load"]
+
+def test_unknown_mode_raises_value_error():
+    with pytest.raises(ValueError, match="Unknown schedule mode: 'Nope'"):
+        get_arranger("Nope")
+    with pytest.raises(ValueError, match="Unknown schedule mode"):
+        arrange_by_mode(7, 3, 1.4, 2, 1, "Nope")
+    with pytest.raises(ValueError, match="Unknown schedule mode"):
+        parse_order({"bsa": 1.7, "mg_per_m2_day": 1000, "days": 14, "tablet_size_mg": 500, "mode": "Nope"})
+    assert "error" in schedule_order({"bsa": 1.7, "mg_per_m2_day": 1000, "days": 14, "tablet_size_mg": 500,
+                                      "mode": "Nope"})
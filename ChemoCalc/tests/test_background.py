@@ -0,0 +1,118 @@
+"""
+BackgroundCalculator: latest wins, cancel_pending drops queued work, errors surface.
+
+drain() polls the way the GUI's _poll_calculation does: result() of the
+delivered future goes to on_result, or its exception to on_error. Jobs
+block on events, so which job is running or queued is deterministic.
+"""
+
+import threading
+import time
+
+import pytest
+
+from chemocalc.background import BackgroundCalculator
+
+TIMEOUT = 5.0
+
+@pytest.fixture
+def calc():
+    c = BackgroundCalculator()
+    yield c
+    c.shutdown()
+
+def drain(calc, results, errors, settle: float = 0.05):
+    # Poll until nothing is pending, then a little longer so late stale results would show up.
+    deadline = time.monotonic() + TIMEOUT
+    while calc.pending:
+        assert time.monotonic() < deadline, "job never finished"
+        _deliver(calc.poll(), results, errors)
+        time.sleep(0.001)
+    time.sleep(settle)
+    _deliver(calc.poll(), results, errors)
+
+def _deliver(done, results, errors):
+    if done is None:
+        return
+    tag, fut = done
+    try:
+        value = fut.result()
+    except Exception as e:
+        errors.append((tag, e))
+    else:
+        results.append((tag, value))
+
+def blocker():
+    started, release = threading.Event(), threading.Event()
+
+    def job(value):
+        started.set()
+        assert release.wait(TIMEOUT)
+        return value
+    return job, started, release
+
+def test_only_latest_result_is_delivered(calc):
+    job, started, release = blocker()
+    ran = []
+
+    def record(value):
+        ran.append(value)
+        return value
+
+    calc.submit(job, "first", tag=1)
+    assert started.wait(TIMEOUT)  # job 1 is running; 2-4 queue behind it and are superseded
+    for tag in (2, 3, 4):
+        calc.submit(record, f"job {tag}", tag=tag)
+    calc.submit(record, "latest", tag=5)
+    release.set()
+    results, errors = [], []
+    drain(calc, results, errors)
+    assert results == [(5, "latest")] and errors == []
+    assert ran == ["latest"]  # superseded queued jobs never ran
+    assert calc.poll() is None  # delivered once
+
+def test_cancel_pending_drops_queued_work(calc):
+    job, started, release = blocker()
+    ran = []
+    calc.submit(job, "running", tag=1)
+    assert started.wait(TIMEOUT)
+    calc.submit(ran.append, "queued", tag=2)
+    calc.cancel_pending()
+    assert not calc.pending
+    release.set()
+    results, errors = [], []
+    drain(calc, results, errors, settle=0.2)
+    assert results == [] and errors == [] and ran == []
+
+def test_submit_after_cancel_is_delivered(calc):
+    calc.submit(lambda: "old", tag=1)
+    calc.cancel_pending()
+    calc.submit(lambda: "new", tag=2)
+    results, errors = [], []
+    drain(calc, results, errors)
+    assert results == [(2, "new")]
+
+def test_exception_reaches_error_callback(calc):
+    def fail():
+        raise ValueError("All inputs must be positive.")
+
+    calc.submit(fail, tag="bad")
+    results, errors = [], []
+    drain(calc, results, errors)
+    assert results == []
+    assert [(tag, type(e), str(e)) for tag, e in errors] == [("bad", ValueError, "All inputs must be positive.")]
+
+def test_superseded_exception_is_dropped(calc):
+    job, started, release = blocker()
+
+    def fail_later():
+        job(None)
+        raise RuntimeError("stale")
+
+    calc.submit(fail_later, tag=1)
+    assert started.wait(TIMEOUT)
+    calc.submit(lambda: "fresh", tag=2)
+    release.set()
+    results, errors = [], []
+    drain(calc, results, errors)
+    assert results == [(2, "fresh")] and errors == []
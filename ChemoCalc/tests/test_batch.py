@@ -0,0 +1,136 @@
+"""
+run_batch: results in input order, unique file names, one bad row isolated.
+
+Orders render across two worker processes in small chunks, so chunks finish
+out of order; results still come back in input order with each order's Sig
+and both documents on disk. Orders sharing an order_id get distinct stems,
+and a bad row (missing field, non-numeric value, not a dict) becomes an
+error result without touching its neighbours. With an ExportCache the
+results and documents are the same as without one.
+
+export_zip archives are read back: member names (with de-duplicated stems),
+manifest.json summary and per-order entries, error entries for bad rows,
+and a failing writer raising instead of leaving a silently short archive.
+"""
+
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+from chemocalc.batch import export_zip, run_batch
+from chemocalc.core import SCHEDULE_MODES, prepare_documents
+from chemocalc.exportcache import ExportCache
+
+def orders(n: int):
+    for i in range(n):
+        yield {"order_id": f"ord{i:04d}", "bsa": round(1.4 + (i % 80) / 100, 2), "mg_per_m2_day": 1000,
+               "days": (14, 21, 365)[i % 3], "tablet_size_mg": 500, "mode": SCHEDULE_MODES[i % len(SCHEDULE_MODES)]}
+
+def expected_sig(order):
+    return prepare_documents(order["bsa"], order["mg_per_m2_day"], order["days"], order["tablet_size_mg"],
+                             order["mode"])["pharmacy"]
+
+def test_results_in_input_order(tmp_path):
+    sample = list(orders(60))
+    results = list(run_batch(sample, str(tmp_path), workers=2, chunk_size=3))
+    assert [r["index"] for r in results] == list(range(60))
+    assert [r["order_id"] for r in results] == [o["order_id"] for o in sample]
+    for o, r in zip(sample, results):
+        assert r["ok"] and r["sig"] == expected_sig(o), r
+        assert os.path.getsize(r["provider_path"]) and os.path.getsize(r["patient_path"])
+
+def test_duplicate_order_ids_get_unique_stems(tmp_path):
+    sample = [dict(o, order_id="same") for o in orders(4)] + [dict(next(orders(1)), order_id="same/../x")]
+    results = list(run_batch(sample, str(tmp_path), workers=2, chunk_size=1))
+    paths = [r["provider_path"] for r in results]
+    assert len(set(paths)) == len(paths)
+    assert [os.path.basename(p) for p in paths[:2]] == ["same_provider.doc", "same_000001_provider.doc"]
+    assert all(os.path.dirname(p) == str(tmp_path) for p in paths)
+
+@pytest.mark.parametrize("bad", [None, "x", {"order_id": "b", "bsa": 1.7}, {"order_id": "b", "bsa": "abc",
+                                 "mg_per_m2_day": 1000, "days": 14, "tablet_size_mg": 500}])
+def test_bad_row_is_isolated(tmp_path, bad):
+    sample = list(orders(9))
+    sample[4] = bad
+    results = list(run_batch(sample, str(tmp_path), workers=2, chunk_size=3))
+    assert [r["ok"] for r in results] == [True] * 4 + [False] + [True] * 4
+    assert results[4]["error"].startswith("ValueError: ")
+    assert results[4]["order_id"] == (bad.get("order_id", "") if isinstance(bad, dict) else "")
+
+def test_cache_gives_the_same_results(tmp_path):
+    sample = list(orders(12)) * 2  # the second half hits
+    plain = list(run_batch(sample, str(tmp_path / "plain"), workers=1))
+    cache = ExportCache(str(tmp_path / "cache"))
+    cached = list(run_batch(sample, str(tmp_path / "cached"), workers=1, cache=cache))
+    assert [r["cache"] for r in cached[12:]] == [{"provider": "hit", "patient": "hit"}] * 12
+    for p, c in zip(plain, cached):
+        assert (p["sig"], p["total_tablets"]) == (c["sig"], c["total_tablets"])
+        with open(p["provider_path"], "rb") as f, open(c["provider_path"], "rb") as g:
+            assert f.read() == g.read()
+
+# -------------------- export_zip --------------------
+
+def read_zip(data: bytes):
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = zf.namelist()
+        return names, json.loads(zf.read("manifest.json")), {n: zf.read(n) for n in names}
+
+def test_zip_round_trip(tmp_path):
+    sample = list(orders(10))
+    sample[3] = dict(sample[3], order_id="dup")
+    sample[6] = dict(sample[6], order_id="dup")
+    sample[8] = {"order_id": "bad", "bsa": "abc", "mg_per_m2_day": 1000, "days": 14, "tablet_size_mg": 500}
+    sample.append(None)
+    target = tmp_path / "dayprep.zip"
+    summary = export_zip(sample, str(target), workers=2, chunk_size=2)
+    assert {k: summary[k] for k in ("orders", "ok", "errors")} == {"orders": 11, "ok": 9, "errors": 2}
+
+    names, manifest, members = read_zip(target.read_bytes())
+    assert names[-1] == "manifest.json"
+    assert manifest["summary"] == summary
+    entries = manifest["orders"]
+    assert [e["index"] for e in entries] == list(range(11))
+    assert [e["patient_member"] for e in entries if e["ok"]][3:5] == ["dup_patient.doc", "ord0004_patient.doc"]
+    assert entries[6]["provider_member"] == "dup_000006_provider.doc"
+    assert sorted(names[:-1]) == sorted(m for e in entries if e["ok"]
+                                        for m in (e["provider_member"], e["patient_member"]))
+    assert [(e["order_id"], e["error"].split(":")[0]) for e in entries if not e["ok"]] == [("bad", "ValueError"),
+                                                                                          ("", "ValueError")]
+    for o, e in zip(sample, entries):
+        if e["ok"]:
+            assert e["sig"] == expected_sig(o)
+            assert members[e["provider_member"]].startswith(b"{\\rtf1")
+
+def test_zip_to_file_object_matches_path(tmp_path):
+    sample = list(orders(5))
+    buf = io.BytesIO()
+    export_zip(sample, buf, workers=1)
+    export_zip(sample, str(tmp_path / "a.zip"), workers=1)
+    a, b = read_zip(buf.getvalue()), read_zip((tmp_path / "a.zip").read_bytes())
+    assert a[0] == b[0] and {n: v for n, v in a[2].items() if n != "manifest.json"} == \
+        {n: v for n, v in b[2].items() if n != "manifest.json"}
+
+class _FullDisk(io.BytesIO):
+    def __init__(self, limit: int):
+        super().__init__()
+        self.limit = limit
+
+    def write(self, data):
+        if self.tell() + len(data) > self.limit:
+            raise OSError(28, "No space left on device")
+        return super().write(data)
+
+def test_zip_writer_failure_propagates():
+    consumed = []
+
+    def tracked():
+        for o in orders(400):
+            consumed.append(o)
+            yield o
+
+    with pytest.raises(OSError, match="No space left"):
+        export_zip(tracked(), _FullDisk(20000), workers=2, chunk_size=4)
+    assert len(consumed) < 400  # the run stopped at the failure instead of rendering everything
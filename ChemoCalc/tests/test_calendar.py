@@ -0,0 +1,69 @@
+"""
+Calendar text: iter_calendar_lines() against the previous all-cells renderer.
+
+"\\n".join(iter_calendar_lines(...)) equals the old renderer (kept below as
+the reference) for lists and Schedules over random schedules and column
+counts; pages from iter_calendar_pages() reassemble to the same body; a
+paged calendar written to RTF (as lines or as one string) has \\page breaks
+and no raw form feed.
+"""
+
+import io
+import random
+
+import pytest
+
+from chemocalc.core import (
+    SCHEDULE_MODES, Schedule, RtfWriter, arrange_by_mode, iter_calendar_lines, iter_calendar_pages,
+)
+
+def reference_calendar(per_day_tabs, tablet_size_mg, cols=7):
+    # make_calendar_text before the streaming renderer: every cell built, then maxw scanned.
+    days = len(per_day_tabs)
+    rows = (days + cols - 1) // cols
+    cells = [f"Day {i+1}\n{tabs} tab(s)\n({tabs * tablet_size_mg} mg)" for i, tabs in enumerate(per_day_tabs)]
+    maxw = max((len(line) for cell in cells for line in cell.splitlines()), default=12)
+    cw = max(12, maxw)
+    header = " | ".join(f"D{c+1}".center(cw) for c in range(cols))
+    lines = [header, "-"*len(header)]
+    for r in range(rows):
+        block = []
+        for c_i in range(cols):
+            idx = r*cols + c_i
+            parts = cells[idx].splitlines() if idx < days else ["", "", ""]
+            block.append([p.ljust(cw) for p in parts[:3]])
+        for li in range(3):
+            lines.append(" | ".join(block[c_i][li] for c_i in range(cols)))
+        lines.append("-"*len(header))
+    return "\n".join(lines)
+
+def test_matches_reference_renderer():
+    rng = random.Random(20)
+    for _ in range(500):
+        days = rng.choice((0, 1, 6, 7, 8, 21, 30, 99, 365, 1000))
+        tab = rng.choice((1, 5, 50, 500, 1000))
+        seq = [rng.randint(0, rng.choice((3, 12, 150))) for _ in range(days)]
+        for cols in (7, 5, 1):
+            want = reference_calendar(seq, tab, cols)
+            where = f"days={days} tab={tab} cols={cols}"
+            assert "\n".join(iter_calendar_lines(seq, tab, cols)) == want, where
+            assert "\n".join(iter_calendar_lines(Schedule.from_list(seq), tab, cols)) == want, where
+            pages = [p.split("\n") for p in iter_calendar_pages(seq, tab, cols, weeks_per_page=4)]
+            assert [line for p in pages for line in p[2:]] == want.split("\n")[2:], where
+            assert all(p[:2] == want.split("\n")[:2] for p in pages), where
+
+@pytest.mark.parametrize("as_text", [False, True])
+@pytest.mark.parametrize("doc", ["provider", "patient"])
+def test_paged_rtf_uses_page_breaks(doc, as_text):
+    sched = arrange_by_mode(60, 30, 2.5, 3, 2, SCHEDULE_MODES[1])
+    lines = list(iter_calendar_lines(sched, 500, weeks_per_page=2))
+    calendar = "\n".join(lines) if as_text else iter(lines)
+    buf = io.StringIO()
+    with RtfWriter(buf) as w:
+        if doc == "provider":
+            w.provider_document("Paged", "Summary", "Sig", calendar, 75)
+        else:
+            w.patient_document("Paged", "Intro", calendar, 75)
+    out = buf.getvalue()
+    assert "\f" not in out
+    assert out.count(r"\page ") == lines.count("\f")
@@ -0,0 +1,64 @@
+"""
+Headless CLI: order validation and per-row error records.
+
+parse_order accepts numbers and numeric strings, rejects booleans (JSON
+true/false are not doses even though float(True) is 1.0), and run() keeps
+going after a bad row, writing its line number and message.
+"""
+
+import io
+import json
+
+import pytest
+
+from chemocalc.cli import run
+from chemocalc.core import DEFAULTS, parse_order
+
+GOOD = {"bsa": 1.8, "mg_per_m2_day": 1000, "days": 14, "tablet_size_mg": 500}
+
+def test_parse_order_accepts_numbers_and_strings():
+    assert parse_order(GOOD) == (1.8, 1000.0, 14, 500, DEFAULTS["mode"])
+    as_csv = {k: str(v) for k, v in GOOD.items()}
+    assert parse_order(as_csv)[:4] == (1.8, 1000.0, 14, 500)
+
+@pytest.mark.parametrize("field", ["bsa", "mg_per_m2_day", "days", "tablet_size_mg"])
+@pytest.mark.parametrize("value", [True, False])
+def test_parse_order_rejects_bool(field, value):
+    with pytest.raises(ValueError, match="numeric"):
+        parse_order(dict(GOOD, **{field: value}))
+
+@pytest.mark.parametrize("field", ["height_cm", "weight_kg", "bsa_cap"])
+def test_parse_order_rejects_bool_measurements(field):
+    order = {"height_cm": 170, "weight_kg": 70, "mg_per_m2_day": 1000, "days": 14, "tablet_size_mg": 500}
+    with pytest.raises(ValueError, match="numeric"):
+        parse_order(dict(order, **{field: True}))
+
+def test_run_reports_bad_rows_and_carries_on():
+    lines = [json.dumps(GOOD), json.dumps(dict(GOOD, bsa=True)), "[1, 2]", "{not json", json.dumps(GOOD)]
+    out = io.StringIO()
+    assert run(io.StringIO("\n".join(lines) + "\n"), out, "jsonl", "jsonl") == (5, 3)
+    recs = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r.get("error", "").split(":")[0] for r in recs] == ["", "line 2", "line 3", "line 4", ""]
+    assert recs[0]["total_tablets"] == recs[4]["total_tablets"] > 0
+
+def _run_jsonl(rows, *args):
+    out = io.StringIO()
+    run(io.StringIO("".join(json.dumps(r) + "\n" for r in rows)), out, "jsonl", "jsonl", DEFAULTS["mode"], *args)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+def test_row_exact_flag_overrides_global():
+    # 1.37 m^2 x 1250 / 25 mg is 68.5 tablets exactly, but 68.50000000000001 in floats.
+    order = {"bsa": 1.37, "mg_per_m2_day": 1250, "days": 5, "tablet_size_mg": 25}
+    rows = [order, dict(order, exact=True), dict(order, exact="yes"), dict(order, exact="0"), dict(order, exact=False)]
+    for exact in (False, True):
+        recs = _run_jsonl(rows, exact)
+        got = [(r["exact"], r["ceil_days"]) for r in recs]
+        assert got == [(exact, 2 if exact else 3), (True, 2), (True, 2), (False, 3), (False, 3)]
+
+def test_row_exact_flag_from_csv():
+    text = "bsa,mg_per_m2_day,days,tablet_size_mg,exact\n1.37,1250,5,25,\n1.37,1250,5,25,true\n1.37,1250,5,25,maybe\n"
+    out = io.StringIO()
+    assert run(io.StringIO(text), out, "csv", "jsonl") == (3, 1)
+    recs = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r.get("ceil_days") for r in recs] == [3, 2, None]
+    assert recs[2]["error"].startswith("line 4: ") and "exact" in recs[2]["error"]
@@ -0,0 +1,73 @@
+"""
+DoseTable: lookups equal live compute_mix + arrange_by_mode.
+
+Every on-grid cell and mode, a set of off-grid inputs (BSA between or
+outside the grid steps, other doses, course lengths, strengths and modes)
+and the same lookups after a JSON round trip (to_json -> json text ->
+from_json) all give the live mix dict and schedule. The site's own copy of
+the logic is checked by test_site_parity.py, which needs node.
+"""
+
+import json
+
+import pytest
+
+from chemocalc.core import SCHEDULE_MODES, arrange_by_mode, compute_mix
+from chemocalc.dosetable import DoseTable, bsa_grid
+
+DOSES, STRENGTHS, DAYS = (1000.0, 1250.0), (150, 500), (14, 21)
+
+def live(bsa, dose, days, tab, mode):
+    mix = compute_mix(bsa, dose, days, tab)
+    return mix, arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"], mix["floor_tabs"], mode)
+
+@pytest.fixture(scope="module")
+def table():
+    return DoseTable.build(DOSES, STRENGTHS, DAYS)
+
+@pytest.fixture(scope="module")
+def reloaded(table):
+    return DoseTable.from_json(json.loads(json.dumps(table.to_json(), separators=(",", ":"))))
+
+ON_GRID = [(bsa, dose, days, tab, mode) for bsa in bsa_grid() for dose in DOSES for days in DAYS
+           for tab in STRENGTHS for mode in SCHEDULE_MODES]
+
+OFF_GRID = [
+    (1.705, 1000.0, 14, 500, SCHEDULE_MODES[0]),  # between BSA steps
+    (1.19, 1250.0, 21, 150, SCHEDULE_MODES[1]),   # below the grid
+    (2.61, 1000.0, 14, 150, SCHEDULE_MODES[2]),   # above the grid
+    (1.70, 825.0, 14, 500, SCHEDULE_MODES[0]),    # dose not in the table
+    (1.70, 1000.0, 28, 500, SCHEDULE_MODES[1]),   # course length not in the table
+    (1.70, 1000.0, 14, 300, SCHEDULE_MODES[2]),   # strength not in the table
+    (1.83, 1250.0, 365, 150, "Weekly front-load"),
+]
+
+def test_on_grid_equals_live(table, reloaded):
+    assert len(table) == len(bsa_grid()) * len(DOSES) * len(DAYS) * len(STRENGTHS)
+    for args in ON_GRID:
+        want = live(*args)
+        assert table.lookup(*args) == want, args
+        assert reloaded.lookup(*args) == want, args
+
+@pytest.mark.parametrize("args", OFF_GRID)
+def test_off_grid_falls_back_to_live(table, reloaded, args):
+    assert table._cell(*args[:4]) is None or args[4] not in table.modes
+    want = live(*args)
+    assert table.lookup(*args) == want
+    assert reloaded.lookup(*args) == want
+
+def test_mode_outside_table_falls_back(tmp_path):
+    small = DoseTable.build(DOSES, STRENGTHS, DAYS, bsas=[1.7], modes=SCHEDULE_MODES[:1])
+    path = str(tmp_path / "dose_table.json")
+    small.save_json(path)
+    for t in (small, DoseTable.load_json(path)):
+        for mode in SCHEDULE_MODES:
+            assert t.lookup(1.7, 1000.0, 14, 500, mode) == live(1.7, 1000.0, 14, 500, mode)
+
+def test_schedules_are_deduplicated(table):
+    assert len(table.schedules) == len(set(table.schedules)) < len(table) * len(table.modes)
+
+def test_unknown_version_rejected(table):
+    data = dict(table.to_json(), version=99)
+    with pytest.raises(ValueError, match="version"):
+        DoseTable.from_json(data)
@@ -0,0 +1,58 @@
+"""
+compute_mix_exact against an independent Fraction-based oracle.
+
+Every grid point (BSA 1.20-2.60 by 0.01, common doses, strengths and course
+lengths) gets the oracle's ceil_days, floor/ceil tablets and exact tablets.
+Inputs are quantized half-even on their decimal value, and non-finite or
+non-numeric inputs raise ValueError.
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from chemocalc.core import compute_mix, compute_mix_exact
+
+BSAS = [round(1.20 + i / 100, 2) for i in range(141)]
+DOSES = (50.0, 60.0, 75.0, 100.0, 125.0, 200.0, 250.0, 825.0, 1000.0, 1250.0)
+STRENGTHS = (5, 10, 20, 25, 50, 100, 150, 250, 500)
+COURSES = (5, 7, 14, 21, 28, 30)
+
+def oracle(bsa, dose, days, tab):
+    t = Fraction(str(dose)) * Fraction(str(bsa)) / tab
+    f = t.numerator // t.denominator
+    c = f if t == f else f + 1
+    return t, f, c, 0 if t == f else max(0, min(days, round(days * (t - f))))
+
+@pytest.mark.parametrize("dose", DOSES)
+def test_matches_fraction_oracle(dose):
+    for bsa in BSAS:
+        for tab in STRENGTHS:
+            for days in COURSES:
+                ex = compute_mix_exact(bsa, dose, days, tab)
+                got = ex["exact_tabs"], ex["floor_tabs"], ex["ceil_tabs"], ex["ceil_days"]
+                assert got == oracle(bsa, dose, days, tab), f"bsa={bsa} dose={dose} days={days} tab={tab}"
+
+@pytest.mark.parametrize("bsa, units", [
+    (1.7, 17000), (1.70005, 17000), (1.70015, 17002), ("1.70025", 17002), (Decimal("1.70035"), 17004),
+    (Fraction(170005, 100000), 17000), (1.7000499999, 17000), (1.7000500001, 17001),
+])
+def test_bsa_quantized_half_even_on_decimal_value(bsa, units):
+    # 10000 mg/m^2 of a 1 mg tablet: exact_tabs is the BSA in 1/10000 m^2.
+    assert compute_mix_exact(bsa, 10000, 1, 1)["exact_tabs"] == units
+
+@pytest.mark.parametrize("bad", [float("inf"), float("-inf"), float("nan"), "inf", "nan", Decimal("Infinity"),
+                                 "abc", None])
+@pytest.mark.parametrize("field", range(4))
+def test_non_finite_or_non_numeric_raises_value_error(bad, field):
+    args = [1.8, 1000.0, 14, 500]
+    args[field] = bad
+    with pytest.raises(ValueError):
+        compute_mix(*args, exact=True)
+
+def test_equal_float_and_fraction_do_not_share_a_cache_entry():
+    # Fraction(1.20005) is the binary value, just above 1.20005; the float quantizes on its decimal.
+    assert compute_mix_exact(1.20005, 10000, 1, 1)["exact_tabs"] == 12000
+    assert compute_mix_exact(Fraction(1.20005), 10000, 1, 1)["exact_tabs"] == 12001
+    assert compute_mix_exact(Decimal(1.20005), 10000, 1, 1)["exact_tabs"] == 12001
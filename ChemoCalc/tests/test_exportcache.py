@@ -0,0 +1,107 @@
+"""
+ExportCache: hits and misses, key invalidation, and LRU eviction.
+
+A repeated order is a hit with byte-identical documents; changing any input
+(or the template version) is a miss. Eviction removes the least recently
+used entries first, a hit counts as a use, and a full cache is trimmed to
+its low-water mark so the next stores do not evict again. An entry evicted
+before it is copied out is rendered straight to the destination, and the
+default copy keeps the cache safe from edits to the output.
+"""
+
+import os
+import time
+
+import pytest
+
+from chemocalc import exportcache
+from chemocalc.core import prepare_documents
+from chemocalc.exportcache import ExportCache, export_order_cached
+
+ORDER = (1.8, 1000.0, 14, 500, "Weekly front-load")
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExportCache(str(tmp_path / "cache"))
+
+def export(cache, tmp_path, order=ORDER, name="out", **kw):
+    prov, pat = str(tmp_path / f"{name}_provider.doc"), str(tmp_path / f"{name}_patient.doc")
+    status = export_order_cached(cache, prov, pat, *order, **kw)
+    del status["sig"], status["total_tablets"]
+    with open(prov, "rb") as f, open(pat, "rb") as g:
+        return status, f.read(), g.read()
+
+def test_miss_then_hit(cache, tmp_path):
+    status, prov, pat = export(cache, tmp_path, name="a")
+    assert status == {"provider": "miss", "patient": "miss"}
+    again = export(cache, tmp_path, name="b")
+    assert again == ({"provider": "hit", "patient": "hit"}, prov, pat)
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert prov.startswith(b"{\\rtf1") and prov != pat
+
+def test_sig_and_total_same_on_hit_and_miss(cache, tmp_path):
+    docs = prepare_documents(*ORDER)
+    for name in ("a", "b"):
+        status = export_order_cached(cache, str(tmp_path / f"{name}_p.doc"), None, *ORDER)
+        assert (status["sig"], status["total_tablets"]) == (docs["pharmacy"], docs["total_pills"])
+    assert status["provider"] == "hit"
+
+@pytest.mark.parametrize("field, value", [(0, 1.81), (1, 1250.0), (2, 21), (3, 150), (4, "Front-load overall")])
+def test_changed_input_is_a_miss(cache, tmp_path, field, value):
+    export(cache, tmp_path, name="a")
+    order = list(ORDER)
+    order[field] = value
+    status, prov, _ = export(cache, tmp_path, tuple(order), name="b")
+    assert status == {"provider": "miss", "patient": "miss"}
+    assert prov != export(cache, tmp_path, name="c")[1]
+
+def test_equal_float_spellings_share_a_key():
+    assert ExportCache.key("provider", 1.7, 1000, 14, 500, "m") == ExportCache.key("provider", 1.70, 1000.0, 14, 500, "m")
+    assert ExportCache.key("provider", 1.7, 1000, 14, 500, "m") != ExportCache.key("patient", 1.7, 1000, 14, 500, "m")
+    assert ExportCache.key("provider", 1.7, 1000, 14, 500, "m") != ExportCache.key("provider", 1.7, 1000, 14, 500, "m", "T")
+
+def test_template_version_invalidates(cache, tmp_path, monkeypatch):
+    export(cache, tmp_path, name="a")
+    monkeypatch.setattr(exportcache, "RTF_TEMPLATE_VERSION", exportcache.RTF_TEMPLATE_VERSION + 1)
+    assert export(cache, tmp_path, name="b")[0] == {"provider": "miss", "patient": "miss"}
+
+def _put(cache, key, size=100):
+    def render(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+    return cache.store(key, render)
+
+def test_eviction_is_lru_and_trims_to_low_water(tmp_path):
+    cache = ExportCache(str(tmp_path / "cache"), max_bytes=1000)
+    keys = [f"{i:02d}" + "0" * 62 for i in range(12)]
+    t0 = time.time() - 3600
+    for i, key in enumerate(keys[:10]):  # 1000 bytes, oldest first
+        os.utime(_put(cache, key), (t0 + i, t0 + i))
+    assert cache.evictions == 0
+    assert cache.fetch(keys[0], str(tmp_path / "touched.rtf"))  # now the most recently used
+    _put(cache, keys[10])
+    # 1100 bytes > 1000: the two least recently used go, leaving 900 (low water).
+    assert cache.evictions == 2
+    assert [os.path.exists(cache.path_for(k)) for k in keys[:11]] == [True, False, False] + [True] * 8
+    _put(cache, keys[11])
+    assert cache.evictions == 2  # back at 1000: within the cap, no rescan
+
+def test_entry_evicted_before_copy_is_rendered_to_dest(cache, tmp_path, monkeypatch):
+    store = cache.store
+
+    def store_then_lose(key, render):
+        path = store(key, render)
+        os.remove(path)  # another process evicts it
+        return path
+
+    monkeypatch.setattr(cache, "store", store_then_lose)
+    status, prov, pat = export(cache, tmp_path, name="a")
+    assert status == {"provider": "miss", "patient": "miss"}
+    monkeypatch.undo()
+    assert export(ExportCache(str(tmp_path / "fresh")), tmp_path, name="b")[1:] == (prov, pat)
+
+def test_output_is_a_copy_by_default(cache, tmp_path):
+    _, prov, _ = export(cache, tmp_path, name="a")
+    with open(tmp_path / "a_provider.doc", "wb") as f:
+        f.write(b"edited")
+    assert export(cache, tmp_path, name="b")[1] == prov
@@ -0,0 +1,45 @@
+"""
+Cold import of the Tk-free core, measured in fresh interpreters.
+
+`python -X importtime -c "import chemocalc.core"` runs several times and the
+fastest run's cumulative time for the package must stay within the budget
+(CHEMOCALC_IMPORT_BUDGET_MS, default 12). Bytecode is compiled first, so a
+stale .pyc does not count as import cost. On failure, run the same command
+to see which import grew.
+"""
+
+import compileall
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+BUDGET_MS = float(os.environ.get("CHEMOCALC_IMPORT_BUDGET_MS", "12"))
+RUNS = 9
+
+# Loaded lazily by the code that needs them, never by importing the core.
+FORBIDDEN = ("tkinter", "_tkinter", "numpy", "typing", "fractions", "decimal", "concurrent.futures")
+
+def _run(*args) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+
+def import_time_us() -> int:
+    out = _run("-X", "importtime", "-c", "import chemocalc.core").stderr
+    for line in out.splitlines():
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == "chemocalc":
+            return int(fields[1])
+    raise AssertionError("no import time reported for chemocalc:\n" + out)
+
+def test_core_loads_no_gui_or_optional_modules():
+    code = ("import sys; before = set(sys.modules); import chemocalc.core; "
+            "print(' '.join(sorted(set(sys.modules) - before)))")
+    loaded = _run("-c", code).stdout.split()
+    assert "chemocalc.core" in loaded
+    assert [m for m in loaded if m in FORBIDDEN] == []
+
+def test_core_import_time_within_budget():
+    compileall.compile_dir(os.path.join(ROOT, "chemocalc"), quiet=1)
+    best_ms = min(import_time_us() for _ in range(RUNS)) / 1000
+    assert best_ms <= BUDGET_MS, f"import chemocalc.core took {best_ms:.1f} ms (budget {BUDGET_MS:g} ms)"
@@ -0,0 +1,78 @@
+"""
+diff_lines + apply_line_edits: the calendar Text update turns old into new.
+
+A list-backed stand-in for tk.Text follows Tk's index rules ("L.C", "L.end",
+"end", the implicit final newline, clamping past the last line). Applying
+diff_lines(old, new) to it must leave exactly new: same-length changes,
+insertions at the tail, deletions at the tail, a calendar shrinking or
+growing when the course length changes, and random line lists.
+"""
+
+import random
+
+import pytest
+
+from chemocalc.core import diff_lines, make_calendar_text
+
+pytest.importorskip("tkinter")
+from ChemoCalculatorCalendar import apply_line_edits  # noqa: E402
+
+class FakeText:
+    """The parts of tk.Text that apply_line_edits uses, over a list of lines."""
+
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    def _offset(self, text: str, index: str) -> int:
+        if index == "end":
+            return len(text)  # Tk's final newline is implicit and never deleted
+        line, col = index.split(".")
+        line = max(1, int(line))
+        if line > len(self.lines):
+            return len(text)
+        start = sum(len(s) + 1 for s in self.lines[:line - 1])
+        end = start + len(self.lines[line - 1])
+        return end if col == "end" else min(start + int(col), end)
+
+    def delete(self, first: str, last: str):
+        text = "\n".join(self.lines)
+        i, j = self._offset(text, first), self._offset(text, last)
+        if j > i:
+            self.lines = (text[:i] + text[j:]).split("\n")
+
+    def insert(self, index: str, chars: str):
+        text = "\n".join(self.lines)
+        i = self._offset(text, index)
+        self.lines = (text[:i] + chars + text[i:]).split("\n")
+
+def apply(old, new):
+    widget = FakeText(old)
+    apply_line_edits(widget, diff_lines(old, new), len(old))
+    return widget.lines
+
+@pytest.mark.parametrize("old, new", [
+    (["a", "b", "c"], ["a", "b", "c"]),                 # no edits
+    (["a", "b", "c"], ["a", "X", "c"]),                 # one changed line
+    (["a", "b", "c", "d"], ["X", "b", "Y", "Z"]),       # several runs
+    (["a", "b"], ["a", "b", "c", "d"]),                 # insertion at the tail
+    (["a", "b", "c", "d"], ["a", "b"]),                 # deletion at the tail
+    (["a", "b", "c", "d"], ["X"]),                      # shrink to one changed line
+    ([""], ["header", "row 1", "row 2"]),               # first calendar into the empty widget
+    (["a", "", "c"], ["a", "", "c", "", ""]),           # blank lines
+])
+def test_cases(old, new):
+    assert apply(old, new) == new
+
+@pytest.mark.parametrize("before, after", [(28, 14), (14, 28), (365, 7), (7, 365), (21, 21)])
+def test_calendar_resize(before, after):
+    old = make_calendar_text([2, 1] * (before // 2) + [2] * (before % 2), 500).split("\n")
+    new = make_calendar_text([1] * after, 500).split("\n")
+    assert apply(old, new) == new
+    assert apply(new, old) == old
+
+def test_random_line_lists():
+    rng = random.Random(19)
+    for _ in range(2000):
+        old = [rng.choice("ab") * rng.randint(0, 2) for _ in range(rng.randint(1, 8))]
+        new = [rng.choice("abc") * rng.randint(0, 2) for _ in range(rng.randint(1, 8))]
+        assert apply(old, new) == new, (old, new)
@@ -0,0 +1,75 @@
+"""
+compute_mix_batch against scalar compute_mix, row by row, bit for bit.
+
+A seeded random cohort (BSA, doses, strengths and course lengths over and
+beyond clinical ranges) plus edge rows (daily doses that are an exact
+number of tablets, ceil_days landing exactly on .5, tiny BSA, one-day and
+ten-year courses, broadcast scalars) must give the same floats (compared
+by their bits) and ints as compute_mix.
+"""
+
+import random
+import struct
+
+import pytest
+
+from chemocalc.core import compute_mix, compute_mix_batch
+
+np = pytest.importorskip("numpy")
+
+FLOAT_KEYS = ("exact_daily_mg", "exact_tabs")
+INT_KEYS = ("floor_tabs", "ceil_tabs", "ceil_days", "floor_days")
+
+def bits(x: float) -> bytes:
+    return struct.pack("<d", x)
+
+def assert_rows_match(bsa, dose, days, tab):
+    got = compute_mix_batch(bsa, dose, days, tab)
+    cols = {k: v.tolist() for k, v in got.items()}
+    for i, row in enumerate(zip(bsa, dose, days, tab)):
+        want = compute_mix(*row)
+        for k in FLOAT_KEYS:
+            assert bits(cols[k][i]) == bits(want[k]), (row, k)
+        for k in INT_KEYS:
+            assert cols[k][i] == want[k] and type(cols[k][i]) is int, (row, k)
+
+def test_random_cohort():
+    rng = random.Random(1)
+    n = 200_000
+    bsa = [rng.choice((round(rng.uniform(0.3, 3.0), 2), rng.uniform(0.3, 3.0))) for _ in range(n)]
+    dose = [rng.choice((50.0, 75.0, 825.0, 1000.0, 1250.0, round(rng.uniform(1, 3000), 1))) for _ in range(n)]
+    days = [rng.choice((1, 5, 7, 14, 21, 28, 84, 365, rng.randint(1, 4000))) for _ in range(n)]
+    tab = [rng.choice((5, 10, 50, 100, 150, 250, 500, rng.randint(1, 1000))) for _ in range(n)]
+    assert_rows_match(bsa, dose, days, tab)
+
+def test_edge_rows():
+    rows = [
+        (2.0, 250.0, 14, 500),       # exactly 1 tablet a day
+        (1.5, 1000.0, 21, 500),      # exactly 3
+        (1.6, 312.5, 28, 500),       # exactly 1, from a non-integer dose
+        (1.25, 100.0, 2, 250),       # 0.5 tab/day: ceil_days = round(1.0)
+        (1.25, 100.0, 1, 250),       # round(0.5) ties to even: 0
+        (1.25, 100.0, 3, 250),       # round(1.5) ties to even: 2
+        (1e-9, 1000.0, 14, 500),     # tiny BSA
+        (5e-324, 1.0, 7, 1),         # smallest subnormal
+        (1.7, 1e-6, 365, 1000),      # tiny dose
+        (2.6, 3000.0, 3650, 1),      # large everything
+        (1.7, 50.0, 1, 50),
+        (0.1 + 0.2, 100.0, 30, 30),  # binary-inexact inputs
+    ]
+    assert_rows_match(*map(list, zip(*rows)))
+
+def test_broadcast_scalars_and_int_columns():
+    bsa = np.round(np.arange(1.20, 2.605, 0.01), 2)
+    got = compute_mix_batch(bsa, 1250.0, np.full(bsa.shape, 21, dtype=np.int32), 500)
+    for i, b in enumerate(bsa.tolist()):
+        want = compute_mix(b, 1250.0, 21, 500)
+        assert all(got[k][i] == want[k] for k in INT_KEYS)
+        assert bits(float(got["exact_tabs"][i])) == bits(want["exact_tabs"])
+
+@pytest.mark.parametrize("bad", [0.0, -1.0])
+def test_non_positive_raises_like_scalar(bad):
+    with pytest.raises(ValueError):
+        compute_mix(bad, 1000.0, 14, 500)
+    with pytest.raises(ValueError):
+        compute_mix_batch([1.7, bad], 1000.0, 14, 500)
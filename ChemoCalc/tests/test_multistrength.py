@@ -0,0 +1,78 @@
+"""
+compute_mix_multi against a brute-force search.
+
+On small grids (strength sets of 2-4 tablets, BSA, dose, course length) the
+chosen mix matches searching every reachable amount for the nearest levels
+at or below and at or above the target, then trying every number of high
+days, ranked by dose error, then tablets. The fewest tablets per amount
+come from an independent search here, not from the module's DP table.
+"""
+
+from functools import lru_cache, reduce
+from math import gcd
+
+import pytest
+
+from chemocalc.multistrength import compute_mix_multi, tablet_combo
+
+STRENGTH_SETS = [(150, 500), (100, 150, 250), (150, 250, 100), (1000, 200, 250, 300), (50, 75, 300),
+                 (5, 20, 25), (150, 500, 1000)]
+BSAS = (1.3, 1.5, 1.71, 1.9, 2.2)
+DOSES = (150, 825, 1000, 1250)
+COURSES = (1, 5, 14, 21, 38, 45)
+
+@lru_cache(maxsize=None)
+def _fewest_table(strengths, upto):
+    best = [0] + [None] * upto
+    for a in range(1, upto + 1):
+        options = [best[a - s] for s in strengths if s <= a and best[a - s] is not None]
+        best[a] = min(options) + 1 if options else None
+    return best
+
+def fewest_tablets(amount, strengths):
+    return _fewest_table(strengths, 4000)[amount]
+
+def brute_force(bsa, dose, days, strengths):
+    target = dose * bsa
+    exact_total = days * target
+    big, g = max(strengths), reduce(gcd, strengths)
+    reachable = [(a * g, fewest_tablets(a * g, strengths)) for a in range(int(-(-(target + big) // g)) + 1)]
+    reachable = [lv for lv in reachable if lv[1] is not None]
+    lo, lo_tabs = max(lv for lv in reachable if lv[0] <= target)
+    hi, hi_tabs = min(lv for lv in reachable if lv[0] >= target)
+    best = None
+    for k in (range(days + 1) if hi != lo else (0,)):
+        total = k * hi + (days - k) * lo
+        key = (abs(total - exact_total), k * hi_tabs + (days - k) * lo_tabs, k)
+        if best is None or key < best:
+            best = key
+    err, tabs, k = best
+    return lo, hi, k, tabs, err
+
+@pytest.mark.parametrize("strengths", STRENGTH_SETS)
+def test_matches_brute_force(strengths):
+    for bsa in BSAS:
+        for dose in DOSES:
+            for days in COURSES:
+                m = compute_mix_multi(bsa, dose, days, strengths)
+                got = (m["floor_mg"], m["ceil_mg"], m["ceil_days"], m["total_tablets"], abs(m["dose_error_mg"]))
+                assert got == brute_force(bsa, dose, days, strengths), f"bsa={bsa} dose={dose} days={days}"
+
+@pytest.mark.parametrize("bsa, dose, days", [(1.9, 825, 14), (1.0, 60, 14), (1.5, 33, 10)])
+def test_every_day_next_to_target(bsa, dose, days):
+    # 150/500 mg: each day is the nearest reachable amount below or above the daily dose.
+    m = compute_mix_multi(bsa, dose, days, [150, 500])
+    target = bsa * dose
+    assert m["floor_mg"] <= target <= m["ceil_mg"]
+    assert m["ceil_mg"] - m["floor_mg"] <= 150
+
+def test_tablet_combo_fewest_tablets():
+    for strengths in STRENGTH_SETS:
+        for amount in range(0, 3001, 5):
+            combo = tablet_combo(amount, strengths)
+            want = fewest_tablets(amount, strengths)
+            if combo is None:
+                assert want is None
+            else:
+                assert sum(s * n for s, n in combo.items()) == amount
+                assert sum(combo.values()) == want
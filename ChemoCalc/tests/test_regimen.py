@@ -0,0 +1,48 @@
+"""
+Multi-cycle regimens: template-based compute_regimen against per-day lists.
+
+For random regimens (1-3 phases, every mode, rest periods of 0-23 days,
+1-20 cycles) the regimen Schedule equals the per-day list built cycle by
+cycle (compute_mix + arranger per cycle, then zeros for the off days);
+total_tablets equals its sum, and the calendar equals iter_calendar_lines
+over that list with the rest label on exactly the off days.
+"""
+
+import random
+
+from chemocalc.core import SCHEDULE_MODES, compute_mix, arrange_by_mode, iter_calendar_lines
+from chemocalc.regimen import REST_LABEL, compute_regimen, make_regimen_calendar
+
+def per_day_list(bsa, tab, phases, mode, rest=None):
+    days = []
+    for mg_day, on_days, off_days, cycles in phases:
+        for _ in range(cycles):
+            mix = compute_mix(bsa, mg_day, on_days, tab)
+            days += arrange_by_mode(on_days, mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"],
+                                    mix["floor_tabs"], mode).tolist()
+            days += [0] * off_days
+            if rest is not None:
+                rest += [0] * on_days + [1] * off_days
+    return days
+
+def test_matches_per_day_construction():
+    rng = random.Random(25)
+    for _ in range(400):
+        bsa, tab, mode = round(rng.uniform(1.3, 2.3), 2), rng.choice((100, 150, 500)), rng.choice(SCHEDULE_MODES)
+        phases = [(rng.choice((30, 150, 825, 1000, 1250)), rng.choice((5, 7, 14, 21)), rng.choice((0, 7, 14, 23)),
+                   rng.randint(1, 20)) for _ in range(rng.randint(1, 3))]
+        reg = compute_regimen(bsa, tab, phases, mode)
+        rest = []
+        want = per_day_list(bsa, tab, phases, mode, rest)
+        where = f"bsa={bsa} tab={tab} mode={mode} phases={phases}"
+        assert reg["schedule"] == want, where
+        assert (reg["total_tablets"], reg["days"]) == (sum(want), len(want)), where
+        assert reg["rest_days"] == rest, where
+        calendar = "\n".join(iter_calendar_lines(want, tab, rest_label=REST_LABEL, rest_days=rest))
+        assert make_regimen_calendar(reg) == calendar, where
+
+def test_zero_tablet_on_days_are_not_rest():
+    reg = compute_regimen(1.0, 100, [(30, 5, 2, 2)], mode="Alternating high/low")
+    assert "Days 4-5: 0 tab(s); Days 6-7: rest (no tablets)" in reg["sig"]
+    cells = make_regimen_calendar(reg).split("\n")[3].split(" | ")
+    assert [c.strip() for c in cells] == ["1 tab(s)", "0 tab(s)", "1 tab(s)", "0 tab(s)", "0 tab(s)", "Rest", "Rest"]
@@ -0,0 +1,94 @@
+"""
+Sig/calendar render memo: cached output equals uncached output.
+
+A cohort of capecitabine-like orders (BSA 1.40-2.20, one protocol dose, a
+few course lengths, every mode) is rendered with SIG_CACHE and
+CALENDAR_CACHE disabled and then enabled. Equal-valued int and float inputs
+(50 and 50.0 mg, [2, 2, 1] and [2.0, 2.0, 1.0]) are rendered in both orders,
+so output never depends on what was rendered first.
+"""
+
+import random
+
+import pytest
+
+from chemocalc.core import (
+    SCHEDULE_MODES, SIG_CACHE, CALENDAR_CACHE, compute_mix, arrange_by_mode, format_pharmacy_snippet,
+    Schedule, make_calendar_text,
+)
+
+def cohort(n: int, seed: int = 15):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield (round(rng.uniform(1.40, 2.20), 2), 1250.0, rng.choice((14, 21, 28)), 500,
+               rng.choice(SCHEDULE_MODES))
+
+def render_all(orders):
+    out = []
+    for bsa, dose, days, tab, mode in orders:
+        mix = compute_mix(bsa, dose, days, tab)
+        sched = arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"], mix["floor_tabs"], mode)
+        out.append((format_pharmacy_snippet(sched, tab, days, dose, bsa), make_calendar_text(sched, tab)))
+    return out
+
+def _clear():
+    for c in (SIG_CACHE, CALENDAR_CACHE):
+        c.clear()
+
+@pytest.fixture
+def fresh_caches():
+    sizes = SIG_CACHE.maxsize, CALENDAR_CACHE.maxsize
+    _clear()
+    yield
+    SIG_CACHE.resize(sizes[0])
+    CALENDAR_CACHE.resize(sizes[1])
+    _clear()
+
+def test_cached_equals_uncached(fresh_caches):
+    orders = list(cohort(2000))
+    sizes = SIG_CACHE.maxsize, CALENDAR_CACHE.maxsize
+    SIG_CACHE.resize(0)
+    CALENDAR_CACHE.resize(0)
+    want = render_all(orders)
+    SIG_CACHE.resize(sizes[0])
+    CALENDAR_CACHE.resize(sizes[1])
+    assert render_all(orders) == want
+    assert render_all(orders) == want  # warm
+    assert SIG_CACHE.hits and CALENDAR_CACHE.hits
+
+def test_int_and_float_inputs_independent_of_call_order(fresh_caches):
+    sched, fsched = [2, 2, 1], [2.0, 2.0, 1.0]
+
+    def render(tab, days):
+        return format_pharmacy_snippet(days, tab, 3, 100.0, 1.5), make_calendar_text(days, tab)
+
+    cases = [(50, sched), (50.0, sched), (50, fsched), (50.0, fsched)]
+    _clear()
+    first = [render(*case) for case in cases]
+    _clear()
+    assert [render(*case) for case in reversed(cases)][::-1] == first
+
+def test_mixed_types_within_a_run_get_their_own_entry(fresh_caches):
+    # Equal runs, same set of types, different renderings ("2 ... 1.0" vs "2.0 ... 1").
+    cases = [[2, 2.0, 1.0], [2.0, 2, 1], [2, 2, 1], [2.0, 2.0, 1.0]]
+    cases += [Schedule([(2, 2, ((0, 1, 2), (1, 1, 2.0))), (1, 1, ((0, 1, 1.0),))]),
+              Schedule([(2, 2, ((0, 1, 2.0), (1, 1, 2))), (1, 1, ((0, 1, 1),))])]
+
+    def render(days):
+        return format_pharmacy_snippet(days, 50, 3, 100.0, 1.5), make_calendar_text(days, 50)
+
+    sizes = SIG_CACHE.maxsize, CALENDAR_CACHE.maxsize
+    SIG_CACHE.resize(0)
+    CALENDAR_CACHE.resize(0)
+    want = [render(days) for days in cases]
+    SIG_CACHE.resize(sizes[0])
+    CALENDAR_CACHE.resize(sizes[1])
+    assert [render(days) for days in cases] == want
+    _clear()
+    assert [render(days) for days in reversed(cases)][::-1] == want
+
+def test_schedule_hash_matches_equal_tuple():
+    sched = Schedule([(7, 2, ((0, 1, 2), (1, 1, 1)))])
+    days = tuple(sched)
+    assert sched == days and hash(sched) == hash(days)
+    assert len({sched, days, Schedule([(7, 7, ((0, 1, 2), (1, 1, 1), (2, 1, 2), (3, 1, 1), (4, 1, 2), (5, 1, 1), (6, 1, 2)))])}) == 1
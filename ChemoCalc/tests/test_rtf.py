@@ -0,0 +1,48 @@
+"""
+Provider RTF text: one-pass rtf_ascii against the original sanitize-then-escape chain.
+
+rtf_ascii(s) == _rtf_escape(ascii_sanitize_original(s)) (and the
+newlines=True variant), and ascii_sanitize matches the original, on real
+documents and on random strings drawn from the mapped characters, RTF
+specials, "m²" fragments and arbitrary non-ASCII.
+"""
+
+import random
+
+from chemocalc.core import _rtf_escape, ascii_sanitize, rtf_ascii, prepare_documents, SCHEDULE_MODES
+
+def reference_ascii_sanitize(s):
+    # The original 18-replace implementation, kept verbatim as the oracle.
+    mapping = {
+        "m²": "m^2", "µ": "u", "×": "x", "–": "-", "—": "-", "→": "->",
+        "≤": "<=", "≥": ">=", "…": "...", "“": '"', "”": '"', "‘": "'", "’": "'",
+        "•": "-", "°": " deg ", "™": "(TM)", "®": "(R)", "©": "(C)"
+    }
+    for k,v in mapping.items():
+        s = s.replace(k,v)
+    try:
+        s = s.encode('ascii', 'ignore').decode('ascii')
+    except Exception:
+        pass
+    return s
+
+def reference_chain(s, newlines=False):
+    out = _rtf_escape(reference_ascii_sanitize(s))
+    return out.replace("\n", r"\line ") if newlines else out
+
+ALPHABET = list("m²µ×–—→≤≥…“”‘’•°™®©\\{}\n\t ~aZ09^") + ["m²", "mm²²", "\x7f", "é", "日", "\U0001f48a", "\ud800"]
+
+def samples():
+    for mode in SCHEDULE_MODES:
+        for days in (1, 7, 21, 30):
+            docs = prepare_documents(1.73, 1250.0, days, 150, mode)
+            yield from (docs["summary"], docs["pharmacy"], docs["calendar"], docs["patient_intro"])
+    rng = random.Random(11)
+    for _ in range(20000):
+        yield "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 40)))
+
+def test_matches_original_chain():
+    for s in samples():
+        assert rtf_ascii(s) == reference_chain(s), repr(s)
+        assert rtf_ascii(s, newlines=True) == reference_chain(s, True), repr(s)
+        assert ascii_sanitize(s) == reference_ascii_sanitize(s), repr(s)
@@ -0,0 +1,76 @@
+"""
+compress_runs / is_strict_alternating: Schedule and NumPy paths against plain lists.
+
+Random Schedules (plain runs, periodic patterns with repeated or cut-off
+cycles, neighbouring equal runs, concatenations) and every arranger's output
+for 1-400 days give the same runs and the same alternating verdict as the
+expanded day-by-day list. With NumPy, the array path returns exactly what
+the list path returns (same tuples, plain Python ints) on random and
+structured schedules of 0 to 500 days.
+"""
+
+import random
+
+import pytest
+
+from chemocalc.core import SCHEDULE_MODES, Schedule, arrange_by_mode, compress_runs, is_strict_alternating
+
+def random_schedule(rng):
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        pattern = [(rng.randint(1, 3), rng.choice((0, 1, 2, 2, 3))) for _ in range(rng.randint(1, 4))]
+        kind = rng.random()
+        if kind < 0.3:
+            parts.append(Schedule.from_runs(pattern))
+        else:
+            period = sum(n for n, _ in pattern)
+            parts.append(Schedule.periodic(pattern, rng.randint(1, 5 * period + 3)))
+    if rng.random() < 0.3:
+        a, b = rng.sample((1, 2, 3), 2)
+        parts.append(Schedule.periodic([(1, a), (1, b)], rng.randint(1, 30)))
+    out = parts[0]
+    for p in parts[1:]:
+        out = out + p
+    return out
+
+def assert_same_as_list(sched, where):
+    days = sched.tolist()
+    assert compress_runs(sched) == compress_runs(days), where
+    assert sched.runs() == compress_runs(days), where
+    assert is_strict_alternating(sched) == is_strict_alternating(days), where
+
+def test_random_schedules():
+    rng = random.Random(4)
+    for _ in range(20000):
+        sched = random_schedule(rng)
+        assert_same_as_list(sched, sched.segments())
+
+@pytest.mark.parametrize("mode", SCHEDULE_MODES)
+def test_arranger_schedules(mode):
+    for days in range(1, 401):
+        for exact in (1.5, 2.25, 3.7, 4.0):
+            sched = arrange_by_mode(days, round(days * (exact % 1)), exact, int(exact) + 1, int(exact), mode)
+            assert_same_as_list(sched, f"days={days} exact_tabs={exact}")
+
+def numpy_samples(rng):
+    for n in range(0, 501):
+        yield [rng.randint(1, 3) for _ in range(n)]
+        yield [2, 1] * (n // 2) + [2] * (n % 2)
+        alt = [3, 1] * (n // 2) + [3] * (n % 2)
+        if n > 4:
+            alt[rng.randrange(n)] = 2
+        yield alt
+        yield [2] * n
+        yield [2] * (n // 2) + [1] * (n - n // 2)
+
+def test_numpy_paths_match_lists():
+    np = pytest.importorskip("numpy")
+    from chemocalc.core import _compress_runs_np, _is_strict_alternating_np
+    for seq in numpy_samples(random.Random(16)):
+        a = np.asarray(seq, dtype=np.int64)
+        for fn, np_fn in ((compress_runs, _compress_runs_np), (is_strict_alternating, _is_strict_alternating_np)):
+            want = fn(seq)
+            got = np_fn(a)
+            assert got == want, f"{fn.__name__} n={len(seq)} seq={seq}"
+            assert repr(got) == repr(want), "NumPy scalars leaked out"
+            assert fn(a) == want, "public dispatch, either side of NUMPY_MIN_DAYS"
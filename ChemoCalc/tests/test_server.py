@@ -0,0 +1,130 @@
+"""
+chemocalc.server: responses over HTTP equal handle_order() run in-process.
+
+Concurrent keep-alive clients send /v1/schedule, /v1/calendar and /v1/batch
+requests to a server on a free localhost port. Also covers the days limit,
+non-object orders, "Connection: close", and a clean SIGTERM shutdown of the
+process-pool service.
+"""
+
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from chemocalc.core import SCHEDULE_MODES
+from chemocalc.server import SchedulingServer, handle_order
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def orders(n: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {"order_id": f"o{i}", "bsa": round(rng.uniform(1.4, 2.2), 2), "mg_per_m2_day": 1250,
+               "days": rng.choice((14, 21, 28)), "tablet_size_mg": 500, "mode": rng.choice(SCHEDULE_MODES)}
+
+async def request(reader, writer, path: str, body, close: bool = False):
+    data = json.dumps(body).encode()
+    writer.write(b"POST %s HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 b"Content-Length: %d\r\n%s\r\n%s" % (path.encode(), len(data),
+                                                      b"Connection: close\r\n" if close else b"", data))
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = int(next(line.split(b":")[1] for line in head.split(b"\r\n") if line.lower().startswith(b"content-length")))
+    status = int(head.split(b" ", 2)[1])
+    return status, await reader.readexactly(length)
+
+async def client(port: int, cid: int, n: int, mismatches: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for k, order in enumerate(orders(n, seed=cid)):
+            if k % 25 == 24:
+                path, op, body = "/v1/batch", "batch", {"op": "schedule", "orders": [order, order]}
+            elif k % 10 == 9:
+                path, op, body = "/v1/calendar", "calendar", order
+            else:
+                path, op, body = "/v1/schedule", "schedule", order
+            got = await request(reader, writer, path, body)
+            want_status, want = handle_order("schedule" if op == "batch" else op, order)
+            if op == "batch":
+                want = b'{"results":[' + want + b"," + want + b"]}"
+            if got != (want_status, want):
+                mismatches.append((path, order, got))
+    finally:
+        writer.close()
+
+def serving(coro_fn, **kwargs):
+    async def run():
+        server = await SchedulingServer(port=0, **kwargs).start()
+        try:
+            return await coro_fn(server.port)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_concurrent_clients_get_handle_order_results(pool):
+    mismatches = []
+
+    async def go(port):
+        await asyncio.gather(*(client(port, c, 30, mismatches) for c in range(20)))
+
+    serving(go, pool=pool, workers=2)
+    assert mismatches == []
+
+def test_days_limit_and_bad_orders():
+    order = next(orders(1, 0))
+
+    async def go(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            too_long = await request(reader, writer, "/v1/documents", dict(order, days=1e9))
+            batch = await request(reader, writer, "/v1/batch", {"op": "schedule", "orders": [None, order]})
+            return too_long, batch
+        finally:
+            writer.close()
+
+    (status, body), (batch_status, batch) = serving(go, pool="thread", workers=1, max_days=400)
+    assert status == 400 and json.loads(body)["error"] == "days must be at most 400"
+    results = json.loads(batch)["results"]
+    assert batch_status == 200 and "error" in results[0] and "error" not in results[1]
+
+def test_connection_close_reaches_eof():
+    async def go(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            status, _ = await request(reader, writer, "/v1/schedule", next(orders(1, 0)), close=True)
+            return status, await asyncio.wait_for(reader.read(), 10)
+        finally:
+            writer.close()
+
+    assert serving(go, pool="process", workers=2) == (200, b"")
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="POSIX signals")
+def test_sigterm_releases_the_port():
+    port = _free_port()
+    cmd = [sys.executable, "-m", "chemocalc.server", "--port", str(port), "--workers", "2"]
+    for _ in range(2):  # the second start fails if a worker still holds the port
+        proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        try:
+            assert "chemocalc service" in proc.stdout.readline()
+            body = json.dumps(next(orders(1, 0))).encode()
+            with socket.create_connection(("127.0.0.1", port)) as s:
+                s.sendall(b"POST /v1/schedule HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+                assert s.recv(4096).startswith(b"HTTP/1.1 200")
+            proc.send_signal(signal.SIGTERM)
+            assert proc.wait(timeout=20) == 0
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
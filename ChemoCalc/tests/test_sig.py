@@ -0,0 +1,82 @@
+"""
+Pharmacy Sig wording: the text describes exactly the scheduled days.
+
+Each Sig is expanded back into per-day tablets (listed runs, plus the
+"repeat every k days" cycles) and compared with the schedule. Weekly
+front-load courses, whose first weeks carry the leftover high days and
+whose last week may be cut short, get the cycle wording after a listed
+head instead of one clause per run.
+"""
+
+import random
+import re
+
+import pytest
+
+from chemocalc.core import Schedule, arrange_by_mode, compress_runs, compute_mix, format_pharmacy_snippet
+
+CLAUSE = re.compile(r"Days? (\d+)(?:-(\d+))?: ([\d.]+) tab\(s\)")
+REPEAT = re.compile(r"[Rr]epeat every (\d+) days: (.*?) \([^)]*, Days (\d+)-(\d+)\)")
+
+def expand_sig(sig: str, days: int) -> list:
+    out = [None] * days
+
+    def fill(text, put):
+        for s, e, t in CLAUSE.findall(text):
+            for d in range(int(s), int(e or s) + 1):
+                put(d, t)
+
+    m = REPEAT.search(sig)
+    if m:
+        p, first, last = int(m[1]), int(m[3]), int(m[4])
+        cycle = {}
+        fill(m[2], cycle.__setitem__)
+        for d in range(first, last + 1):
+            out[d - 1] = cycle[first + (d - first) % p]
+        sig = sig[:m.start()] + sig[m.end():]
+
+    def put(d, t):
+        assert out[d - 1] is None, f"day {d} described twice"
+        out[d - 1] = t
+
+    fill(sig, put)
+    return out
+
+def weekly(bsa, dose, days, tab):
+    mix = compute_mix(bsa, dose, days, tab)
+    return arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"], mix["floor_tabs"],
+                           "Weekly front-load")
+
+@pytest.mark.parametrize("days", [84, 365])
+@pytest.mark.parametrize("dose", [825.0, 1000.0, 1250.0])
+@pytest.mark.parametrize("tab", [150, 500])
+def test_weekly_frontload_uses_cycle_wording(days, dose, tab):
+    for i in range(0, 141, 4):
+        bsa = round(1.20 + i / 100, 2)
+        sched = weekly(bsa, dose, days, tab)
+        sig = format_pharmacy_snippet(sched, tab, days, dose, bsa)
+        assert expand_sig(sig, days) == [str(t) for t in sched], sig
+        if len(compress_runs(sched)) > 3:
+            assert "epeat every 7 days" in sig and len(sig) < 400, sig
+
+def test_weekly_frontload_head_and_tail():
+    sig = format_pharmacy_snippet(weekly(1.73, 1250.0, 365, 500), 500, 365, 1250.0, 1.73)
+    assert sig.startswith("Tablet size 500 mg; Days 1-23: 5 tab(s); then repeat every 7 days: "
+                          "Days 24-28: 4 tab(s); Days 29-30: 5 tab(s) (48 cycles + Days 1-5 of cycle 49, "
+                          "Days 24-364); then Day 365: 4 tab(s); total 365 days; ")
+
+def test_random_head_cycle_tail_round_trips():
+    rng = random.Random(14)
+    for _ in range(500):
+        head = Schedule.from_runs([(rng.randint(1, 4), rng.randint(0, 4)) for _ in range(rng.randint(0, 4))])
+        cycle = [(rng.randint(1, 3), rng.randint(0, 4)) for _ in range(rng.randint(1, 3))]
+        tail = Schedule.from_runs([(rng.randint(1, 3), rng.randint(0, 4)) for _ in range(rng.randint(0, 2))])
+        sched = head + Schedule.periodic(cycle, rng.randint(1, 60)) + tail
+        days = len(sched)
+        if not days:
+            continue
+        sig = format_pharmacy_snippet(sched, 50, days, 100.0, 1.5)
+        if "Alternate" in sig:
+            continue  # its own wording, not runs
+        assert expand_sig(sig, days) == [str(t) for t in sched], sig
+        assert len(CLAUSE.findall(sig)) <= len(compress_runs(sched)), sig
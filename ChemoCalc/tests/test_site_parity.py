@@ -0,0 +1,61 @@
+"""
+Static site vs desktop: the page's off-grid JS (computeMix + ARRANGERS in
+chemo_calc_site/index.html) against chemocalc.compute_mix + arrange_by_mode.
+
+The "Desktop rounding mix and arrangers" block is cut out of index.html and
+run under node over a grid (BSA 1.20-2.60 by 0.01 and some off-grid values,
+common doses and strengths, 1-60 and 84 days, every mode). Every schedule
+must match day by day. Skipped without node on PATH.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from chemocalc.core import SCHEDULE_MODES, compute_mix, arrange_by_mode
+
+SITE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chemo_calc_site", "index.html")
+BEGIN = "// ---- Desktop rounding mix and arrangers"
+END = "// ---- end desktop ports ----"
+MODE_VALUES = {"Front-load overall": "front-load", "Weekly front-load": "weekly-front-load",
+               "Alternating high/low": "alternating"}
+
+DRIVER = """
+let input = '';
+process.stdin.on('data', (d) => { input += d; });
+process.stdin.on('end', () => {
+  const out = JSON.parse(input).map(([bsa, dose, days, tab, mode]) => {
+    const mix = computeMix(bsa, dose, days, tab);
+    return ARRANGERS[mode](days, mix.numHighDays, mix.exactTabs, mix.high, mix.low);
+  });
+  process.stdout.write(JSON.stringify(out));
+});
+"""
+
+def cases():
+    bsas = [round(1.20 + i / 100, 2) for i in range(141)] + [1.234, 1.7777, 2.005, 2.6049]
+    for bsa in bsas:
+        for dose in (50.0, 150.0, 825.0, 1000.0, 1250.0):
+            for tab in (50, 150, 500):
+                for days in list(range(1, 61)) + [84]:
+                    for mode in SCHEDULE_MODES[:3]:
+                        yield bsa, dose, days, tab, mode
+
+def test_site_matches_desktop():
+    node = shutil.which("node")
+    if not node:
+        pytest.skip("node not found; install Node.js to run this check")
+    html = open(SITE, encoding="utf-8").read()
+    script = html[html.index(BEGIN):html.index(END)] + DRIVER
+    grid = list(cases())
+    payload = [[bsa, dose, days, tab, MODE_VALUES[mode]] for bsa, dose, days, tab, mode in grid]
+    got = json.loads(subprocess.run([node, "-e", script], input=json.dumps(payload), capture_output=True,
+                                    text=True, check=True).stdout)
+    assert len(got) == len(grid)
+    for (bsa, dose, days, tab, mode), js in zip(grid, got):
+        mix = compute_mix(bsa, dose, days, tab)
+        want = arrange_by_mode(days, mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"], mix["floor_tabs"], mode)
+        assert want == js, f"bsa={bsa} dose={dose} days={days} tab={tab} mode={mode}"
@@ -0,0 +1,75 @@
+"""
+ScheduleStore: stored rows round-trip, and lookups use their indexes.
+
+The Schedule rebuilt from the stored runs (segments) equals a fresh
+arrange_by_mode and the stored Sig matches; patient, start-date and
+input-hash lookups are index-backed; bad orders are reported by position.
+"""
+
+import datetime
+import random
+
+import pytest
+
+from chemocalc.core import SCHEDULE_MODES, compute_mix, arrange_by_mode, format_pharmacy_snippet
+from chemocalc.store import ScheduleStore, input_hash
+
+def orders(n: int, patients: int, seed: int = 23):
+    rng = random.Random(seed)
+    day0 = datetime.date(2024, 1, 1)
+    for i in range(n):
+        yield {"order_id": f"ord{i:07d}", "patient_id": f"MRN{rng.randrange(patients):06d}",
+               "start_date": (day0 + datetime.timedelta(days=rng.randrange(900))).isoformat(),
+               "bsa": round(rng.uniform(1.3, 2.4), 2), "mg_per_m2_day": rng.choice((825, 1000, 1250)),
+               "days": rng.choice((7, 14, 21, 28, 90, 365)), "tablet_size_mg": rng.choice((150, 500)),
+               "mode": rng.choice(SCHEDULE_MODES)}
+
+@pytest.fixture
+def store(tmp_path):
+    with ScheduleStore(str(tmp_path / "schedules.db")) as s:
+        yield s
+
+def test_round_trip(store):
+    sample = list(orders(2000, 200))
+    assert store.add_orders(sample, batch_size=500) == len(sample)
+    assert len(store) == len(sample)
+    for o in sample:
+        row = store.get(o["order_id"])
+        mix = compute_mix(o["bsa"], o["mg_per_m2_day"], o["days"], o["tablet_size_mg"])
+        want = arrange_by_mode(o["days"], mix["ceil_days"], mix["exact_tabs"], mix["ceil_tabs"],
+                               mix["floor_tabs"], o["mode"])
+        assert store.schedule(row) == want, o["order_id"]
+        assert row["sig"] == format_pharmacy_snippet(want, o["tablet_size_mg"], o["days"], o["mg_per_m2_day"], o["bsa"])
+        assert row["patient_id"] == o["patient_id"]
+
+@pytest.mark.parametrize("query, args", [
+    ("SELECT * FROM schedules WHERE patient_id = ? ORDER BY start_date, id", ("MRN000001",)),
+    ("SELECT * FROM schedules WHERE start_date BETWEEN ? AND ?", ("2024-03-01", "2024-03-07")),
+    ("SELECT * FROM schedules WHERE input_hash = ?", (input_hash(1.7, 1250, 14, 500, SCHEDULE_MODES[0]),)),
+])
+def test_lookups_use_indexes(store, query, args):
+    store.add_orders(orders(50, 5))
+    assert "USING INDEX" in " / ".join(store.explain(query, args))
+
+def test_upsert_replaces_by_order_id(store):
+    first, = orders(1, 1)
+    store.add(first)
+    store.add(dict(first, days=28))
+    assert len(store) == 1
+    assert store.get(first["order_id"])["days"] == 28
+
+@pytest.mark.parametrize("bad", [None, "x", {"bsa": 1.7}])
+def test_bad_order_names_its_position(store, bad):
+    good, = orders(1, 1)
+    with pytest.raises(ValueError, match=r"^order 1 "):
+        store.add_orders([good, bad])
+
+def test_bad_order_past_the_first_batch_stores_nothing(store):
+    store.add_orders(dict(o, order_id=f"earlier{i}") for i, o in enumerate(orders(3, 1)))  # earlier calls stay
+    sample = list(orders(1200, 50))
+    sample[1100] = dict(sample[1100], days="x")
+    with pytest.raises(ValueError, match=r"^order 1100 "):
+        store.add_orders(sample, batch_size=500)
+    assert len(store) == 3 and store.get(sample[0]["order_id"]) is None
+    assert store.add_orders(sample[:1100] + sample[1101:], batch_size=500) == 1199
+    assert len(store) == 1202